@@ -0,0 +1,75 @@
+"""Benchmark de la DTW à bande de Sakoe-Chiba : bande contre matrice complète
+
+Usage (depuis la racine du dépôt) :
+    python -m benchmarks.bench_alignment [--counts 4 10 20] [--band 0.1]
+
+Génère des contours de F0 synthétiques (déclinaison, ondulations syllabiques,
+durées variables), puis mesure le calcul de la matrice des distances avec la
+bande et sans (bande = 1, DTW complète), ainsi que l'alignement d'une paire de
+contours longs. Échoue si la matrice des `--max-count` contours prend plus de
+`--target` secondes.
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from modules.alignment import dtw_batch, pairwise_distances
+
+def synthetic_contours(count, seed=0):
+    """Contours en demi-tons de 150 à 700 trames (même phrase, tempo et registre variables)"""
+    rng = np.random.default_rng(seed)
+    contours = []
+    for _ in range(count):
+        n = int(rng.integers(150, 700))
+        t = np.linspace(0, 1, n) ** rng.uniform(0.8, 1.25)
+        contour = -4 * t + np.sin(2 * np.pi * 3 * t + rng.uniform(-0.3, 0.3)) + rng.normal(0, 0.1, n)
+        contours.append(contour - np.median(contour))
+    return contours
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[4, 10, 20])
+    parser.add_argument("--band", type=float, default=0.1)
+    parser.add_argument("--length", type=int, default=200)
+    parser.add_argument("--target", type=float, default=0.5, help="temps maximal (s) pour --max-count contours")
+    parser.add_argument("--max-count", type=int, default=10)
+    args = parser.parse_args()
+    
+    failed = False
+    pairwise_distances(synthetic_contours(2), args.band, args.length)
+    print(f"{'contours':>9} {'paires':>7} {'bande':>9} {'complète':>9} {'gain':>6} {'écart moyen':>12}")
+    for count in args.counts:
+        contours = synthetic_contours(count)
+        banded, banded_time = timed(lambda: pairwise_distances(contours, args.band, args.length))
+        full, full_time = timed(lambda: pairwise_distances(contours, 1.0, args.length))
+        pairs = count * (count - 1) // 2
+        # La bande contraint le chemin : la distance ne peut qu'augmenter
+        upper = np.triu_indices(count, k=1)
+        gap = float(np.mean(banded[upper] - full[upper]))
+        print(f"{count:>9} {pairs:>7} {banded_time:8.3f}s {full_time:8.3f}s "
+              f"{full_time / banded_time:5.1f}x {gap:12.4f}")
+        if count == args.max_count and banded_time > args.target:
+            print(f"ÉCHEC: {banded_time:.3f} s > objectif {args.target:g} s")
+            failed = True
+    
+    # Une paire de contours longs (1 min à 62,5 trames/s), sans rééchantillonnage
+    x, y = synthetic_contours(2, seed=1)
+    x = np.interp(np.linspace(0, len(x) - 1, 3750), np.arange(len(x)), x)
+    y = np.interp(np.linspace(0, len(y) - 1, 3500), np.arange(len(y)), y)
+    _, banded_time = timed(lambda: dtw_batch(x, y, args.band))
+    _, full_time = timed(lambda: dtw_batch(x, y, 1.0))
+    print(f"paire {len(x)}x{len(y)}: bande {banded_time:.3f} s, complète {full_time:.3f} s "
+          f"({full_time / banded_time:.1f}x)")
+    
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
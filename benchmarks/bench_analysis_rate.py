@@ -0,0 +1,93 @@
+"""Benchmark de la fréquence d'analyse : extraction à 16 kHz contre 44,1 kHz
+
+Usage (depuis la racine du dépôt) :
+    python -m benchmarks.bench_analysis_rate [--durations 5 30] [--engines pyin yin]
+                                             [--rate 16000] [--files a.wav b.wav]
+
+Pour chaque signal (synthétique, ou fichiers WAV avec `--files`), mesure le
+temps de compute_features (F0, enveloppe, MFCC) à 44,1 kHz et à la fréquence
+d'analyse, rééchantillonnage compris, puis compare les contours de F0 : écart
+médian et 95e centile en cents sur les trames voisées des deux côtés, et taux
+de désaccord de voisement. Échoue si l'écart médian dépasse `--max-cents`.
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+import soundfile as sf
+
+from benchmarks.synthetic import speech_like
+from modules.audio_processor import AudioProcessor
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+def f0_deviation(reference, reference_hop, candidate, candidate_hop):
+    """Écart en cents et désaccord de voisement, contours ramenés aux temps de la référence"""
+    ref_times = np.arange(len(reference)) * reference_hop
+    cand_times = np.arange(len(candidate)) * candidate_hop
+    ref_voiced = np.isfinite(reference) & (reference > 0)
+    cand_voiced = np.isfinite(candidate) & (candidate > 0)
+    
+    # Voisement : trame candidate la plus proche ; F0 : interpolation entre trames voisées
+    nearest = np.clip(np.round(ref_times / candidate_hop).astype(int), 0, len(candidate) - 1)
+    disagreement = float(np.mean(ref_voiced != cand_voiced[nearest]))
+    both = ref_voiced & cand_voiced[nearest]
+    if not np.any(both) or np.count_nonzero(cand_voiced) < 2:
+        return np.array([]), disagreement
+    interpolated = np.interp(ref_times[both], cand_times[cand_voiced], candidate[cand_voiced])
+    return np.abs(1200 * np.log2(interpolated / reference[both])), disagreement
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--durations", type=float, nargs="+", default=[5.0, 30.0])
+    parser.add_argument("--files", nargs="+", default=None)
+    parser.add_argument("--engines", nargs="+", default=["pyin", "yin"])
+    parser.add_argument("--rate", type=int, default=16000)
+    parser.add_argument("--max-cents", type=float, default=20.0)
+    args = parser.parse_args()
+    
+    processor = AudioProcessor(analysis_rate=args.rate)
+    full_rate = processor.sample_rate
+    if args.files:
+        signals = []
+        for path in args.files:
+            audio_data, sr = sf.read(path, dtype="float32", always_2d=True)
+            signals.append((path, processor.resample(audio_data.mean(axis=1), sr, full_rate)))
+    else:
+        signals = [(f"synthétique {d:g} s", speech_like(d, sr=full_rate)[0]) for d in args.durations]
+    
+    # Échauffement (compilation JIT de librosa) hors mesures
+    warmup = signals[0][1][:full_rate]
+    for engine in args.engines:
+        processor.compute_features(warmup, full_rate, engine=engine)
+        processor.compute_features(processor.resample(warmup, full_rate), args.rate, engine=engine)
+    
+    failed = False
+    print(f"{'signal':>22} {'méthode':>8} {f'{full_rate} Hz':>10} {f'{args.rate} Hz':>10} "
+          f"{'gain':>6} {'méd. ¢':>7} {'p95 ¢':>7} {'voisement':>10}")
+    for label, audio_data in signals:
+        for engine in args.engines:
+            full, full_time = timed(processor.compute_features, audio_data, full_rate, engine=engine)
+            
+            def analysis_pipeline():
+                resampled = processor.resample(audio_data, full_rate)
+                return processor.compute_features(resampled, args.rate, engine=engine)
+            reduced, reduced_time = timed(analysis_pipeline)
+            
+            cents, disagreement = f0_deviation(full["f0"], processor.frame_settings(full_rate)[1] / full_rate,
+                                               reduced["f0"], processor.frame_settings(args.rate)[1] / args.rate)
+            median = float(np.median(cents)) if len(cents) else float("nan")
+            p95 = float(np.percentile(cents, 95)) if len(cents) else float("nan")
+            print(f"{label[-22:]:>22} {engine:>8} {full_time:9.2f}s {reduced_time:9.2f}s "
+                  f"{full_time / reduced_time:5.1f}x {median:7.2f} {p95:7.1f} {100 * disagreement:9.1f}%")
+            failed |= not median <= args.max_cents
+    
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Benchmark du cache des signaux décodés (lecture, comparaison, analyses)
+
+Usage (depuis la racine du dépôt) :
+    python -m benchmarks.bench_audio_cache [--files 8] [--duration 30] [--target-ms 20]
+
+Écrit des enregistrements WAV synthétiques à 44,1 kHz, puis mesure le
+décodage sans cache (ce que faisait la lecture à chaque clic), le premier
+accès par le cache et les accès suivants, à la fréquence d'origine (lecture)
+et à la fréquence d'analyse (comparaison). Un cache volontairement trop petit
+vérifie que le budget mémoire est respecté.
+
+Échoue si le 95e centile d'un accès en cache (tout ce qui précède
+`sounddevice.play`) dépasse `--target-ms`, si un fichier réécrit est relu
+depuis une ancienne entrée ou si le budget mémoire est dépassé.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import soundfile as sf
+
+from benchmarks.synthetic import speech_like
+from modules.audio_processor import AudioProcessor
+
+def timings(fn, repeat):
+    """Durées (ms) de `repeat` appels"""
+    result = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        result.append((time.perf_counter() - start) * 1000)
+    return np.array(result)
+
+def describe(label, values):
+    print(f"{label:>34} médiane {np.median(values):9.3f} ms   p95 {np.percentile(values, 95):9.3f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=30.0, help="durée de chaque enregistrement (s)")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--target-ms", type=float, default=20.0, help="p95 maximal d'un accès en cache")
+    args = parser.parse_args()
+    
+    failed = False
+    with tempfile.TemporaryDirectory() as workdir:
+        paths = []
+        for k in range(args.files):
+            audio_data, _ = speech_like(args.duration, 44100, seed=k)
+            path = os.path.join(workdir, f"enregistrement_{k}.wav")
+            sf.write(path, audio_data, 44100)
+            paths.append(path)
+        
+        def uncached(path):
+            audio_data, sr = sf.read(path, dtype="float32", always_2d=True)
+            return audio_data.mean(axis=1), sr
+        
+        processor = AudioProcessor()
+        describe("décodage sans cache (44,1 kHz)", timings(lambda: uncached(paths[0]), 5))
+        cold = [timings(lambda: processor.read_audio(path), 1)[0] for path in paths]
+        describe("premier accès (44,1 kHz)", np.array(cold))
+        hits = timings(lambda: processor.read_audio(paths[0]), args.repeat)
+        describe("accès en cache (44,1 kHz)", hits)
+        cold = [timings(lambda: processor.load_audio(path), 1)[0] for path in paths]
+        describe("premier accès (16 kHz, rééch.)", np.array(cold))
+        analysis_hits = timings(lambda: processor.load_audio(paths[0]), args.repeat)
+        describe("accès en cache (16 kHz)", analysis_hits)
+        
+        worst = max(np.percentile(hits, 95), np.percentile(analysis_hits, 95))
+        if worst > args.target_ms:
+            print(f"ÉCHEC: accès en cache p95 {worst:.3f} ms > objectif {args.target_ms:g} ms")
+            failed = True
+        
+        # Un fichier réécrit (nouvelle date) ne doit pas être relu depuis le cache
+        replacement, _ = speech_like(args.duration / 2, 44100, seed=99)
+        sf.write(paths[0], replacement, 44100)
+        os.utime(paths[0], ns=(time.time_ns(), time.time_ns() + 10**9))
+        if len(processor.read_audio(paths[0])[0]) != len(replacement):
+            print("ÉCHEC: fichier réécrit relu depuis une ancienne entrée")
+            failed = True
+        
+        # Budget de trois enregistrements : les plus anciens sont évincés
+        one = processor.read_audio(paths[1])[0].nbytes
+        small = AudioProcessor(audio_cache_bytes=3 * one + one // 2)
+        for path in paths[1:] * 2:
+            small.read_audio(path)
+        cache = small.audio_cache
+        print(f"budget {cache.memory.max_bytes / 1024**2:.1f} Mo : {len(cache.memory)} entrées, "
+              f"{cache.memory.current_bytes / 1024**2:.1f} Mo, {cache.hits} succès, {cache.misses} échecs")
+        if cache.memory.current_bytes > cache.memory.max_bytes:
+            print("ÉCHEC: budget mémoire dépassé")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Test de non-régression de la vue de comparaison : temps de redessin et mémoire
+
+Usage (depuis la racine du dépôt) :
+    python -m benchmarks.bench_comparison_view [--iterations 200]
+
+Met à jour la même ComparisonView (canevas Agg hors écran) avec une série de
+comparaisons synthétiques et mesure le temps de mise à jour + dessin ainsi que
+la mémoire résidente (RSS). En référence, il mesure aussi quelques
+reconstructions complètes (nouvelle figure à chaque comparaison).
+
+Le script échoue (code de sortie 1) si la mise à jour n'est pas nettement plus
+rapide qu'une reconstruction (`--max-ratio`), si le temps médian dépasse
+`--max-ms` (facultatif, dépend de la machine) ou si la RSS augmente de plus de
+`--max-growth-mb` entre la fin de l'échauffement et la dernière itération.
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import speech_like
+from modules.comparison_view import ComparisonView
+from modules.f0_engines import estimate_f0
+from modules.lod import MinMaxPyramid
+from modules.spectrogram_tiles import build_pyramid
+
+def current_rss_mb():
+    """Mémoire résidente actuelle du processus (Mo)"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1024**2
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def synthetic_result(duration, sr, seed):
+    """Résultat au format de compute_comparison, sans passer par pYIN"""
+    result = {"pyramids": {}}
+    for i in (1, 2):
+        audio_data, _ = speech_like(duration * (1 + 0.1 * i), sr=sr, seed=seed + i)
+        amplitude = np.abs(audio_data)
+        f0, voiced_flag, voiced_probs = estimate_f0(audio_data, sr, engine="yin")
+        result[f"audio{i}"] = audio_data
+        result[f"tiles{i}"] = build_pyramid(audio_data, sr, 2048, 512)
+        result[f"features{i}"] = {"f0": f0, "voiced_flag": voiced_flag, "amplitude": amplitude}
+        result["pyramids"][f"audio{i}"] = MinMaxPyramid(audio_data)
+        result["pyramids"][f"amplitude{i}"] = MinMaxPyramid(amplitude, dx=1 / sr)
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--sr", type=int, default=44100)
+    parser.add_argument("--max-ms", type=float, default=None)
+    parser.add_argument("--max-ratio", type=float, default=0.8)
+    parser.add_argument("--max-growth-mb", type=float, default=30.0)
+    args = parser.parse_args()
+    
+    # Quelques résultats distincts réutilisés en boucle : seule la vue est mesurée
+    results = [synthetic_result(args.duration, args.sr, seed) for seed in range(4)]
+    
+    # Référence : nouvelle figure et nouveau canevas à chaque comparaison
+    rebuild_timings = []
+    for i in range(6):
+        start = time.perf_counter()
+        rebuilt = ComparisonView()
+        rebuilt.update("A", "B", results[i % len(results)], args.sr)
+        rebuilt.draw()
+        rebuild_timings.append(time.perf_counter() - start)
+    del rebuilt
+    rebuild_ms = 1000 * float(np.median(rebuild_timings[1:]))
+    
+    view = ComparisonView()
+    timings = []
+    rss_after_warmup = None
+    for i in range(args.iterations):
+        result = results[i % len(results)]
+        start = time.perf_counter()
+        view.update(f"A{i}", f"B{i}", result, args.sr)
+        view.draw()
+        timings.append(time.perf_counter() - start)
+        if i + 1 == args.warmup:
+            gc.collect()
+            rss_after_warmup = current_rss_mb()
+    
+    gc.collect()
+    rss_end = current_rss_mb()
+    growth = rss_end - (rss_after_warmup or rss_end)
+    median_ms = 1000 * float(np.median(timings[args.warmup:] or timings))
+    p95_ms = 1000 * float(np.percentile(timings[args.warmup:] or timings, 95))
+    
+    print(f"redessin médian: {median_ms:.1f} ms  p95: {p95_ms:.1f} ms  "
+          f"(reconstruction complète: {rebuild_ms:.1f} ms)")
+    print(f"RSS après échauffement: {rss_after_warmup:.1f} Mo  fin: {rss_end:.1f} Mo  "
+          f"croissance: {growth:+.1f} Mo sur {args.iterations - args.warmup} comparaisons")
+    
+    failed = False
+    if median_ms > args.max_ratio * rebuild_ms:
+        print(f"ÉCHEC: redessin médian > {args.max_ratio:g} x reconstruction complète")
+        failed = True
+    if args.max_ms is not None and median_ms > args.max_ms:
+        print(f"ÉCHEC: redessin médian > {args.max_ms} ms")
+        failed = True
+    if growth > args.max_growth_mb:
+        print(f"ÉCHEC: croissance mémoire > {args.max_growth_mb} Mo")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Benchmark de l'enveloppe d'amplitude : Hilbert par blocs contre scipy.signal.hilbert
+
+Usage (depuis la racine du dépôt) :
+    python -m benchmarks.bench_envelope [--durations 1 10 60]
+
+Pour chaque durée, teste une longueur « ronde » et une longueur première (FFT
+lente pour scipy), affiche les temps et l'écart maximal rapporté au maximum de
+l'enveloppe, hors bords. Échoue si l'écart dépasse `--tolerance`.
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+from scipy import signal
+
+from benchmarks.synthetic import speech_like
+from modules.envelope import hilbert_envelope
+
+def previous_prime(n):
+    """Plus grand nombre premier <= n"""
+    def is_prime(k):
+        if k < 2:
+            return False
+        return all(k % d for d in range(2, int(k**0.5) + 1))
+    while not is_prime(n):
+        n -= 1
+    return n
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--durations", type=float, nargs="+", default=[1.0, 10.0, 60.0])
+    parser.add_argument("--sr", type=int, default=44100)
+    parser.add_argument("--tolerance", type=float, default=0.005)
+    args = parser.parse_args()
+    
+    failed = False
+    edge = 20000
+    print(f"{'longueur':>10} {'scipy':>9} {'blocs':>9} {'écart max':>10}")
+    for duration in args.durations:
+        audio_data, _ = speech_like(duration, sr=args.sr)
+        for n in (len(audio_data), previous_prime(len(audio_data))):
+            x = audio_data[:n]
+            start = time.perf_counter()
+            reference = np.abs(signal.hilbert(x))
+            scipy_time = time.perf_counter() - start
+            start = time.perf_counter()
+            envelope = hilbert_envelope(x)
+            block_time = time.perf_counter() - start
+            
+            inner = slice(edge, n - edge) if n > 4 * edge else slice(None)
+            error = float(np.max(np.abs(envelope[inner] - reference[inner])) / reference.max())
+            print(f"{n:>10} {scipy_time:8.3f}s {block_time:8.3f}s {error:10.5f}")
+            failed |= error > args.tolerance
+    
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
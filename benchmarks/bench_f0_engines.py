@@ -0,0 +1,81 @@
+"""Benchmark des méthodes F0 : temps de calcul et erreur grossière de hauteur (GPE)
+
+Usage (depuis la racine du dépôt) :
+    python -m benchmarks.bench_f0_engines [--dir enregistrements] [--durations 1 10]
+
+La GPE est la proportion de trames voisées pour les deux méthodes dont la F0
+s'écarte de plus de 20 % de la référence pYIN. Sur les signaux synthétiques, la
+F0 générée sert aussi de référence.
+"""
+
+import argparse
+import glob
+import os
+import time
+
+import numpy as np
+import soundfile as sf
+
+from benchmarks.synthetic import speech_like
+from modules.f0_engines import F0_ENGINES, estimate_f0
+
+def gross_pitch_error(f0, reference, tolerance=0.2):
+    """Proportion de trames voisées des deux côtés avec un écart relatif > tolérance"""
+    both = ~np.isnan(f0) & ~np.isnan(reference)
+    if not both.any():
+        return float("nan")
+    return float(np.mean(np.abs(f0[both] - reference[both]) / reference[both] > tolerance))
+
+def voicing_error(f0, reference):
+    """Proportion de trames dont la décision voisé/non voisé diffère de la référence"""
+    return float(np.mean(np.isnan(f0) != np.isnan(reference)))
+
+def run_engine(engine, audio_data, sr, repeat):
+    """Meilleur temps sur `repeat` exécutions, et la F0 obtenue"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        f0, _, _ = estimate_f0(audio_data, sr, engine=engine)
+        best = min(best, time.perf_counter() - start)
+    return best, f0
+
+def benchmark_signal(name, audio_data, sr, truth, repeat):
+    """Afficher les résultats de toutes les méthodes pour un signal"""
+    # Un premier appel compile les fonctions numba de pYIN hors chronométrage
+    estimate_f0(audio_data[:sr], sr, engine="pyin")
+    pyin_time, pyin_f0 = run_engine("pyin", audio_data, sr, 1)
+    
+    duration = len(audio_data) / sr
+    for engine in F0_ENGINES:
+        if engine == "pyin":
+            elapsed, f0 = pyin_time, pyin_f0
+        else:
+            elapsed, f0 = run_engine(engine, audio_data, sr, repeat)
+        row = (f"{name:<28} {engine:<9} {elapsed:8.3f}s {duration / elapsed:8.1f}x "
+               f"{gross_pitch_error(f0, pyin_f0):8.3f} {voicing_error(f0, pyin_f0):8.3f}")
+        if truth is not None:
+            row += f" {gross_pitch_error(f0, truth):8.3f}"
+        print(row)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dir", help="dossier d'enregistrements WAV à inclure")
+    parser.add_argument("--durations", type=float, nargs="+", default=[1.0, 10.0],
+                        help="durées (s) des signaux synthétiques")
+    parser.add_argument("--sr", type=int, default=44100)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    
+    print(f"{'signal':<28} {'méthode':<9} {'temps':>9} {'t.réel':>9} "
+          f"{'GPE/pyin':>8} {'VDE/pyin':>8} {'GPE/vrai':>8}")
+    for duration in args.durations:
+        audio_data, truth = speech_like(duration, sr=args.sr)
+        benchmark_signal(f"synthétique {duration:g}s", audio_data, args.sr, truth, args.repeat)
+    
+    if args.dir:
+        for path in sorted(glob.glob(os.path.join(args.dir, "*.wav"))):
+            audio_data, sr = sf.read(path, dtype="float32", always_2d=True)
+            benchmark_signal(os.path.basename(path)[:28], audio_data.mean(axis=1), sr, None, args.repeat)
+
+if __name__ == "__main__":
+    main()
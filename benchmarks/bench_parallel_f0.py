@@ -0,0 +1,131 @@
+"""Benchmark de la F0 en parallèle (pYIN par morceaux) : mise à l'échelle et recollage
+
+Usage (depuis la racine du dépôt) :
+    python -m benchmarks.bench_parallel_f0 [--duration 300] [--workers 1 2 4 8] [--chunk 5] [--engine pyin]
+
+Génère une longue session de lecture synthétique (phrases séparées de pauses),
+puis calcule la F0 d'un seul tenant, par morceaux sur un seul processus, et
+par morceaux sur 2, 4, 8… processus (pool démarré avant la mesure). Affiche le
+gain et l'efficacité de chaque configuration, et compare les pistes à la
+référence d'un seul tenant.
+
+Échoue s'il n'y a aucun raccord à contrôler (aucun segment de parole plus
+long que `--chunk`), si une trame diffère de la référence hors des zones de
+raccord (à plus de `--chunk-overlap` secondes d'une coupure de fenêtre), si
+l'écart dans ces zones dépasse `--tolerance` demi-ton, ou si les sorties
+parallèles diffèrent de la sortie par morceaux sur un seul processus.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import speech_like
+from modules import parallel_f0
+from modules.audio_processor import AudioProcessor
+
+def reading_session(duration, sr, seed=0):
+    """Phrases de 4 à 40 s séparées de pauses de 0,5 à 2 s"""
+    rng = np.random.default_rng(seed)
+    parts = []
+    total = 0
+    while total < duration * sr:
+        phrase, _ = speech_like(rng.uniform(4, 40), sr, seed=len(parts), hop_length=256)
+        pause = np.zeros(int(rng.uniform(0.5, 2.0) * sr), dtype=np.float32)
+        parts += [phrase, pause]
+        total += len(phrase) + len(pause)
+    return np.concatenate(parts)[:int(duration * sr)]
+
+def seam_frames(chunks, n_frames, margin):
+    """Masque des trames à moins de `margin` trames d'une coupure de fenêtre"""
+    mask = np.zeros(n_frames, dtype=bool)
+    for *_, stop in chunks:
+        if stop is not None:
+            mask[max(0, stop - margin):stop + margin] = True
+    return mask
+
+def differing(a, b):
+    """Trames où deux pistes de F0 diffèrent (NaN égaux entre eux)"""
+    return ~((a == b) | (np.isnan(a) & np.isnan(b)))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=300.0, help="durée de la session (s)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--engine", default="pyin")
+    # Plus court que les segments de parole de la session (13 s au plus) : il y a des raccords à contrôler
+    parser.add_argument("--chunk", type=float, default=5.0, help="durée maximale d'un morceau (s)")
+    parser.add_argument("--chunk-overlap", type=float, default=1.0, help="marge de chaque fenêtre (s)")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="écart maximal aux raccords (demi-tons)")
+    args = parser.parse_args()
+    
+    processor = AudioProcessor()
+    sr = processor.analysis_rate
+    audio_data = reading_session(args.duration, sr)
+    spans = processor.speech_spans(audio_data, sr)
+    hop_length = processor.frame_settings(sr)[1]
+    print(f"session {args.duration:g} s, {len(spans)} segments de parole, "
+          f"{sum(b - a for a, b in spans) / sr:.0f} s de parole, {os.cpu_count()} cœurs")
+    
+    def run(workers, chunk):
+        processor.f0_workers = workers
+        processor.f0_chunk_duration = chunk
+        processor.f0_chunk_overlap = args.chunk_overlap
+        processor.parallel_min_duration = 0.0
+        start = time.perf_counter()
+        tracks = processor.extract_f0(audio_data, sr, engine=args.engine, spans=spans)
+        return tracks, time.perf_counter() - start
+    
+    kwargs = dict(engine=args.engine, fmin=processor.f_min, fmax=processor.f_max,
+                  frame_length=processor.frame_settings(sr)[0], hop_length=hop_length)
+    parallel_f0.chunk_tracks(audio_data, sr, [(0, sr // 2, 0, None)], **kwargs)
+    reference, single_time = run(1, 2 * args.duration)
+    print(f"{'d’un seul tenant':>18} {single_time:8.2f} s")
+    
+    failed = False
+    chunked, serial_time = None, None
+    print(f"{'processus':>18} {'temps':>10} {'gain':>6} {'efficacité':>11}")
+    for workers in args.workers:
+        if workers > 1:
+            # Démarrage du pool (spawn, imports, JIT) hors mesure
+            start = time.perf_counter()
+            parallel_f0.prewarm(workers, sr, **kwargs)
+            print(f"{'':>18} (démarrage du pool {workers}: {time.perf_counter() - start:.2f} s)")
+        tracks, elapsed = run(workers, args.chunk)
+        if chunked is None:
+            chunked, serial_time = tracks, elapsed
+        elif not all(np.array_equal(a, b, equal_nan=True) for a, b in zip(chunked, tracks)):
+            print(f"ÉCHEC: sortie à {workers} processus différente de la sortie par morceaux")
+            failed = True
+        speedup = serial_time / elapsed
+        print(f"{workers:>18} {elapsed:8.2f} s {speedup:5.2f}x {speedup / workers:10.0%}")
+    parallel_f0.shutdown()
+    
+    # Recollage : écarts à la référence, dans et hors des zones de raccord
+    chunks = parallel_f0.plan_chunks(spans, hop_length, int(args.chunk * sr), int(args.chunk_overlap * sr))
+    n_frames = len(reference[0])
+    seams = seam_frames(chunks, n_frames, int(args.chunk_overlap * sr) // hop_length)
+    diff = differing(reference[0], chunked[0]) | (reference[1] != chunked[1])
+    both = np.isfinite(reference[0]) & np.isfinite(chunked[0])
+    deviation = np.abs(12 * np.log2(chunked[0][both] / reference[0][both]))
+    worst = float(deviation.max()) if len(deviation) else 0.0
+    windows = sum(stop is not None for *_, stop in chunks)
+    print(f"{len(chunks)} morceaux, {windows} raccords de fenêtres ; trames différentes: "
+          f"{int(diff[seams].sum())} aux raccords, {int(diff[~seams].sum())} ailleurs ; "
+          f"écart maximal {worst:.3f} demi-ton")
+    if windows == 0:
+        print(f"ÉCHEC: aucun segment de parole plus long que --chunk {args.chunk:g} s, raccords non contrôlés")
+        failed = True
+    if diff[~seams].any():
+        print("ÉCHEC: trames différentes hors des zones de raccord")
+        failed = True
+    if worst > args.tolerance:
+        print(f"ÉCHEC: écart {worst:.3f} demi-ton > tolérance {args.tolerance:g}")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
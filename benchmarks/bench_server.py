@@ -0,0 +1,214 @@
+"""Test de charge du serveur d'analyse : débit, latence p95, regroupement des requêtes et lots
+
+Usage (depuis la racine du dépôt) :
+    python -m benchmarks.bench_server [--clients 16] [--requests 400] [--batch-sizes 1 8] [--workers 4] [--engine pyin]
+
+Démarre le serveur (python -m modules.server, port libre, dossier temporaire)
+pour chaque taille de lot, y dépose des enregistrements synthétiques (surtout
+courts, quelques longs), puis lance `--clients` clients simultanés (une
+connexion persistante chacun) :
+
+- à froid : chaque enregistrement est demandé plusieurs fois en même temps
+  (résumé prosodique et pistes) ; les requêtes sur le même contenu doivent
+  être regroupées en une seule analyse ;
+- mélange : `--requests` requêtes tirées au hasard (résumés, pistes,
+  comparaisons), les plus demandées sur quelques enregistrements.
+
+Affiche le débit et les latences médiane et p95 de chaque phase et de chaque
+point d'accès, ainsi que les compteurs du serveur. Échoue si une requête
+échoue, si un contenu est analysé plus d'une fois, si un processus du pool
+reçoit plus que sa part d'un lot, ou si la latence p95 du mélange dépasse
+`--target-ms` (facultatif, dépend de la machine).
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import soundfile as sf
+
+from benchmarks.synthetic import speech_like
+
+class Client:
+    """Client HTTP/1.1 minimal sur une connexion persistante"""
+    
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+    
+    async def request(self, method, target, body=b""):
+        """Envoyer une requête ; renvoie `(code, données JSON)`"""
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        head = f"{method} {target} HTTP/1.1\r\nHost: {self.host}\r\nContent-Length: {len(body)}\r\n\r\n"
+        self.writer.write(head.encode("latin-1") + body)
+        await self.writer.drain()
+        status_line, *lines = (await self.reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+        headers = dict(line.split(": ", 1) for line in lines if ": " in line)
+        payload = await self.reader.readexactly(int(headers.get("Content-Length", 0)))
+        return int(status_line.split(" ")[1]), json.loads(payload) if payload else None
+    
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            await self.writer.wait_closed()
+
+def wav_bytes(duration, seed, sr=44100):
+    audio_data, _ = speech_like(duration, sr, seed=seed)
+    buffer = io.BytesIO()
+    sf.write(buffer, audio_data, sr, format="WAV")
+    return buffer.getvalue()
+
+def start_server(storage, workers, engine, batch_size):
+    """Lancer le serveur sur un port libre ; renvoie `(processus, port)`"""
+    command = [sys.executable, "-m", "modules.server", "--port", "0", "--storage", storage,
+               "--engine", engine, "--batch-size", str(batch_size)]
+    if workers:
+        command += ["--workers", str(workers)]
+    process = subprocess.Popen(command, stderr=subprocess.PIPE, text=True)
+    line = process.stderr.readline()
+    match = re.search(r":(\d+) ", line)
+    if match is None:
+        process.kill()
+        raise RuntimeError(f"échec du démarrage du serveur: {line}{process.stderr.read()}")
+    return process, int(match.group(1))
+
+async def run_load(host, port, requests, clients):
+    """Exécuter `requests` (liste de `(point_d_accès, cible)`) avec `clients` connexions"""
+    queue = asyncio.Queue()
+    for item in requests:
+        queue.put_nowait(item)
+    latencies = []
+    failures = []
+    
+    async def worker():
+        client = Client(host, port)
+        try:
+            while not queue.empty():
+                endpoint, target = queue.get_nowait()
+                start = time.perf_counter()
+                status, payload = await client.request("GET", target)
+                latencies.append((endpoint, (time.perf_counter() - start) * 1000))
+                if status != 200:
+                    failures.append(f"{target}: {status} {payload}")
+        finally:
+            await client.close()
+    
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(clients)])
+    return latencies, failures, time.perf_counter() - start
+
+def report(label, latencies, elapsed):
+    values = np.array([ms for _, ms in latencies])
+    print(f"  {label}: {len(values)} requêtes en {elapsed:.2f} s, {len(values) / elapsed:.1f} req/s, "
+          f"médiane {np.median(values):.1f} ms, p95 {np.percentile(values, 95):.1f} ms")
+    for endpoint in sorted({endpoint for endpoint, _ in latencies}):
+        values = np.array([ms for name, ms in latencies if name == endpoint])
+        print(f"    {endpoint:>8}: {len(values):4d} requêtes, médiane {np.median(values):8.1f} ms, "
+              f"p95 {np.percentile(values, 95):8.1f} ms")
+    return float(np.percentile([ms for _, ms in latencies], 95))
+
+async def scenario(args, port, uploads, batch_size):
+    host = "127.0.0.1"
+    rng = np.random.default_rng(0)
+    failed = False
+    
+    client = Client(host, port)
+    ids = []
+    for data in uploads:
+        status, payload = await client.request("POST", "/recordings", data)
+        if status not in (200, 201):
+            raise RuntimeError(f"dépôt refusé: {status} {payload}")
+        ids.append(payload["id"])
+    engine = f"engine={args.engine}"
+    
+    # À froid : chaque contenu demandé plusieurs fois en même temps
+    cold = [(kind, f"/recordings/{recording_id}/{kind}?{engine}")
+            for recording_id in ids for kind in ("prosody", "tracks") for _ in range(args.duplicates)]
+    rng.shuffle(cold)
+    latencies, failures, elapsed = await run_load(host, port, cold, args.clients)
+    report("à froid", latencies, elapsed)
+    _, stats = await client.request("GET", "/stats")
+    if stats["analyses"] != len(ids):
+        print(f"ÉCHEC: {stats['analyses']} analyses pour {len(ids)} contenus distincts")
+        failed = True
+    
+    # Mélange : popularité décroissante (quelques enregistrements très demandés)
+    weights = 1 / np.arange(1, len(ids) + 1)
+    weights /= weights.sum()
+    mixed = []
+    for _ in range(args.requests):
+        kind = rng.choice(["prosody", "tracks", "compare"], p=[0.5, 0.3, 0.2])
+        if kind == "compare":
+            a, b = rng.choice(len(ids), size=2, replace=False, p=weights)
+            mixed.append((kind, f"/compare?a={ids[a]}&b={ids[b]}&{engine}"))
+        else:
+            mixed.append((kind, f"/recordings/{ids[rng.choice(len(ids), p=weights)]}/{kind}?{engine}"))
+    mixed_latencies, mixed_failures, elapsed = await run_load(host, port, mixed, args.clients)
+    p95 = report("mélange", mixed_latencies, elapsed)
+    
+    _, stats = await client.request("GET", "/stats")
+    _, health = await client.request("GET", "/health")
+    await client.close()
+    mean_batch = stats["batched_jobs"] / stats["batches"] if stats["batches"] else 0.0
+    print(f"  serveur: {stats['requests']} requêtes, {stats['analyses']} analyses, "
+          f"{stats['coalesced']} regroupées, {stats['cache_hits']} servies du cache, "
+          f"{stats['batches']} lots (moyenne {mean_batch:.1f}, max {stats['largest_batch']})")
+    for failure in (failures + mixed_failures)[:5]:
+        print(f"ÉCHEC: {failure}")
+    if failures or mixed_failures or stats["errors"]:
+        failed = True
+    # Un lot est réparti sur les processus : aucun n'en exécute plus que sa part
+    share = -(-batch_size // health["workers"])
+    if stats["largest_batch"] > share:
+        print(f"ÉCHEC: {stats['largest_batch']} tâches envoyées à un seul processus "
+              f"(lots de {batch_size}, {health['workers']} processus : {share} au plus)")
+        failed = True
+    if args.target_ms is not None and p95 > args.target_ms:
+        print(f"ÉCHEC: p95 du mélange {p95:.1f} ms > {args.target_ms:g} ms")
+        failed = True
+    return failed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--short", type=int, default=16, help="nombre d'enregistrements courts (2-4 s)")
+    parser.add_argument("--long", type=int, default=2, help="nombre d'enregistrements longs (30 s)")
+    parser.add_argument("--duplicates", type=int, default=4, help="requêtes simultanées par contenu à froid")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--engine", default="yin")
+    parser.add_argument("--target-ms", type=float, default=None, help="p95 maximal du mélange")
+    args = parser.parse_args()
+    
+    rng = np.random.default_rng(1)
+    uploads = [wav_bytes(rng.uniform(2, 4), seed) for seed in range(args.short)]
+    uploads += [wav_bytes(30.0, 100 + seed) for seed in range(args.long)]
+    
+    failed = False
+    for batch_size in args.batch_sizes:
+        with tempfile.TemporaryDirectory() as storage:
+            start = time.perf_counter()
+            process, port = start_server(storage, args.workers, args.engine, batch_size)
+            print(f"lots de {batch_size} au plus (serveur prêt en {time.perf_counter() - start:.1f} s, "
+                  f"{os.cpu_count()} cœurs)")
+            try:
+                failed |= asyncio.run(scenario(args, port, uploads, batch_size))
+            finally:
+                process.terminate()
+                process.wait()
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
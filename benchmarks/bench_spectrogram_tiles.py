@@ -0,0 +1,159 @@
+"""Benchmark du spectrogramme en tuiles : construction, zoom et défilement d'un long enregistrement
+
+Usage (depuis la racine du dépôt) :
+    python -m benchmarks.bench_spectrogram_tiles [--minutes 30] [--target-ms 150]
+
+Construit la pyramide de tuiles d'une session synthétique (par défaut 30 min
+à 16 kHz) dans un cache disque temporaire, puis mesure, sur un canevas Agg
+hors écran, le dessin de l'enregistrement entier, des zooms sur une syllabe
+(1 s) à des positions aléatoires et un défilement par pas de 10 % d'une
+fenêtre de 10 s. En référence, il mesure l'ancien affichage (imshow de toute
+la matrice en dB) sur `--baseline-minutes`.
+
+Échoue si le 95e centile d'une interaction (changement de limites + dessin)
+dépasse `--target-ms`, si une interaction lit plus de tuiles que la largeur de
+l'axe n'en demande, ou si le niveau le plus fin diffère de
+librosa.power_to_db(stft) au-delà de l'arrondi float16.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import soundfile as sf
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from benchmarks.bench_parallel_f0 import reading_session
+from modules import spectrogram_tiles
+from modules.audio_processor import AudioProcessor
+from modules.spectrogram_tiles import TILE_FRAMES, TiledSpectrogram
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+def describe(label, values):
+    print(f"{label:>28} médiane {np.median(values):8.1f} ms   p95 {np.percentile(values, 95):8.1f} ms")
+
+def directory_mb(path):
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, _, names in os.walk(path) for name in names) / 1024**2
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--minutes", type=float, default=30.0)
+    parser.add_argument("--baseline-minutes", type=float, default=2.0)
+    parser.add_argument("--interactions", type=int, default=40)
+    parser.add_argument("--target-ms", type=float, default=150.0, help="p95 maximal d'une interaction")
+    args = parser.parse_args()
+    
+    failed = False
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # Session écrite sur disque : la clé de la pyramide vient du contenu du fichier
+        processor = AudioProcessor(cache_dir=os.path.join(cache_dir, "cache"))
+        sr = processor.analysis_rate
+        n_fft, hop_length = processor.frame_settings(sr)
+        path = os.path.join(cache_dir, "session.wav")
+        sf.write(path, reading_session(args.minutes * 60, sr), sr, subtype="FLOAT")
+        audio_data, sr = processor.load_audio(path)
+        
+        pyramid, build_ms = timed(lambda: processor.spectrogram_tiles(path, audio_data, sr))
+        _, reopen_ms = timed(lambda: processor.spectrogram_tiles(path, audio_data, sr))
+        tiles_dir = os.path.join(processor.cache.cache_dir, "tiles")
+        full_mb = pyramid.n_frames * pyramid.n_bins * 8 / 1024**2
+        print(f"{args.minutes:g} min: {pyramid.n_frames} trames x {pyramid.n_bins} raies, "
+              f"{len(pyramid.levels)} niveaux ; construction {build_ms / 1000:.1f} s, "
+              f"réouverture {reopen_ms:.1f} ms")
+        print(f"pyramide sur disque {directory_mb(tiles_dir):.0f} Mo (STFT complexe complète: {full_mb:.0f} Mo)")
+        
+        # Niveau le plus fin : identique à power_to_db(stft) à l'arrondi float16 près, sur un extrait
+        # de 30 s (trame f centrée sur l'échantillon f * pas : STFT non centrée de l'extrait)
+        import librosa
+        half = n_fft // 2
+        first, stop = 60 * sr // hop_length, 90 * sr // hop_length
+        local = librosa.stft(audio_data[first * hop_length - half:(stop - 1) * hop_length + half],
+                             n_fft=n_fft, hop_length=hop_length, center=False)
+        reference = librosa.power_to_db(np.abs(local)**2, amin=spectrogram_tiles.AMIN, top_db=None)
+        stored = np.asarray(pyramid.levels[0][first:stop]).T.astype(np.float32)
+        error = np.abs(stored - reference)
+        print(f"niveau 0 / librosa: écart max {error.max():.4f} dB sur {error.size} valeurs")
+        if (error > np.abs(reference) * 2.0**-10 + 1e-3).any():
+            print("ÉCHEC: niveau le plus fin différent du spectrogramme librosa")
+            failed = True
+        
+        figure = Figure(figsize=(12, 3), dpi=100)
+        canvas = FigureCanvasAgg(figure)
+        ax = figure.add_subplot(1, 1, 1)
+        view = TiledSpectrogram(ax, cmap="Blues")
+        view.connect_resize(canvas)
+        
+        reads = []
+        original_tile = pyramid.tile
+        
+        def counting_tile(level, index):
+            reads[-1] += 1
+            return original_tile(level, index)
+        
+        pyramid.tile = counting_tile
+        
+        def interact(limits):
+            reads.append(0)
+            
+            def run():
+                ax.set_xlim(*limits)
+                canvas.draw()
+            
+            return timed(run)[1]
+        
+        reads.append(0)
+        _, first_ms = timed(lambda: (view.set_data(pyramid), canvas.draw()))
+        print(f"premier affichage (enregistrement entier): {first_ms:.1f} ms")
+        duration = pyramid.duration()
+        zooms = [interact((t, t + 1.0)) for t in rng.uniform(0, duration - 1, args.interactions)]
+        start = rng.uniform(0, duration - 20)
+        pans = [interact((start + k, start + k + 10.0)) for k in np.arange(args.interactions) * 1.0]
+        overviews = [interact((0, duration)) for _ in range(5)]
+        describe("zoom 1 s", zooms)
+        describe("défilement fenêtre 10 s", pans)
+        describe("vue d'ensemble", overviews)
+        width = ax.bbox.width
+        max_tiles = 2 * width // TILE_FRAMES + 3
+        cache = processor.tile_cache
+        print(f"tuiles lues par interaction: max {max(reads)} (borne {max_tiles:.0f}) ; "
+              f"LRU {len(cache)} tuiles, {cache.current_bytes / 1024**2:.1f} Mo")
+        worst = max(np.percentile(values, 95) for values in (zooms, pans, overviews))
+        if worst > args.target_ms:
+            print(f"ÉCHEC: interaction p95 {worst:.1f} ms > objectif {args.target_ms:g} ms")
+            failed = True
+        if max(reads) > max_tiles:
+            print("ÉCHEC: plus de tuiles lues que la largeur de l'axe n'en demande")
+            failed = True
+        
+        # Référence : ancien affichage de toute la matrice (power_to_db d'une STFT complète)
+        baseline = audio_data[:int(args.baseline_minutes * 60 * sr)]
+        graph = processor.feature_graph(baseline, sr)
+        S, compute_ms = timed(lambda: graph.get("db"))
+        figure = Figure(figsize=(12, 3), dpi=100)
+        canvas = FigureCanvasAgg(figure)
+        ax = figure.add_subplot(1, 1, 1)
+        image = ax.imshow(np.zeros((2, 2)), aspect="auto", origin="lower", cmap="Blues")
+        
+        def draw_full():
+            image.set_data(S)
+            image.set_extent((-0.5, S.shape[1] - 0.5, -0.5, S.shape[0] - 0.5))
+            image.set_clim(float(S.min()), float(S.max()))
+            canvas.draw()
+        
+        draw_ms = [timed(draw_full)[1] for _ in range(3)]
+        print(f"ancien affichage, {args.baseline_minutes:g} min: STFT + dB {compute_ms:.0f} ms, "
+              f"matrice {S.nbytes / 1024**2:.0f} Mo, dessin {np.median(draw_ms):.0f} ms")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Temps de démarrage de l'application et vérification des imports différés
+
+Usage (depuis la racine du dépôt) :
+    python -m benchmarks.bench_startup [--runs 5] [--target 1.0]
+
+Chaque mesure lance un interpréteur neuf (dans un dossier temporaire vide) qui
+importe `main`, crée la fenêtre et l'application sans préchargement, puis
+traite les événements en attente (fenêtre affichée). Sans affichage
+disponible, seul l'import de `main` est mesuré.
+
+Le script échoue si le temps médian dépasse `--target` secondes ou si un
+module lourd (librosa, matplotlib, scipy.signal, sounddevice, numba) a été
+importé avant toute analyse, y compris après l'ouverture des onglets
+Prosodie et Enregistrement (analyse en direct).
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+HEAVY_MODULES = ["librosa", "matplotlib", "scipy.signal", "sounddevice", "numba"]
+
+CHILD = r"""
+import json, sys, time
+start = time.perf_counter()
+import main
+result = {"import_s": time.perf_counter() - start, "window_s": None}
+try:
+    import tkinter as tk
+    root = tk.Tk()
+except Exception as exc:
+    result["display_error"] = str(exc)
+else:
+    app = main.PhonologyAnalysisApp(root, prewarm=False)
+    root.update()
+    result["window_s"] = time.perf_counter() - start
+    # Onglets à analyse en direct : leur figure n'est créée qu'au premier enregistrement
+    for key in ("prosody", "recorder"):
+        app.ensure_tab(key)
+    root.update()
+result["heavy_modules"] = sorted(m for m in HEAVY if m in sys.modules)
+print(json.dumps(result))
+"""
+
+def run_once(repo_root):
+    """Démarrer l'application dans un processus neuf ; renvoie le résultat JSON"""
+    env = dict(os.environ, PYTHONPATH=repo_root + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    code = f"HEAVY = {HEAVY_MODULES!r}\n{CHILD}"
+    with tempfile.TemporaryDirectory() as workdir:
+        completed = subprocess.run([sys.executable, "-c", code], cwd=workdir, env=env,
+                                   capture_output=True, text=True, timeout=120)
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr else "échec")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--target", type=float, default=1.0, help="temps médian maximal (s)")
+    args = parser.parse_args()
+    
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    results = [run_once(repo_root) for _ in range(args.runs)]
+    
+    imports = [r["import_s"] for r in results]
+    windows = [r["window_s"] for r in results if r["window_s"] is not None]
+    print(f"import de main: médiane {np.median(imports):.3f} s  (min {np.min(imports):.3f} s)")
+    if windows:
+        measured = float(np.median(windows))
+        print(f"fenêtre affichée: médiane {measured:.3f} s  (min {np.min(windows):.3f} s)")
+    else:
+        measured = float(np.median(imports))
+        print(f"pas d'affichage ({results[0].get('display_error')}) : seul l'import est mesuré")
+    
+    heavy = sorted({m for r in results for m in r["heavy_modules"]})
+    failed = False
+    if heavy:
+        print(f"ÉCHEC: modules lourds importés au démarrage: {', '.join(heavy)}")
+        failed = True
+    if measured > args.target:
+        print(f"ÉCHEC: démarrage {measured:.3f} s > objectif {args.target:g} s")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
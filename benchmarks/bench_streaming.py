@@ -0,0 +1,125 @@
+"""Benchmark du traitement en flux : mémoire bornée et identité avec le traitement en mémoire
+
+Usage (depuis la racine du dépôt) :
+    python -m benchmarks.bench_streaming [--durations 2 10 30] [--engine yin] [--budget-mb 96]
+
+Écrit des enregistrements synthétiques à 44,1 kHz de plusieurs durées (en
+minutes, bloc par bloc), puis mesure le pic de mémoire (tracemalloc) et le
+temps de l'analyse en flux (FeatureStream) et, pour la plus courte, de
+l'analyse en mémoire (load_audio + compute_features). Les pistes des deux
+analyses sont comparées trame à trame, ainsi que la normalisation et la
+préaccentuation par blocs.
+
+Échoue si le pic de l'analyse en flux dépasse `--budget-mb` pour une durée,
+ou si les résultats diffèrent de l'analyse en mémoire (F0, voisement,
+enveloppe et segments identiques, MFCC à `--mfcc-tolerance` près).
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import soundfile as sf
+
+from benchmarks.synthetic import speech_like
+from modules import streaming
+from modules.audio_processor import AudioProcessor
+
+def write_session(path, minutes, sr=44100, seed=0):
+    """Session de lecture synthétique écrite minute par minute (phrases et pauses)"""
+    rng = np.random.default_rng(seed)
+    with sf.SoundFile(path, "w", samplerate=sr, channels=1) as f:
+        written = 0
+        while written < minutes * 60 * sr:
+            phrase, _ = speech_like(rng.uniform(5, 50), sr, seed=int(rng.integers(1 << 30)))
+            pause = np.zeros(int(rng.uniform(0.5, 2.0) * sr), dtype=np.float32)
+            f.write(phrase)
+            f.write(pause)
+            written += len(phrase) + len(pause)
+
+def measured(fn):
+    """Résultat, durée (s) et pic de mémoire (Mo) de `fn()`"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 1024**2
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+def stream_tracks(processor, path, engine):
+    """Pistes complètes reconstituées à partir des blocs (comparaison seulement)"""
+    stream = processor.stream_features(path, engine=engine)
+    blocks = list(stream)
+    tracks = {key: np.concatenate([b[key] for b in blocks], axis=-1)
+              for key in ("f0", "voiced_flag", "voiced_probs", "envelope", "mfcc")}
+    return stream, tracks
+
+def consume(processor, path, engine):
+    """Analyse en flux sans rien garder (mesure de la mémoire)"""
+    frames = 0
+    for block in processor.stream_features(path, engine=engine):
+        frames += len(block["f0"])
+    return frames
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--durations", type=float, nargs="+", default=[2, 10, 30], help="durées (minutes)")
+    parser.add_argument("--engine", default="yin")
+    parser.add_argument("--budget-mb", type=float, default=96.0, help="pic maximal de l'analyse en flux")
+    parser.add_argument("--mfcc-tolerance", type=float, default=1e-2)
+    args = parser.parse_args()
+    
+    failed = False
+    processor = AudioProcessor(audio_cache_bytes=0)
+    with tempfile.TemporaryDirectory() as workdir:
+        paths = []
+        for minutes in args.durations:
+            path = os.path.join(workdir, f"session_{minutes:g}min.wav")
+            write_session(path, minutes)
+            paths.append(path)
+        
+        # Identité avec le traitement en mémoire, sur la session la plus courte
+        path = paths[0]
+        (stream, tracks), _, _ = measured(lambda: stream_tracks(processor, path, args.engine))
+        
+        def in_memory():
+            audio_data, sr = processor.load_audio(path)
+            return processor.compute_features(audio_data, sr, engine=args.engine)
+        
+        features, memory_time, memory_peak = measured(in_memory)
+        print(f"{args.durations[0]:g} min en mémoire: {memory_time:.2f} s, pic {memory_peak:.0f} Mo")
+        mismatches = [key for key in ("f0", "voiced_flag", "voiced_probs", "envelope")
+                      if not np.array_equal(tracks[key], features[key], equal_nan=True)]
+        if not np.array_equal(stream.spans, features["speech"]):
+            mismatches.append("speech")
+        mfcc_error = float(np.max(np.abs(tracks["mfcc"] - features["mfcc"])))
+        if mfcc_error > args.mfcc_tolerance:
+            mismatches.append("mfcc")
+        raw, sr = processor.read_audio(path)
+        if not np.array_equal(np.concatenate(list(streaming.normalized_blocks(path))), processor.normalize_audio(raw)):
+            mismatches.append("normalisation")
+        emphasized = np.concatenate(list(streaming.preemphasis_blocks(streaming.read_blocks(path))))
+        if not np.array_equal(emphasized, processor.apply_preemphasis(raw)):
+            mismatches.append("préaccentuation")
+        print(f"comparaison trame à trame: {len(features['f0'])} trames, écart MFCC max {mfcc_error:.2e}")
+        if mismatches:
+            print(f"ÉCHEC: résultats différents en flux: {', '.join(mismatches)}")
+            failed = True
+        del raw, features, tracks, stream
+        
+        print(f"{'durée':>10} {'temps':>9} {'pic':>9}")
+        for minutes, path in zip(args.durations, paths):
+            _, elapsed, peak = measured(lambda: consume(processor, path, args.engine))
+            print(f"{minutes:>6g} min {elapsed:8.2f}s {peak:6.0f} Mo")
+            if peak > args.budget_mb:
+                print(f"ÉCHEC: pic {peak:.0f} Mo > budget {args.budget_mb:g} Mo")
+                failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
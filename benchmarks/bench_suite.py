@@ -0,0 +1,173 @@
+"""Suite de benchmarks de l'analyse : AudioProcessor, ProsodyAnalyzer et comparaison
+
+Usage (depuis la racine du dépôt) :
+    python -m benchmarks.bench_suite [--durations 1 10 60 600] [--only extract_f0 comparison]
+                                     [-o resultats.json] [--baseline reference.json]
+
+Pour chaque durée, génère un signal synthétique déterministe (glissandos de F0,
+modulation d'amplitude, silences) et mesure le temps médian et minimal de
+chaque étape sur `--repeat` exécutions, puis le pic de mémoire allouée
+(tracemalloc, mesuré sur une exécution séparée pour ne pas fausser les temps).
+
+Les résultats sont enregistrés en JSON. Avec `--baseline`, chaque mesure est
+comparée à celle d'un run précédent : le script échoue si un temps (le minimum,
+moins bruité que la médiane) ou un pic de mémoire dépasse `--threshold` fois la
+référence. Les écarts de moins de `--min-delta` secondes ou d'1 Mo sont ignorés.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import soundfile as sf
+
+from benchmarks.synthetic import speech_like
+from modules.audio_processor import AudioProcessor
+from modules.comparison import compute_comparison
+from modules.prosody_analyzer import ProsodyAnalyzer
+
+def make_cases(processor, prosody_analyzer, audio_data, analysis_audio, sr, engine, paths):
+    """Étapes mesurées : nom -> fonction sans argument"""
+    return {
+        "detect_speech": lambda: processor.detect_speech(analysis_audio, sr),
+        "extract_f0": lambda: processor.extract_f0(analysis_audio, sr, engine=engine),
+        "extract_amplitude": lambda: processor.extract_amplitude(analysis_audio),
+        "extract_mfcc": lambda: processor.extract_mfcc(analysis_audio, sr),
+        "normalize_audio": lambda: processor.normalize_audio(audio_data),
+        "apply_preemphasis": lambda: processor.apply_preemphasis(audio_data),
+        "analyze_prosody": lambda: prosody_analyzer.analyze_prosody(analysis_audio, sr, engine=engine),
+        "comparison": lambda: compute_comparison(processor, paths[0], paths[1], sr, engine=engine),
+    }
+
+def measure(fn, repeat):
+    """Temps médian et minimal (s) sur `repeat` exécutions, puis pic de mémoire (Mo)"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "median_s": float(np.median(timings)),
+        "min_s": float(np.min(timings)),
+        "peak_mb": peak / 1024**2,
+        "repeat": repeat,
+    }
+
+def compare(results, baseline, threshold, min_delta=0.01):
+    """Lignes de comparaison avec une référence et liste des régressions"""
+    lines = []
+    regressions = []
+    for key, current in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        time_ratio = current["min_s"] / max(reference["min_s"], 1e-9)
+        memory_ratio = current["peak_mb"] / max(reference["peak_mb"], 1e-6)
+        flags = []
+        if time_ratio > threshold and current["min_s"] - reference["min_s"] > min_delta:
+            flags.append("temps")
+        if memory_ratio > threshold and current["peak_mb"] - reference["peak_mb"] > 1.0:
+            flags.append("mémoire")
+        if flags:
+            regressions.append(key)
+        lines.append(f"{key:>28} temps x{time_ratio:5.2f}  mémoire x{memory_ratio:5.2f}"
+                     + (f"  RÉGRESSION ({', '.join(flags)})" if flags else ""))
+    return lines, regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--durations", type=float, nargs="+", default=[1.0, 10.0, 60.0, 600.0])
+    parser.add_argument("--only", nargs="+", default=None, help="étapes à mesurer (par défaut toutes)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--engine", default=None, help="méthode F0 (défaut : celle d'AudioProcessor)")
+    parser.add_argument("-o", "--output", default=None, help="fichier JSON de résultats")
+    parser.add_argument("--baseline", default=None, help="résultats JSON de référence")
+    parser.add_argument("--threshold", type=float, default=1.25)
+    parser.add_argument("--min-delta", type=float, default=0.01)
+    args = parser.parse_args()
+    
+    processor = AudioProcessor()
+    prosody_analyzer = ProsodyAnalyzer()
+    engine = args.engine or processor.f0_engine
+    full_rate = processor.sample_rate
+    sr = processor.analysis_rate
+    workdir = tempfile.mkdtemp(prefix="bench_suite_")
+    
+    results = {}
+    print(f"{'étape':>28} {'médiane':>9} {'min':>9} {'pic mém.':>9}")
+    try:
+        for duration in args.durations:
+            audio_data, _ = speech_like(duration, sr=full_rate)
+            analysis_audio = processor.resample(audio_data, full_rate)
+            paths = []
+            for seed in (1, 2):
+                path = os.path.join(workdir, f"{duration:g}s_{seed}.wav")
+                sf.write(path, speech_like(duration, sr=full_rate, seed=seed)[0], full_rate)
+                paths.append(path)
+            
+            cases = make_cases(processor, prosody_analyzer, audio_data, analysis_audio, sr, engine, paths)
+            # Échauffement (compilation JIT de librosa) sur la première durée seulement
+            if not results:
+                for name, fn in cases.items():
+                    if args.only is None or name in args.only:
+                        fn()
+            
+            # Signaux longs : moins de répétitions
+            repeat = max(1, args.repeat if duration <= 60 else 1)
+            for name, fn in cases.items():
+                if args.only is not None and name not in args.only:
+                    continue
+                key = f"{name}@{duration:g}s"
+                results[key] = measure(fn, repeat)
+                r = results[key]
+                print(f"{key:>28} {r['median_s']:8.3f}s {r['min_s']:8.3f}s {r['peak_mb']:7.1f}Mo")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    
+    import librosa
+    report = {
+        "meta": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "librosa": librosa.__version__,
+            "machine": platform.platform(),
+            "engine": engine,
+            "analysis_rate": sr,
+        },
+        "results": results,
+    }
+    output = args.output or f"bench_suite_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Résultats: {output}")
+    
+    failed = False
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        lines, regressions = compare(results, baseline["results"], args.threshold, args.min_delta)
+        print(f"Comparaison avec {args.baseline} ({baseline['meta']['date']}) :")
+        print("\n".join(lines))
+        if regressions:
+            print(f"ÉCHEC: {len(regressions)} régression(s) au-delà de x{args.threshold:g}")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Benchmark de la reconnaissance des paires minimales (banque de gabarits MFCC)
+
+Usage (depuis la racine du dépôt) :
+    python -m benchmarks.bench_word_recognition [--references 5 30 100] [--tests 10]
+
+Construit une banque de `--references` prononciations synthétiques par mot
+(benchmarks.synthetic.word_like), puis reconnaît `--tests` nouvelles
+prononciations de chaque mot. Affiche l'exactitude, le temps médian de la
+recherche (LB_Keogh + DTW à abandon précoce) et celui d'une DTW complète contre
+tous les gabarits, ainsi que la part de gabarits écartés sans alignement.
+
+Échoue si l'exactitude est inférieure à `--min-accuracy`, ou si une référence
+de la banque, analysée à nouveau (distance nulle à son gabarit), n'est pas
+reconnue avec une confiance finie.
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import WORD_SHAPES, word_like
+from modules.alignment import dtw_templates
+from modules.phoneme_analyzer import PhonemeAnalyzer
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--references", type=int, nargs="+", default=[5, 30, 100])
+    parser.add_argument("--tests", type=int, default=10)
+    parser.add_argument("--sr", type=int, default=16000)
+    parser.add_argument("--min-accuracy", type=float, default=0.95)
+    args = parser.parse_args()
+    
+    words = list(WORD_SHAPES)
+    failed = False
+    print(f"{'gabarits':>9} {'exactitude':>11} {'recherche':>10} {'DTW complète':>13} {'écartés':>8}")
+    for references in args.references:
+        analyzer = PhonemeAnalyzer()
+        for i, word in enumerate(words):
+            for seed in range(references):
+                analyzer.add_reference(word, word_like(word, args.sr, seed=1000 * i + seed), args.sr)
+        bank = analyzer.template_bank
+        
+        correct = 0
+        search_times = []
+        brute_times = []
+        skipped = []
+        for i, word in enumerate(words):
+            for seed in range(args.tests):
+                audio_data = word_like(word, args.sr, seed=10**6 + 1000 * i + seed)
+                result = analyzer.analyze_phonemes(audio_data, args.sr)
+                correct += result["phonemes"][0] == word
+                
+                query = analyzer.token_features(analyzer.trim(audio_data, args.sr)[0], args.sr)
+                start = time.perf_counter()
+                _, _, stats = bank.search(query, cutoff_ratio=10 * analyzer.temperature)
+                search_times.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                dtw_templates(query, bank.templates, bank.band)
+                brute_times.append(time.perf_counter() - start)
+                skipped.append((stats["pruned"] + stats["abandoned"]) / stats["templates"])
+        
+        # Référence de la banque analysée à nouveau : correspondance exacte (distance 0)
+        for i, word in enumerate(words):
+            result = analyzer.analyze_phonemes(word_like(word, args.sr, seed=1000 * i), args.sr)
+            if not result["phonemes"] or result["phonemes"][0] != word or not np.isfinite(result["confidence"][0]):
+                print(f"ÉCHEC: référence « {word} » de la banque non reconnue: {result['phonemes'][:2]} "
+                      f"{result['confidence'][:2]}")
+                failed = True
+        
+        accuracy = correct / (len(words) * args.tests)
+        print(f"{len(bank):>9} {accuracy:10.1%} {np.median(search_times) * 1000:8.1f}ms "
+              f"{np.median(brute_times) * 1000:11.1f}ms {np.mean(skipped):7.0%}")
+        failed |= accuracy < args.min_accuracy
+    
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Signaux synthétiques de type parole pour les benchmarks"""
+
+import numpy as np
+
+def speech_like(duration, sr=44100, seed=0, f0_start=180.0, f0_end=120.0, hop_length=512):
+    """Générer une « phrase » synthétique et sa F0 de référence par trame
+    
+    Le signal alterne des syllabes voisées (glissando de F0, riche en harmoniques,
+    modulé en amplitude) et des pauses silencieuses légèrement bruitées.
+    Renvoie `(audio, f0_reference)` ; la référence vaut NaN hors voisement et suit
+    le découpage en trames centrées de `librosa.pyin`.
+    """
+    rng = np.random.default_rng(seed)
+    n = int(duration * sr)
+    t = np.arange(n) / sr
+    
+    # Contour de F0 : déclinaison globale + ondulation syllabique
+    f0 = np.interp(t, [0, duration], [f0_start, f0_end]) * (1 + 0.08 * np.sin(2 * np.pi * 0.7 * t))
+    
+    # Alternance syllabes (~180 ms) / pauses (~120 ms), pauses plus longues aléatoires
+    voiced = np.zeros(n, dtype=bool)
+    pos = int(0.2 * sr)
+    while pos < n:
+        length = int(rng.uniform(0.12, 0.25) * sr)
+        voiced[pos:pos + length] = True
+        pos += length + int(rng.choice([0.08, 0.12, 0.4], p=[0.5, 0.4, 0.1]) * sr)
+    
+    phase = 2 * np.pi * np.cumsum(f0) / sr
+    harmonics = sum(np.sin(k * phase) / k for k in range(1, 9))
+    envelope = voiced.astype(np.float64)
+    ramp = np.hanning(int(0.02 * sr))
+    envelope = np.convolve(envelope, ramp / ramp.sum(), mode="same")
+    envelope *= 1 + 0.3 * np.sin(2 * np.pi * 4 * t)
+    
+    audio = 0.2 * harmonics * envelope + 0.002 * rng.standard_normal(n)
+    audio = audio.astype(np.float32)
+    
+    # Référence par trame : voisée si la trame est entièrement dans une syllabe
+    centers = np.arange(1 + n // hop_length) * hop_length
+    centers = np.minimum(centers, n - 1)
+    f0_reference = np.where(voiced[centers] & (envelope[centers] > 0.5), f0[centers], np.nan)
+    return audio, f0_reference
+
+# Mots synthétiques : attaque (friction, explosion, voisement ou rien), voyelle
+# (deux formants) et coda éventuelle, de quoi distinguer les paires minimales
+WORD_SHAPES = {
+    "fil": ("friction", (300, 2300), None),
+    "fille": ("friction", (300, 2300), "yod"),
+    "fils": ("friction", (300, 2300), "sifflante"),
+    "con": ("explosion_grave", (500, 900), None),
+    "ton": ("explosion_aigue", (500, 900), None),
+    "pont": ("explosion_mediane", (500, 900), None),
+    "rein": (None, (600, 1600), None),
+    "train": ("explosion_aigue", (600, 1600), None),
+    "frein": ("friction", (600, 1600), None),
+    "bille": ("voisement", (300, 2300), "yod"),
+    "quille": ("explosion_grave", (300, 2300), "yod"),
+}
+
+def word_like(word, sr=16000, seed=0):
+    """Générer un mot isolé synthétique (voir WORD_SHAPES), entouré de silence
+    
+    Durées, F0 et silences varient avec `seed` : plusieurs tirages d'un même mot
+    jouent le rôle de plusieurs prononciations.
+    """
+    from scipy import signal
+    
+    rng = np.random.default_rng(seed)
+    onset, formants, coda = WORD_SHAPES[word]
+    parts = [np.zeros(int(rng.uniform(0.1, 0.3) * sr))]
+    if onset == "friction":
+        b, a = signal.butter(4, 3000, "high", fs=sr)
+        parts.append(0.3 * signal.lfilter(b, a, rng.standard_normal(int(rng.uniform(0.08, 0.14) * sr))))
+    elif onset is not None and onset.startswith("explosion"):
+        center = {"explosion_grave": 1200, "explosion_mediane": 800, "explosion_aigue": 4000}[onset]
+        b, a = signal.butter(2, [0.6 * center, min(1.5 * center, 0.45 * sr)], "band", fs=sr)
+        parts.append(np.zeros(int(0.04 * sr)))
+        parts.append(0.5 * signal.lfilter(b, a, rng.standard_normal(int(0.03 * sr))))
+    elif onset == "voisement":
+        parts.append(0.2 * np.sin(2 * np.pi * 120 * np.arange(int(0.05 * sr)) / sr))
+    
+    # Voyelle : source harmonique filtrée par deux formants
+    t = np.arange(int(rng.uniform(0.2, 0.35) * sr)) / sr
+    f0 = rng.uniform(100, 220)
+    source = sum(np.sin(2 * np.pi * k * f0 * t) / k for k in range(1, 30))
+    vowel = np.zeros_like(t)
+    for formant in formants:
+        b, a = signal.iirpeak(formant, 5, fs=sr)
+        vowel += signal.lfilter(b, a, source)
+    vowel *= np.hanning(len(vowel)) ** 0.3
+    parts.append(0.3 * vowel / np.abs(vowel).max())
+    
+    if coda == "yod":
+        b, a = signal.iirpeak(3000, 5, fs=sr)
+        parts.append(0.2 * signal.lfilter(b, a, source[:int(0.1 * sr)]))
+    elif coda == "sifflante":
+        b, a = signal.butter(4, 5000, "high", fs=sr)
+        parts.append(0.3 * signal.lfilter(b, a, rng.standard_normal(int(0.12 * sr))))
+    parts.append(np.zeros(int(rng.uniform(0.1, 0.3) * sr)))
+    
+    audio = np.concatenate(parts)
+    return (audio + 0.002 * rng.standard_normal(len(audio))).astype(np.float32)
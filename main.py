@@ -1,27 +1,49 @@
 """
 Application d'Analyse de Phonologie en Français
 GUI desktop pour l'analyse phonématique et prosodique
+
+Les modules lourds (librosa, scipy.signal, matplotlib, sounddevice) ne sont
+importés qu'à leur première utilisation ; la fenêtre s'affiche sans eux.
 """
 
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 import numpy as np
-import sounddevice as sd
-import soundfile as sf
-from scipy import signal
-import librosa
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
 import os
+import threading
 from datetime import datetime
 
 from modules.phoneme_analyzer import PhonemeAnalyzer
 from modules.prosody_analyzer import ProsodyAnalyzer
 from modules.audio_processor import AudioProcessor
+from modules.analysis_executor import AnalysisExecutor
+from modules.catalogue import RecordingCatalogue, compute_summary
+from modules.comparison import compute_comparison, compute_multi_comparison
+from modules.f0_engines import F0_ENGINES
+from modules import instrumentation
+from modules.instrumentation import traced
+from modules.live_analysis import LiveAnalyzer
+from modules.recorder import StreamingRecorder
+
+# Libellés des tris proposés pour les listes d'enregistrements (clés de catalogue.SORT_KEYS)
+SORT_LABELS = {
+    "Nom": "name",
+    "Date": "mtime",
+    "Modalité": "mode",
+    "Locuteur": "speaker",
+    "Durée": "duration",
+    "F0 moyenne": "f0_mean",
+}
+
+# Durée d'enregistrement d'un mot isolé (secondes)
+WORD_DURATION = 1.5
+
+# Modules importés en arrière-plan une fois la fenêtre affichée
+PREWARM_MODULES = ["scipy.signal", "librosa", "librosa.feature", "matplotlib.figure",
+                   "matplotlib.backends.backend_agg", "sounddevice"]
 
 class PhonologyAnalysisApp:
-    def __init__(self, root):
+    def __init__(self, root, prewarm=True):
         self.root = root
         self.root.title("Application d'Analyse de Phonologie")
         self.root.geometry("1400x900")
@@ -32,18 +54,40 @@ class PhonologyAnalysisApp:
         # Initialisation des analyseurs
         self.phoneme_analyzer = PhonemeAnalyzer()
         self.prosody_analyzer = ProsodyAnalyzer()
-        self.audio_processor = AudioProcessor()
+        self.audio_processor = AudioProcessor(cache_dir=os.path.join("enregistrements", ".cache"))
+        # Longs enregistrements : F0 calculée sur tous les cœurs
+        self.audio_processor.f0_workers = os.cpu_count() or 1
         
         # Stockage des enregistrements
         self.recordings = {}
-        self.current_audio = None
+        self.current_audio_path = None
         self.sample_rate = 44100
         
-        # Dossier des enregistrements
+        # Dossier des enregistrements, catalogué dans une base SQLite
         os.makedirs("enregistrements", exist_ok=True)
+        self.catalogue = RecordingCatalogue("enregistrements")
+        
+        # Analyses en arrière-plan, relayées à l'interface par sondage ; celles que l'utilisateur
+        # attend (comparaisons, reconnaissance) ne passent pas derrière le catalogue et les .feat
+        self.analysis_executor = AnalysisExecutor(interactive=("comparison", "alignment", "recognition"))
+        self.live_analyzer = None
+        self.live_views = []
+        
+        # État de l'enregistrement (l'onglet Enregistrement est construit à la demande)
+        self.recording_is_active = False
+        self.current_recording_stream = None
+        self.current_recorder = None
         
         # Création de l'interface
         self.create_ui()
+        self.root.after(50, self.poll_analysis)
+        if prewarm:
+            self.root.after(500, self.prewarm_modules)
+        
+        # Listes remplies depuis le catalogue, puis mises à jour par un parcours incrémental
+        self.update_recordings_list()
+        self.scan_recordings()
+        self.load_word_references()
     
     def setup_style(self):
         """Configuration du thème de l'application"""
@@ -77,17 +121,132 @@ class PhonologyAnalysisApp:
         self.notebook = ttk.Notebook(self.root)
         self.notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
-        # Onglets
-        self.create_phoneme_tab()
-        self.create_prosody_tab()
-        self.create_recorder_tab()
-        self.create_comparison_tab()
+        # Onglets : cadres vides, remplis à leur première sélection
+        self.tabs = {}
+        for key, text, build in (("phoneme", "Phonématique", self.create_phoneme_tab),
+                                 ("prosody", "Prosodie", self.create_prosody_tab),
+                                 ("recorder", "Enregistrement", self.create_recorder_tab),
+                                 ("comparison", "Comparaison", self.create_comparison_tab),
+                                 ("alignment", "Comparaison multiple", self.create_alignment_tab)):
+            frame = ttk.Frame(self.notebook)
+            self.notebook.add(frame, text=text)
+            self.tabs[key] = {"frame": frame, "build": build, "built": False}
+        self.create_performance_tab()
+        self.ensure_tab("phoneme")
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
     
-    def create_phoneme_tab(self):
-        """Onglet Phonématique - Paires Minimales"""
+    def ensure_tab(self, key):
+        """Construire un onglet s'il ne l'est pas encore"""
+        tab = self.tabs[key]
+        if tab["built"]:
+            return
+        tab["built"] = True
+        tab["build"](tab["frame"])
+        if key in ("recorder", "comparison", "alignment"):
+            self.update_recordings_list()
+    
+    def on_tab_changed(self, event=None):
+        """Construire l'onglet sélectionné à sa première ouverture"""
+        selected = self.notebook.select()
+        for key, tab in self.tabs.items():
+            if str(tab["frame"]) == selected:
+                self.ensure_tab(key)
+    
+    def prewarm_modules(self):
+        """Importer les modules lourds dans un thread, une fois la fenêtre affichée"""
+        def run():
+            import importlib
+            for name in PREWARM_MODULES:
+                try:
+                    importlib.import_module(name)
+                except Exception as exc:
+                    print(f"Préchargement de {name} impossible: {exc}")
+        threading.Thread(target=run, name="prewarm", daemon=True).start()
+    
+    def create_performance_tab(self):
+        """Onglet Performance, caché : Ctrl+Maj+P l'affiche et active les mesures"""
         frame = ttk.Frame(self.notebook)
-        self.notebook.add(frame, text="Phonématique")
-        
+        self.performance_frame = frame
+        self.notebook.add(frame, text="Performance")
+        
+        toolbar = ttk.Frame(frame)
+        toolbar.pack(fill=tk.X, padx=20, pady=10)
+        self.tracing_var = tk.BooleanVar(value=instrumentation.is_enabled())
+        ttk.Checkbutton(toolbar, text="Mesurer les étapes", variable=self.tracing_var,
+                        command=self.toggle_tracing).pack(side=tk.LEFT, padx=5)
+        ttk.Button(toolbar, text="Rafraîchir", command=self.update_performance_view).pack(side=tk.LEFT, padx=5)
+        ttk.Button(toolbar, text="Effacer", command=self.clear_performance_view).pack(side=tk.LEFT, padx=5)
+        ttk.Button(toolbar, text="Exporter la trace…", command=self.export_trace).pack(side=tk.LEFT, padx=5)
+        
+        # Dernières opérations, dépliables en étapes
+        self.performance_tree = ttk.Treeview(frame, columns=("duration", "memory"), height=25)
+        self.performance_tree.heading("#0", text="Opération / étape")
+        self.performance_tree.heading("duration", text="Durée (ms)")
+        self.performance_tree.heading("memory", text="Mémoire (Mo)")
+        self.performance_tree.column("#0", width=500)
+        self.performance_tree.column("duration", width=120, anchor=tk.E)
+        self.performance_tree.column("memory", width=120, anchor=tk.E)
+        self.performance_tree.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
+        
+        if not instrumentation.is_enabled():
+            self.notebook.hide(frame)
+        self.root.bind_all("<Control-Shift-P>", self.toggle_performance_tab)
+    
+    def toggle_performance_tab(self, event=None):
+        """Afficher ou cacher l'onglet Performance"""
+        if self.notebook.tab(self.performance_frame, "state") == "hidden":
+            self.notebook.add(self.performance_frame)
+            self.notebook.select(self.performance_frame)
+            self.tracing_var.set(True)
+            self.toggle_tracing()
+        else:
+            self.notebook.hide(self.performance_frame)
+    
+    def toggle_tracing(self):
+        """Activer ou désactiver les mesures"""
+        if self.tracing_var.get():
+            instrumentation.enable()
+            self.update_performance_view()
+        else:
+            instrumentation.disable()
+    
+    def update_performance_view(self):
+        """Afficher les dernières opérations (rafraîchi chaque seconde tant que l'onglet est visible)"""
+        tree = self.performance_tree
+        tree.delete(*tree.get_children())
+        
+        def insert(parent, s):
+            memory = "" if s.memory_delta is None else f"{s.memory_delta / 1024**2:+.1f}"
+            item = tree.insert(parent, tk.END, text=s.name, values=(f"{s.duration_ms:.1f}", memory))
+            for child in s.children:
+                insert(item, child)
+        
+        for operation in instrumentation.recent_operations():
+            insert("", operation)
+        
+        if instrumentation.is_enabled() and self.notebook.tab(self.performance_frame, "state") != "hidden":
+            if getattr(self, "_performance_refresh", None) is not None:
+                self.root.after_cancel(self._performance_refresh)
+            self._performance_refresh = self.root.after(1000, self.update_performance_view)
+        else:
+            self._performance_refresh = None
+    
+    def clear_performance_view(self):
+        """Oublier les mesures enregistrées"""
+        instrumentation.clear()
+        self.update_performance_view()
+    
+    def export_trace(self):
+        """Exporter les mesures au format Chrome trace-event (chrome://tracing, Perfetto)"""
+        path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("Trace JSON", "*.json")],
+                                            initialfile=f"trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        if not path:
+            return
+        count = instrumentation.export_chrome_trace(path)
+        messagebox.showinfo("Performance", f"{count} étapes exportées dans {path}")
+    
+    def create_phoneme_tab(self, frame):
+        """Onglet Phonématique - Paires Minimales"""
         # Titre
         title = ttk.Label(frame, text="Paires Minimales en Français", font=("Segoe UI", 14, "bold"))
         title.pack(padx=20, pady=15)
@@ -108,20 +267,11 @@ class PhonologyAnalysisApp:
         scrollable_frame = ttk.Frame(canvas)
         canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
 
-        # Add some content to the scrollable frame
-        for i in range(50):
-            ttk.Label(scrollable_frame, text=f"This is line {i}").pack(pady=2)
-
         # Update the scrollregion of the canvas whenever the scrollable_frame's size changes
         scrollable_frame.bind(
             "<Configure>",
             lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
         )
-
-        self.root.mainloop()
-        
-        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
         
         # Affichage des paires
         for i, paire in enumerate(paires, 1):
@@ -138,14 +288,177 @@ class PhonologyAnalysisApp:
                            font=("Segoe UI", 9), foreground="#00d4ff")
             desc.pack(side=tk.LEFT, padx=10)
         
+        self.create_word_recognizer(frame)
         canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
     
-    def create_prosody_tab(self):
-        """Onglet Prosodie"""
-        frame = ttk.Frame(self.notebook)
-        self.notebook.add(frame, text="Prosodie")
+    def create_word_recognizer(self, parent):
+        """Reconnaissance des paires minimales : références par mot, puis mot à reconnaître"""
+        panel = ttk.LabelFrame(parent, text="Reconnaissance des paires minimales", padding=10)
+        panel.pack(side=tk.BOTTOM, fill=tk.X, padx=20, pady=10)
+        words = self.phoneme_analyzer.get_words()
+        
+        # Banque de gabarits : quelques enregistrements de référence par mot
+        reference_frame = ttk.Frame(panel)
+        reference_frame.pack(fill=tk.X, pady=5)
+        ttk.Label(reference_frame, text="Mot de référence:").pack(side=tk.LEFT, padx=5)
+        self.reference_word_var = tk.StringVar(value=words[0])
+        ttk.Combobox(reference_frame, textvariable=self.reference_word_var, values=words,
+                     state="readonly", width=10).pack(side=tk.LEFT, padx=5)
+        ttk.Button(reference_frame, text="🎤 Enregistrer une référence",
+                  command=lambda: self.record_word("reference")).pack(side=tk.LEFT, padx=5)
+        ttk.Button(reference_frame, text="Importer un WAV...",
+                  command=self.import_word_reference).pack(side=tk.LEFT, padx=5)
+        self.reference_status_var = tk.StringVar(value="")
+        ttk.Label(reference_frame, textvariable=self.reference_status_var,
+                 font=("Segoe UI", 9)).pack(side=tk.LEFT, padx=10)
+        
+        # Mot à reconnaître, parmi une paire ou parmi tous les mots de la banque
+        test_frame = ttk.Frame(panel)
+        test_frame.pack(fill=tk.X, pady=5)
+        ttk.Label(test_frame, text="Paire:").pack(side=tk.LEFT, padx=5)
+        pairs = ["Tous les mots"] + [f"{paire['mot1']} / {paire['mot2']}"
+                                     for paire in self.phoneme_analyzer.get_paires_minimales()]
+        self.recognition_pair_var = tk.StringVar(value=pairs[0])
+        ttk.Combobox(test_frame, textvariable=self.recognition_pair_var, values=pairs,
+                     state="readonly", width=16).pack(side=tk.LEFT, padx=5)
+        ttk.Button(test_frame, text="🎤 Prononcer et reconnaître",
+                  command=lambda: self.record_word("recognition")).pack(side=tk.LEFT, padx=5)
+        ttk.Button(test_frame, text="Analyser un WAV...",
+                  command=self.recognize_word_file).pack(side=tk.LEFT, padx=5)
+        
+        self.recognition_result_var = tk.StringVar(value="")
+        ttk.Label(panel, textvariable=self.recognition_result_var, font=("Courier New", 9),
+                 justify=tk.LEFT).pack(anchor=tk.W, padx=5, pady=5)
+        self.update_reference_status()
+    
+    def update_reference_status(self):
+        """Afficher le nombre de gabarits de la banque, par mot"""
+        if not self.tabs["phoneme"]["built"]:
+            return
+        counts = self.phoneme_analyzer.template_bank.counts()
+        if not counts:
+            self.reference_status_var.set("Banque vide : enregistrez quelques références par mot")
+            return
+        details = ", ".join(f"{word} {count}" for word, count in counts.items())
+        self.reference_status_var.set(f"Banque: {sum(counts.values())} gabarits ({details})")
+    
+    def load_word_references(self):
+        """Charger en arrière-plan la banque de gabarits depuis enregistrements/.mots/"""
+        if not os.path.isdir(self.phoneme_analyzer.reference_directory("enregistrements")):
+            return
+        self.analysis_executor.submit(
+            "references",
+            lambda job: self.phoneme_analyzer.load_references("enregistrements", self.audio_processor.load_audio),
+            on_done=lambda count: self.update_reference_status(),
+            on_error=lambda exc: print(f"Chargement des références impossible: {exc}"),
+        )
+    
+    def record_word(self, purpose):
+        """Enregistrer un mot isolé (durée fixe), comme référence ou pour la reconnaissance"""
+        import sounddevice as sd
+        
+        if self.recording_is_active:
+            messagebox.showwarning("Enregistrement", "Un enregistrement est déjà en cours")
+            return
+        self.recording_is_active = True
+        target = self.reference_status_var if purpose == "reference" else self.recognition_result_var
+        target.set(f"Parlez maintenant ({WORD_DURATION:g} s)...")
+        audio_data = sd.rec(int(WORD_DURATION * self.sample_rate), samplerate=self.sample_rate, channels=1)
+        self.root.after(int(WORD_DURATION * 1000) + 100, lambda: self.on_word_recorded(purpose, audio_data))
+    
+    def on_word_recorded(self, purpose, audio_data):
+        """Traiter un mot isolé une fois son enregistrement terminé"""
+        import sounddevice as sd
+        import soundfile as sf
+        
+        sd.wait()
+        self.recording_is_active = False
+        audio_data = audio_data[:, 0]
+        if purpose == "reference":
+            word = self.reference_word_var.get()
+            name = f"{word}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            path = self.phoneme_analyzer.reference_path("enregistrements", word, name)
+            sf.write(path, audio_data, self.sample_rate)
+            self.add_word_reference(word, path)
+        else:
+            self.recognize_word(audio_data, self.sample_rate)
+    
+    def import_word_reference(self):
+        """Ajouter un WAV existant comme référence du mot sélectionné"""
+        import shutil
         
+        source = filedialog.askopenfilename(filetypes=[("Fichiers WAV", "*.wav")])
+        if not source:
+            return
+        word = self.reference_word_var.get()
+        name = f"{word}_{os.path.splitext(os.path.basename(source))[0]}"
+        path = self.phoneme_analyzer.reference_path("enregistrements", word, name)
+        shutil.copyfile(source, path)
+        self.add_word_reference(word, path)
+    
+    def add_word_reference(self, word, path):
+        """Calculer le gabarit d'une référence en arrière-plan et l'ajouter à la banque"""
+        def run(job):
+            audio_data, sr = self.audio_processor.load_audio(path)
+            self.phoneme_analyzer.add_reference(word, audio_data, sr, source=path)
+        
+        # Un canal par fichier : deux références successives ne s'annulent pas
+        self.analysis_executor.submit(
+            f"reference:{path}", run,
+            on_done=lambda result: self.update_reference_status(),
+            on_error=lambda exc: messagebox.showerror("Erreur", f"Référence inutilisable: {exc}"),
+        )
+    
+    def recognize_word_file(self):
+        """Reconnaître le mot d'un fichier WAV"""
+        path = filedialog.askopenfilename(filetypes=[("Fichiers WAV", "*.wav")])
+        if path:
+            self.recognize_word(path=path)
+    
+    def recognize_word(self, audio_data=None, sr=None, path=None):
+        """Reconnaître un mot isolé en arrière-plan (signal enregistré ou fichier)"""
+        if len(self.phoneme_analyzer.template_bank) == 0:
+            messagebox.showwarning("Erreur", "Enregistrez d'abord des références pour les mots")
+            return
+        pair = self.recognition_pair_var.get()
+        candidates = None if pair == "Tous les mots" else tuple(pair.split(" / "))
+        
+        def run(job):
+            if path is not None:
+                samples, rate = self.audio_processor.load_audio(path)
+            else:
+                samples = self.audio_processor.resample(audio_data, sr)
+                rate = self.audio_processor.analysis_rate
+            return self.phoneme_analyzer.analyze_phonemes(samples, rate, candidates=candidates)
+        
+        self.recognition_result_var.set("Reconnaissance...")
+        self.analysis_executor.submit(
+            "recognition", run,
+            on_done=self.show_recognition,
+            on_error=lambda exc: self.recognition_result_var.set(f"Échec de la reconnaissance: {exc}"),
+        )
+    
+    def show_recognition(self, result):
+        """Afficher les mots reconnus, leur confiance et le segment qui les départage"""
+        if not result["phonemes"]:
+            self.recognition_result_var.set("Aucun gabarit pour ces mots")
+            return
+        lines = []
+        for word, confidence in zip(result["phonemes"][:5], result["confidence"][:5]):
+            bar = "█" * int(round(confidence * 20))
+            lines.append(f"{word:>8} {confidence * 100:5.1f} % {bar}")
+        contrast = result.get("contrast")
+        if contrast:
+            lines.append(f"Contraste {contrast['word']} / {contrast['versus']}: "
+                         f"{contrast['start']:.2f} s – {contrast['end']:.2f} s")
+        stats = result["stats"]
+        lines.append(f"{stats['templates']} gabarits : {stats['pruned']} écartés par LB_Keogh, "
+                     f"{stats['abandoned']} alignements abandonnés")
+        self.recognition_result_var.set("\n".join(lines))
+    
+    def create_prosody_tab(self, frame):
+        """Onglet Prosodie"""
         # Titre
         title = ttk.Label(frame, text="Analyse Prosodique: 'Tu fermes la grande porte'", 
                          font=("Segoe UI", 14, "bold"))
@@ -165,6 +478,9 @@ class PhonologyAnalysisApp:
             
             # Contenu pour chaque modalité
             self.create_prosody_mode_content(mode_frame, mode)
+        
+        # Contour en direct pendant l'enregistrement
+        self.create_live_view(frame)
     
     def create_prosody_mode_content(self, frame, mode):
         """Contenu pour chaque modalité prosodique"""
@@ -192,11 +508,8 @@ class PhonologyAnalysisApp:
                             wraplength=400, justify=tk.LEFT)
             label.pack(anchor=tk.W, pady=5)
     
-    def create_recorder_tab(self):
+    def create_recorder_tab(self, frame):
         """Onglet Enregistrement"""
-        frame = ttk.Frame(self.notebook)
-        self.notebook.add(frame, text="Enregistrement")
-        
         # Titre
         title = ttk.Label(frame, text="Enregistrer et Analyser", font=("Segoe UI", 14, "bold"))
         title.pack(padx=20, pady=15)
@@ -229,10 +542,15 @@ class PhonologyAnalysisApp:
         ttk.Button(button_frame, text="▶️ Écouter", 
                   command=self.play_custom_recording).pack(side=tk.LEFT, padx=5)
         
+        # Contour en direct pendant l'enregistrement
+        self.create_live_view(frame)
+        
         # Zone d'affichage des enregistrements
         list_frame = ttk.LabelFrame(frame, text="Enregistrements", padding=15)
         list_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
         
+        self.recorder_filter = self.create_recording_filter(list_frame)
+        
         # Listbox des enregistrements
         self.recordings_listbox = tk.Listbox(list_frame, bg="#1a1f3a", fg="#e0e0e0",
                                            selectmode=tk.SINGLE, height=10)
@@ -242,16 +560,102 @@ class PhonologyAnalysisApp:
                                 command=self.recordings_listbox.yview)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.recordings_listbox.configure(yscrollcommand=scrollbar.set)
+    
+    def create_recording_filter(self, parent):
+        """Barre de filtre et de tri d'une liste d'enregistrements"""
+        bar = ttk.Frame(parent)
+        bar.pack(side=tk.TOP, fill=tk.X, pady=(0, 8))
+        
+        filters = {
+            "text": tk.StringVar(),
+            "mode": tk.StringVar(),
+            "sort": tk.StringVar(value="Nom"),
+            "descending": tk.BooleanVar(value=False),
+        }
+        ttk.Label(bar, text="Filtrer:").pack(side=tk.LEFT, padx=5)
+        ttk.Entry(bar, textvariable=filters["text"], width=20).pack(side=tk.LEFT, padx=5)
+        ttk.Label(bar, text="Modalité:").pack(side=tk.LEFT, padx=5)
+        filters["mode_combo"] = ttk.Combobox(bar, textvariable=filters["mode"], state="readonly", width=14)
+        filters["mode_combo"].pack(side=tk.LEFT, padx=5)
+        ttk.Label(bar, text="Trier par:").pack(side=tk.LEFT, padx=5)
+        ttk.Combobox(bar, textvariable=filters["sort"], values=list(SORT_LABELS),
+                     state="readonly", width=12).pack(side=tk.LEFT, padx=5)
+        ttk.Checkbutton(bar, text="Décroissant", variable=filters["descending"]).pack(side=tk.LEFT, padx=5)
+        
+        for key in ("text", "mode", "sort", "descending"):
+            filters[key].trace_add("write", lambda *args: self.update_recordings_list())
+        return filters
+    
+    def query_recordings(self, filters):
+        """Enregistrements du catalogue selon une barre de filtre"""
+        return self.catalogue.query(text=filters["text"].get().strip(),
+                                    mode=filters["mode"].get() or None,
+                                    order_by=SORT_LABELS[filters["sort"].get()],
+                                    descending=filters["descending"].get())
+    
+    def create_live_view(self, parent):
+        """Zone du petit graphique F0/RMS mis à jour pendant l'enregistrement"""
+        live_frame = ttk.LabelFrame(parent, text="Analyse en direct", padding=5)
+        live_frame.pack(fill=tk.X, padx=20, pady=5)
+        figure_frame = ttk.Frame(live_frame)
+        figure_frame.pack(fill=tk.X)
+        
+        status_var = tk.StringVar(value="")
+        ttk.Label(live_frame, textvariable=status_var, font=("Segoe UI", 8)).pack(anchor=tk.W)
+        
+        view = {"frame": figure_frame, "canvas": None, "status": status_var}
+        self.live_views.append(view)
+        # La figure (et matplotlib) n'est créée qu'au premier enregistrement
+        if self.recording_is_active:
+            self.create_live_figure(view)
+    
+    def create_live_figure(self, view):
+        """Créer le graphique F0/RMS d'une zone d'analyse en direct"""
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.figure import Figure
+        
+        fig = Figure(figsize=(8, 1.8), dpi=100, facecolor="#0a0e27")
+        ax_f0 = fig.add_subplot(1, 2, 1)
+        ax_rms = fig.add_subplot(1, 2, 2)
+        for ax, title in ((ax_f0, "F0 (Hz)"), (ax_rms, "RMS")):
+            ax.set_title(title, color="#e0e0e0", fontsize=9)
+            ax.set_facecolor("#1a1f3a")
+            ax.tick_params(colors="#e0e0e0", labelsize=7)
+        ax_f0.set_ylim(50, 450)
+        ax_rms.set_ylim(0, 0.3)
+        f0_line, = ax_f0.plot([], [], color="#00d4ff", linewidth=1.5)
+        rms_line, = ax_rms.plot([], [], color="#00ff88", linewidth=1)
+        fig.tight_layout()
         
-        self.recording_is_active = False
-        self.current_recording_stream = None
-        self.current_recording_frames = []
+        canvas = FigureCanvasTkAgg(fig, master=view["frame"])
+        canvas.get_tk_widget().pack(fill=tk.X)
+        canvas.draw()
+        view.update({"canvas": canvas, "axes": (ax_f0, ax_rms), "lines": (f0_line, rms_line)})
     
-    def create_comparison_tab(self):
-        """Onglet Comparaison"""
-        frame = ttk.Frame(self.notebook)
-        self.notebook.add(frame, text="Comparaison")
+    def update_live_views(self):
+        """Rafraîchir les contours en direct (toutes les 100 ms pendant l'enregistrement)"""
+        if not self.recording_is_active or self.live_analyzer is None:
+            return
         
+        times, f0, rms = self.live_analyzer.snapshot()
+        for view in self.live_views:
+            # Inutile de redessiner un onglet caché
+            if not view["canvas"].get_tk_widget().winfo_ismapped():
+                continue
+            f0_line, rms_line = view["lines"]
+            f0_line.set_data(times, f0)
+            rms_line.set_data(times, rms)
+            if len(times):
+                for ax in view["axes"]:
+                    ax.set_xlim(max(0.0, times[-1] - 10.0), max(times[-1], 1.0))
+            view["status"].set(f"Blocs perdus: {self.live_analyzer.dropped_blocks} · "
+                               f"en retard: {self.live_analyzer.late_blocks}")
+            view["canvas"].draw_idle()
+        
+        self.root.after(100, self.update_live_views)
+    
+    def create_comparison_tab(self, frame):
+        """Onglet Comparaison"""
         title = ttk.Label(frame, text="Comparaison des Paramètres Acoustiques", 
                          font=("Segoe UI", 14, "bold"))
         title.pack(padx=20, pady=15)
@@ -259,6 +663,9 @@ class PhonologyAnalysisApp:
         # Sélection des enregistrements
         select_frame = ttk.LabelFrame(frame, text="Sélectionner les enregistrements", padding=15)
         select_frame.pack(fill=tk.X, padx=20, pady=10)
+        self.comparison_filter = self.create_recording_filter(select_frame)
+        select_frame = ttk.Frame(select_frame)
+        select_frame.pack(fill=tk.X)
         
         # Enregistrement 1
         ttk.Label(select_frame, text="Enregistrement 1:").pack(side=tk.LEFT, padx=10)
@@ -271,13 +678,94 @@ class PhonologyAnalysisApp:
         self.comparison_var2 = tk.StringVar()
         combo2 = ttk.Combobox(select_frame, textvariable=self.comparison_var2, state="readonly", width=25)
         combo2.pack(side=tk.LEFT, padx=5)
+        self.comparison_combos = (combo1, combo2)
+        
+        # Méthode F0 : pYIN pour l'analyse finale, YIN/autocorrélation en aperçu rapide
+        ttk.Label(select_frame, text="Méthode F0:").pack(side=tk.LEFT, padx=10)
+        self.f0_engine_var = tk.StringVar(value=self.audio_processor.f0_engine)
+        ttk.Combobox(select_frame, textvariable=self.f0_engine_var, values=list(F0_ENGINES),
+                     state="readonly", width=10).pack(side=tk.LEFT, padx=5)
+        
+        # Fréquence d'analyse : F0, enveloppe et MFCC sur le signal rééchantillonné
+        ttk.Label(select_frame, text="Analyse (Hz):").pack(side=tk.LEFT, padx=10)
+        self.analysis_rate_var = tk.IntVar(value=self.audio_processor.analysis_rate)
+        ttk.Combobox(select_frame, textvariable=self.analysis_rate_var,
+                     values=[8000, 16000, 22050, self.sample_rate],
+                     state="readonly", width=7).pack(side=tk.LEFT, padx=5)
         
         ttk.Button(select_frame, text="Comparer",
                   command=self.perform_comparison).pack(side=tk.LEFT, padx=10)
         
+        self.cancel_comparison_button = ttk.Button(select_frame, text="Annuler", state=tk.DISABLED,
+                                                  command=self.cancel_comparison)
+        self.cancel_comparison_button.pack(side=tk.LEFT, padx=5)
+        
+        # Avancement de l'analyse
+        progress_frame = ttk.Frame(frame)
+        progress_frame.pack(fill=tk.X, padx=20)
+        
+        self.comparison_progress = ttk.Progressbar(progress_frame, mode="determinate", maximum=1.0, length=300)
+        self.comparison_progress.pack(side=tk.LEFT, padx=5)
+        self.comparison_status_var = tk.StringVar(value="")
+        ttk.Label(progress_frame, textvariable=self.comparison_status_var).pack(side=tk.LEFT, padx=10)
+        
         # Zone de résultats
         self.comparison_canvas_frame = ttk.Frame(frame)
         self.comparison_canvas_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
+        self.comparison_view = None
+    
+    def create_alignment_tab(self, frame):
+        """Onglet Comparaison multiple : contours de F0 alignés par DTW"""
+        title = ttk.Label(frame, text="Comparaison Multiple des Contours de F0",
+                         font=("Segoe UI", 14, "bold"))
+        title.pack(padx=20, pady=15)
+        
+        select_frame = ttk.LabelFrame(frame, text="Sélectionner les enregistrements (plusieurs)", padding=15)
+        select_frame.pack(fill=tk.X, padx=20, pady=10)
+        self.alignment_filter = self.create_recording_filter(select_frame)
+        
+        list_frame = ttk.Frame(select_frame)
+        list_frame.pack(fill=tk.X)
+        self.alignment_listbox = tk.Listbox(list_frame, bg="#1a1f3a", fg="#e0e0e0",
+                                            selectmode=tk.EXTENDED, height=8, exportselection=False)
+        self.alignment_listbox.pack(fill=tk.X, expand=True, side=tk.LEFT)
+        scrollbar = ttk.Scrollbar(list_frame, orient="vertical", command=self.alignment_listbox.yview)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.alignment_listbox.configure(yscrollcommand=scrollbar.set)
+        self.alignment_rows = []
+        
+        button_frame = ttk.Frame(select_frame)
+        button_frame.pack(fill=tk.X, pady=(8, 0))
+        ttk.Button(button_frame, text="Même locuteur",
+                  command=self.select_same_speaker).pack(side=tk.LEFT, padx=5)
+        
+        ttk.Label(button_frame, text="Méthode F0:").pack(side=tk.LEFT, padx=10)
+        self.alignment_engine_var = tk.StringVar(value=self.audio_processor.f0_engine)
+        ttk.Combobox(button_frame, textvariable=self.alignment_engine_var, values=list(F0_ENGINES),
+                     state="readonly", width=10).pack(side=tk.LEFT, padx=5)
+        
+        # Bande de Sakoe-Chiba : écart maximal toléré entre les deux axes du temps
+        ttk.Label(button_frame, text="Bande DTW (%):").pack(side=tk.LEFT, padx=10)
+        self.alignment_band_var = tk.IntVar(value=10)
+        ttk.Combobox(button_frame, textvariable=self.alignment_band_var, values=[5, 10, 20, 30],
+                     state="readonly", width=5).pack(side=tk.LEFT, padx=5)
+        
+        ttk.Button(button_frame, text="Aligner",
+                  command=self.perform_alignment).pack(side=tk.LEFT, padx=10)
+        self.cancel_alignment_button = ttk.Button(button_frame, text="Annuler", state=tk.DISABLED,
+                                                  command=self.cancel_alignment)
+        self.cancel_alignment_button.pack(side=tk.LEFT, padx=5)
+        
+        progress_frame = ttk.Frame(frame)
+        progress_frame.pack(fill=tk.X, padx=20)
+        self.alignment_progress = ttk.Progressbar(progress_frame, mode="determinate", maximum=1.0, length=300)
+        self.alignment_progress.pack(side=tk.LEFT, padx=5)
+        self.alignment_status_var = tk.StringVar(value="")
+        ttk.Label(progress_frame, textvariable=self.alignment_status_var).pack(side=tk.LEFT, padx=10)
+        
+        self.alignment_canvas_frame = ttk.Frame(frame)
+        self.alignment_canvas_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
+        self.alignment_view = None
     
     def start_recording(self, mode):
         """Démarrer un enregistrement prosodique"""
@@ -287,20 +775,39 @@ class PhonologyAnalysisApp:
     
     def start_custom_recording(self, mode=None):
         """Démarrer un enregistrement personnalisé"""
+        import sounddevice as sd
+        
+        # Les boutons et le nom de l'enregistrement sont dans l'onglet Enregistrement
+        self.ensure_tab("recorder")
         if self.recording_is_active:
             messagebox.showwarning("Enregistrement", "Un enregistrement est déjà en cours")
             return
         
         self.recording_is_active = True
-        self.current_recording_frames = []
         self.current_recording_mode = mode
         
+        # Nom du fichier fixé dès le début : l'audio est écrit sur disque pendant l'enregistrement
+        filename = self.record_name_var.get() or f"Recording_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        if mode:
+            filename = f"{mode}_{filename}"
+        self.current_recording_name = filename
+        
         self.record_button.config(state=tk.DISABLED)
         self.stop_button.config(state=tk.NORMAL)
         
         messagebox.showinfo("Enregistrement", "Enregistrement en cours...\nParlez clairement")
         
+        # Graphiques en direct créés au premier enregistrement (import de matplotlib)
+        for view in self.live_views:
+            if view["canvas"] is None:
+                self.create_live_figure(view)
+        
+        # Analyse en direct, alimentée par le callback audio
+        self.live_analyzer = LiveAnalyzer(self.sample_rate)
+        self.live_analyzer.start()
+        
         # Enregistrement audio
+        self.current_recorder = StreamingRecorder(f"enregistrements/{filename}.wav", self.sample_rate)
         self.current_recording_stream = sd.InputStream(
             channels=1,
             samplerate=self.sample_rate,
@@ -308,13 +815,17 @@ class PhonologyAnalysisApp:
             blocksize=1024
         )
         self.current_recording_stream.start()
+        self.root.after(100, self.update_live_views)
     
     def audio_callback(self, indata, frames, time, status):
         """Callback pour l'enregistrement audio"""
         if status:
             print(f"Erreur d'enregistrement: {status}")
-        self.current_recording_frames.append(indata.copy())
+            self.live_analyzer.mark_late()
+        self.current_recorder.write(indata[:, 0])
+        self.live_analyzer.push(indata[:, 0])
     
+    @traced(category="interface")
     def stop_recording(self):
         """Arrêter l'enregistrement"""
         if not self.recording_is_active:
@@ -323,49 +834,130 @@ class PhonologyAnalysisApp:
         self.current_recording_stream.stop()
         self.current_recording_stream.close()
         self.recording_is_active = False
+        self.live_analyzer.stop()
         
-        # Combiner les frames
-        audio_data = np.concatenate(self.current_recording_frames, axis=0)
-        self.current_audio = audio_data.flatten()
-        
-        # Sauvegarder
-        filename = self.record_name_var.get() or f"Recording_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        if self.current_recording_mode:
-            filename = f"{self.current_recording_mode}_{filename}"
-        
-        filepath = f"enregistrements/{filename}.wav"
-        sf.write(filepath, self.current_audio, self.sample_rate)
+        # Le fichier est déjà écrit : il ne reste qu'à vider les derniers tampons
+        filepath = self.current_recorder.stop()
+        if self.current_recorder.dropped_samples:
+            print(f"Échantillons perdus: {self.current_recorder.dropped_samples}")
+        self.current_recorder = None
+        self.current_audio_path = filepath
         
-        self.recordings[filename] = filepath
+        name = self.catalogue.add(filepath)
         self.update_recordings_list()
+        self.summarize_recordings(self.catalogue.pending_summaries())
+        
+        # Pistes de caractéristiques écrites à côté du WAV (fichier .feat) ; un canal par fichier :
+        # l'écriture d'un enregistrement précédent encore en attente n'est pas annulée
+        self.analysis_executor.submit(
+            f"feature_file:{filepath}", lambda job, path: self.audio_processor.write_feature_file(path), filepath,
+            on_error=lambda exc: print(f"Écriture des caractéristiques impossible: {exc}"),
+        )
         
         self.record_button.config(state=tk.NORMAL)
         self.stop_button.config(state=tk.DISABLED)
         
-        messagebox.showinfo("Succès", f"Enregistrement sauvegardé: {filename}")
+        messagebox.showinfo("Succès", f"Enregistrement sauvegardé: {name}")
     
+    @traced(category="interface")
     def play_recording(self, mode):
         """Écouter un enregistrement prosodique"""
-        if mode not in self.recordings:
+        latest = self.catalogue.query(mode=mode, order_by="mtime", descending=True, limit=1)
+        if not latest:
             messagebox.showwarning("Erreur", f"Pas d'enregistrement pour la modalité {mode}")
             return
         
-        audio_data, sr = librosa.load(self.recordings[mode], sr=self.sample_rate)
+        import sounddevice as sd
+        audio_data, sr = self.audio_processor.read_audio(latest[0]["path"])
         sd.play(audio_data, sr)
     
     def play_custom_recording(self):
         """Écouter l'enregistrement actuel"""
-        if self.current_audio is None:
+        if self.current_audio_path is None:
             messagebox.showwarning("Erreur", "Aucun enregistrement à écouter")
             return
         
-        sd.play(self.current_audio, self.sample_rate)
+        import sounddevice as sd
+        audio_data, sr = self.audio_processor.read_audio(self.current_audio_path)
+        sd.play(audio_data, sr)
     
+    @traced(category="interface")
     def update_recordings_list(self):
-        """Mettre à jour la liste des enregistrements"""
-        self.recordings_listbox.delete(0, tk.END)
-        for name in self.recordings.keys():
-            self.recordings_listbox.insert(tk.END, name)
+        """Mettre à jour la liste et les menus d'enregistrements depuis le catalogue"""
+        rows = self.catalogue.query()
+        self.recordings = {row["name"]: row["path"] for row in rows}
+        modes = [""] + self.catalogue.modes()
+        
+        # Seuls les onglets déjà construits sont mis à jour
+        if self.tabs["recorder"]["built"]:
+            self.recordings_listbox.delete(0, tk.END)
+            for row in self.query_recordings(self.recorder_filter):
+                details = []
+                if row["duration"] is not None:
+                    details.append(f"{row['duration']:.1f} s")
+                if row["f0_mean"] is not None:
+                    details.append(f"F0 {row['f0_mean']:.0f} Hz")
+                label = f"{row['name']}  ({', '.join(details)})" if details else row["name"]
+                self.recordings_listbox.insert(tk.END, label)
+            self.recorder_filter["mode_combo"].config(values=modes)
+        
+        if self.tabs["comparison"]["built"]:
+            names = [row["name"] for row in self.query_recordings(self.comparison_filter)]
+            for combo in self.comparison_combos:
+                combo.config(values=names)
+            self.comparison_filter["mode_combo"].config(values=modes)
+        
+        if self.tabs["alignment"]["built"]:
+            # Conserver la sélection à travers le rafraîchissement
+            selected = set(self.selected_alignment_names())
+            self.alignment_rows = self.query_recordings(self.alignment_filter)
+            self.alignment_listbox.delete(0, tk.END)
+            for i, row in enumerate(self.alignment_rows):
+                self.alignment_listbox.insert(tk.END, row["name"])
+                if row["name"] in selected:
+                    self.alignment_listbox.selection_set(i)
+            self.alignment_filter["mode_combo"].config(values=modes)
+    
+    def scan_recordings(self):
+        """Parcourir le dossier des enregistrements en arrière-plan (fichiers modifiés seulement)"""
+        self.analysis_executor.submit(
+            "catalogue", lambda job: self.catalogue.scan(),
+            on_done=self.on_recordings_scanned,
+            on_error=lambda exc: print(f"Erreur du catalogue: {exc}"),
+        )
+    
+    def on_recordings_scanned(self, counts):
+        """Rafraîchir les listes après le parcours et compléter les résumés manquants"""
+        if any(counts):
+            self.update_recordings_list()
+        self.summarize_recordings(self.catalogue.pending_summaries())
+    
+    def summarize_recordings(self, paths):
+        """Calculer en arrière-plan les statistiques résumées des fichiers donnés"""
+        if not paths:
+            return
+        self.analysis_executor.submit(
+            "summaries", self.run_summaries, paths,
+            on_progress=lambda stage, fraction: self.update_recordings_list(),
+            on_done=lambda result: self.update_recordings_list(),
+            on_error=lambda exc: print(f"Erreur des résumés: {exc}"),
+        )
+    
+    @traced()
+    def run_summaries(self, job, paths):
+        """Résumés des enregistrements (thread d'analyse), enregistrés au fil de l'eau"""
+        engine = "yin"
+        for i, path in enumerate(paths):
+            job.check()
+            try:
+                summary = compute_summary(self.audio_processor, path, engine=engine)
+            except Exception as exc:
+                print(f"Résumé impossible pour {path}: {exc}")
+                continue
+            self.catalogue.set_summary(path, summary, engine)
+            # Rafraîchir les listes par paquets, pas à chaque fichier
+            if (i + 1) % 20 == 0:
+                job.progress("Résumés", (i + 1) / len(paths))
     
     def perform_comparison(self):
         """Comparer deux enregistrements"""
@@ -376,103 +968,174 @@ class PhonologyAnalysisApp:
             messagebox.showwarning("Erreur", "Sélectionnez deux enregistrements")
             return
         
-        # Charger les fichiers
-        audio1, sr1 = librosa.load(self.recordings[rec1], sr=self.sample_rate)
-        audio2, sr2 = librosa.load(self.recordings[rec2], sr=self.sample_rate)
-        
-        # Créer la figure de comparaison
-        fig = Figure(figsize=(12, 8), dpi=100, facecolor="#0a0e27")
-        
-        # Formes d'onde
-        ax1 = fig.add_subplot(3, 2, 1)
-        ax1.plot(audio1, color="#00d4ff", linewidth=0.5)
-        ax1.set_title(f"Forme d'onde - {rec1}", color="#e0e0e0")
-        ax1.set_facecolor("#1a1f3a")
-        ax1.tick_params(colors="#e0e0e0")
-        
-        ax2 = fig.add_subplot(3, 2, 2)
-        ax2.plot(audio2, color="#00ff88", linewidth=0.5)
-        ax2.set_title(f"Forme d'onde - {rec2}", color="#e0e0e0")
-        ax2.set_facecolor("#1a1f3a")
-        ax2.tick_params(colors="#e0e0e0")
-        
-        # Spectrogramme
-        ax3 = fig.add_subplot(3, 2, 3)
-        D1 = librosa.stft(audio1)
-        S1 = librosa.power_to_db(np.abs(D1)**2, ref=np.max)
-        im1 = ax3.imshow(S1, aspect='auto', origin='lower', cmap='Blues')
-        ax3.set_title(f"Spectrogramme - {rec1}", color="#e0e0e0")
-        ax3.set_facecolor("#1a1f3a")
-        fig.colorbar(im1, ax=ax3)
-        
-        ax4 = fig.add_subplot(3, 2, 4)
-        D2 = librosa.stft(audio2)
-        S2 = librosa.power_to_db(np.abs(D2)**2, ref=np.max)
-        im2 = ax4.imshow(S2, aspect='auto', origin='lower', cmap='Greens')
-        ax4.set_title(f"Spectrogramme - {rec2}", color="#e0e0e0")
-        ax4.set_facecolor("#1a1f3a")
-        fig.colorbar(im2, ax=ax4)
-        
-        # Analyse F0 (fréquence fondamentale)
-        ax5 = fig.add_subplot(3, 2, 5)
-        f0_1, voiced_flag1, voiced_probs1 = librosa.pyin(audio1, f_min=80, f_max=400, sr=self.sample_rate)
-        f0_2, voiced_flag2, voiced_probs2 = librosa.pyin(audio2, f_min=80, f_max=400, sr=self.sample_rate)
-        
-        time1 = np.linspace(0, len(audio1)/self.sample_rate, len(f0_1))
-        time2 = np.linspace(0, len(audio2)/self.sample_rate, len(f0_2))
-        
-        ax5.plot(time1, f0_1, label=rec1, color="#00d4ff", linewidth=2)
-        ax5.plot(time2, f0_2, label=rec2, color="#00ff88", linewidth=2)
-        ax5.set_ylabel("F0 (Hz)", color="#e0e0e0")
-        ax5.set_title("Fréquence Fondamentale (F0)", color="#e0e0e0")
-        ax5.legend(loc='upper right', facecolor="#1a1f3a", edgecolor="#e0e0e0")
-        ax5.set_facecolor("#1a1f3a")
-        ax5.tick_params(colors="#e0e0e0")
-        
-        # Amplitude
-        ax6 = fig.add_subplot(3, 2, 6)
-        amp1 = np.abs(signal.hilbert(audio1))
-        amp2 = np.abs(signal.hilbert(audio2))
-        
-        time_amp1 = np.linspace(0, len(audio1)/self.sample_rate, len(amp1))
-        time_amp2 = np.linspace(0, len(audio2)/self.sample_rate, len(amp2))
-        
-        ax6.plot(time_amp1, amp1, label=rec1, color="#00d4ff", linewidth=2)
-        ax6.plot(time_amp2, amp2, label=rec2, color="#00ff88", linewidth=2)
-        ax6.set_ylabel("Amplitude", color="#e0e0e0")
-        ax6.set_xlabel("Temps (s)", color="#e0e0e0")
-        ax6.set_title("Enveloppe d'Amplitude", color="#e0e0e0")
-        ax6.legend(loc='upper right', facecolor="#1a1f3a", edgecolor="#e0e0e0")
-        ax6.set_facecolor("#1a1f3a")
-        ax6.tick_params(colors="#e0e0e0")
-        
-        fig.tight_layout()
+        # Calcul en arrière-plan ; une nouvelle comparaison annule la précédente
+        self.cancel_comparison_button.config(state=tk.NORMAL)
+        self.analysis_executor.submit(
+            "comparison", self.run_comparison,
+            self.recordings[rec1], self.recordings[rec2], self.f0_engine_var.get(),
+            self.analysis_rate_var.get(),
+            on_progress=self.on_comparison_progress,
+            on_done=lambda result: self.on_comparison_done(rec1, rec2, result),
+            on_error=self.on_comparison_error,
+        )
+    
+    @traced()
+    def run_comparison(self, job, path1, path2, engine, sr):
+        """Calcul des caractéristiques de la comparaison (thread d'analyse)"""
+        return compute_comparison(self.audio_processor, path1, path2, sr,
+                                  engine=engine, progress=job.progress)
+    
+    def poll_analysis(self):
+        """Relayer les événements des analyses en arrière-plan vers l'interface"""
+        self.analysis_executor.poll()
+        self.root.after(50, self.poll_analysis)
+    
+    def cancel_comparison(self):
+        """Annuler la comparaison en cours"""
+        self.analysis_executor.cancel("comparison")
+        self.comparison_progress["value"] = 0
+        self.comparison_status_var.set("Comparaison annulée")
+        self.cancel_comparison_button.config(state=tk.DISABLED)
+    
+    def on_comparison_progress(self, stage, fraction):
+        """Afficher l'avancement de la comparaison"""
+        self.comparison_progress["value"] = fraction
+        self.comparison_status_var.set(stage)
+    
+    def on_comparison_error(self, exc):
+        """Signaler l'échec de la comparaison"""
+        self.cancel_comparison_button.config(state=tk.DISABLED)
+        self.comparison_status_var.set("")
+        messagebox.showerror("Erreur", f"Échec de la comparaison: {exc}")
+    
+    def on_comparison_done(self, rec1, rec2, result):
+        """Afficher une comparaison terminée"""
+        self.cancel_comparison_button.config(state=tk.DISABLED)
         
-        # Afficher dans le canvas
-        for widget in self.comparison_canvas_frame.winfo_children():
-            widget.destroy()
+        # Ignorer un résultat dont la sélection a changé entre-temps
+        if (self.comparison_var1.get(), self.comparison_var2.get()) != (rec1, rec2):
+            self.comparison_status_var.set("")
+            return
         
-        canvas = FigureCanvasTkAgg(fig, master=self.comparison_canvas_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.render_comparison(rec1, rec2, result)
+    
+    @traced(category="interface")
+    def render_comparison(self, rec1, rec2, result):
+        """Tracer la comparaison de deux enregistrements"""
+        audio1 = result["audio1"]
+        audio2 = result["audio2"]
+        f0_1 = result["features1"]["f0"]
+        f0_2 = result["features2"]["f0"]
+        
+        # La figure est construite une fois, puis seulement mise à jour
+        if self.comparison_view is None:
+            from modules.comparison_view import ComparisonView
+            self.comparison_view = ComparisonView(master=self.comparison_canvas_frame)
+        
+        stats_text = self.generate_comparison_stats(audio1, audio2, f0_1, f0_2, rec1, rec2, result["sr"],
+                                                    result["features1"]["speech"],
+                                                    result["features2"]["speech"])
+        self.comparison_view.update(rec1, rec2, result, result["sr"], stats_text=stats_text)
+        self.comparison_view.draw_idle()
+        self.comparison_status_var.set("")
+    
+    def selected_alignment_names(self):
+        """Noms des enregistrements sélectionnés dans l'onglet Comparaison multiple"""
+        return [self.alignment_rows[i]["name"] for i in self.alignment_listbox.curselection()]
+    
+    def select_same_speaker(self):
+        """Sélectionner tous les enregistrements du locuteur de la sélection (ses modalités)"""
+        selected = set(self.selected_alignment_names())
+        speakers = {row["speaker"] for row in self.alignment_rows if row["name"] in selected}
+        if not speakers:
+            messagebox.showwarning("Erreur", "Sélectionnez au moins un enregistrement du locuteur")
+            return
+        for i, row in enumerate(self.alignment_rows):
+            if row["speaker"] in speakers:
+                self.alignment_listbox.selection_set(i)
+    
+    def perform_alignment(self):
+        """Aligner les contours de F0 des enregistrements sélectionnés"""
+        names = self.selected_alignment_names()
+        if len(names) < 2:
+            messagebox.showwarning("Erreur", "Sélectionnez au moins deux enregistrements")
+            return
         
-        # Statistiques
-        stats_text = self.generate_comparison_stats(audio1, audio2, f0_1, f0_2, rec1, rec2)
-        stats_label = ttk.Label(self.comparison_canvas_frame, text=stats_text, 
-                              font=("Courier New", 9), justify=tk.LEFT, wraplength=300)
-        stats_label.pack(anchor=tk.W, padx=10, pady=10)
+        self.cancel_alignment_button.config(state=tk.NORMAL)
+        self.analysis_executor.submit(
+            "alignment", self.run_alignment,
+            [self.recordings[name] for name in names], self.alignment_engine_var.get(),
+            self.alignment_band_var.get() / 100,
+            on_progress=self.on_alignment_progress,
+            on_done=lambda result: self.on_alignment_done(names, result),
+            on_error=self.on_alignment_error,
+        )
+    
+    @traced()
+    def run_alignment(self, job, paths, engine, band):
+        """Extraction des F0 et alignement DTW (thread d'analyse)"""
+        return compute_multi_comparison(self.audio_processor, paths, engine=engine, band=band,
+                                        progress=job.progress)
+    
+    def cancel_alignment(self):
+        """Annuler la comparaison multiple en cours"""
+        self.analysis_executor.cancel("alignment")
+        self.alignment_progress["value"] = 0
+        self.alignment_status_var.set("Comparaison annulée")
+        self.cancel_alignment_button.config(state=tk.DISABLED)
+    
+    def on_alignment_progress(self, stage, fraction):
+        """Afficher l'avancement de la comparaison multiple"""
+        self.alignment_progress["value"] = fraction
+        self.alignment_status_var.set(stage)
+    
+    def on_alignment_error(self, exc):
+        """Signaler l'échec de la comparaison multiple"""
+        self.cancel_alignment_button.config(state=tk.DISABLED)
+        self.alignment_status_var.set("")
+        messagebox.showerror("Erreur", f"Échec de la comparaison multiple: {exc}")
+    
+    @traced(category="interface")
+    def on_alignment_done(self, names, result):
+        """Tracer les contours alignés et la matrice des distances"""
+        self.cancel_alignment_button.config(state=tk.DISABLED)
+        if self.alignment_view is None:
+            from modules.alignment_view import AlignmentView
+            self.alignment_view = AlignmentView(master=self.alignment_canvas_frame)
+        
+        stats_text = self.generate_alignment_stats(names, result)
+        self.alignment_view.update(names, result, stats_text=stats_text)
+        self.alignment_view.draw_idle()
+        self.alignment_status_var.set("")
+    
+    def generate_alignment_stats(self, names, result):
+        """Résumé de la comparaison multiple : paires la plus proche et la plus éloignée"""
+        distances = result["distances"]
+        first, second = np.triu_indices(len(names), k=1)
+        pair_distances = distances[first, second]
+        closest = np.argmin(pair_distances)
+        farthest = np.argmax(pair_distances)
+        lines = [f"Référence: {names[0]}  ·  bande DTW {result['band'] * 100:.0f} %"]
+        lines.append(f"Paire la plus proche: {names[first[closest]]} / {names[second[closest]]} "
+                     f"({pair_distances[closest]:.2f} demi-ton)")
+        lines.append(f"Paire la plus éloignée: {names[first[farthest]]} / {names[second[farthest]]} "
+                     f"({pair_distances[farthest]:.2f} demi-ton)")
+        for name, duration, row in zip(names, result["durations"], distances):
+            lines.append(f"  {name[:30]:<30} {duration:5.2f} s  distance moyenne "
+                         f"{row.sum() / (len(names) - 1):.2f}")
+        return "\n".join(lines)
     
-    def generate_comparison_stats(self, audio1, audio2, f0_1, f0_2, rec1, rec2):
-        """Générer les statistiques de comparaison"""
-        # Durée
-        dur1 = len(audio1) / self.sample_rate
-        dur2 = len(audio2) / self.sample_rate
+    def generate_comparison_stats(self, audio1, audio2, f0_1, f0_2, rec1, rec2, sr, speech1, speech2):
+        """Générer les statistiques de comparaison (signal brut et parole seule)"""
+        from modules.audio_processor import speech_stats
         
-        # RMS (amplitude moyenne)
-        rms1 = np.sqrt(np.mean(audio1**2))
-        rms2 = np.sqrt(np.mean(audio2**2))
+        # Durée et RMS (amplitude moyenne), avec et sans les silences
+        stats1 = speech_stats(audio1, sr, speech1)
+        stats2 = speech_stats(audio2, sr, speech2)
+        dur1, dur2 = stats1["speech_duration"], stats2["speech_duration"]
+        rms1, rms2 = stats1["speech_rms"], stats2["speech_rms"]
         
-        # F0 moyenne
+        # F0 moyen
         f0_mean1 = np.nanmean(f0_1[f0_1 > 0])
         f0_mean2 = np.nanmean(f0_2[f0_2 > 0])
         
@@ -480,16 +1143,16 @@ class PhonologyAnalysisApp:
 COMPARAISON DES PARAMÈTRES ACOUSTIQUES
 
 {rec1}:
-  • Durée: {dur1:.2f}s
-  • Amplitude RMS: {rms1:.4f}
+  • Durée: {dur1:.2f}s de parole ({stats1["duration"]:.2f}s au total)
+  • Amplitude RMS: {rms1:.4f} sur la parole ({stats1["rms"]:.4f} au total)
   • F0 moyen: {f0_mean1:.1f} Hz
 
 {rec2}:
-  • Durée: {dur2:.2f}s
-  • Amplitude RMS: {rms2:.4f}
+  • Durée: {dur2:.2f}s de parole ({stats2["duration"]:.2f}s au total)
+  • Amplitude RMS: {rms2:.4f} sur la parole ({stats2["rms"]:.4f} au total)
   • F0 moyen: {f0_mean2:.1f} Hz
 
-DIFFÉRENCES:
+DIFFÉRENCES (parole seule):
   • Durée: {abs(dur1-dur2):.2f}s ({((dur2-dur1)/dur1*100):+.1f}%)
   • Amplitude: {abs(rms1-rms2):.4f} ({((rms2-rms1)/rms1*100):+.1f}%)
   • F0: {abs(f0_mean1-f0_mean2):.1f} Hz ({((f0_mean2-f0_mean1)/f0_mean1*100):+.1f}%)
@@ -497,9 +1160,17 @@ DIFFÉRENCES:
         return stats
 
 def main():
+    # PHONO_TRACE=1 : mesures actives et onglet Performance visible dès le démarrage
+    if os.environ.get("PHONO_TRACE"):
+        instrumentation.enable()
     root = tk.Tk()
-    app = PhonologyAnalysisApp(root)
+    # PHONO_PREWARM=0 : pas de préchargement des modules lourds en arrière-plan
+    app = PhonologyAnalysisApp(root, prewarm=os.environ.get("PHONO_PREWARM", "1") != "0")
     root.mainloop()
+    app.analysis_executor.shutdown()
+    app.catalogue.close()
+    from modules import parallel_f0
+    parallel_f0.shutdown()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,244 @@
+"""Module d'alignement temporel des contours de F0 (DTW à bande de Sakoe-Chiba)
+
+La DTW est calculée par anti-diagonales : toutes les cellules d'une
+anti-diagonale ne dépendent que des deux précédentes et sont traitées en une
+seule opération numpy. Seules les cellules de la bande |i·m/n - j| <= w sont
+calculées (coût O(n·w) au lieu de O(n·m)). Pour les distances, seules les deux
+dernières anti-diagonales sont gardées et plusieurs paires de même longueur sont
+alignées en même temps (matrice des distances) ; la matrice complète n'est
+construite que pour extraire un chemin d'alignement.
+
+Pour la recherche dans une banque de gabarits (suites de vecteurs, par exemple
+des MFCC), l'enveloppe de Keogh de chaque gabarit donne une borne inférieure de
+la DTW (LB_Keogh) qui écarte la plupart des candidats sans les aligner, et la
+DTW des candidats restants est abandonnée dès que leur coût partiel dépasse le
+meilleur score connu.
+"""
+
+import functools
+
+import numpy as np
+
+def f0_contour(f0, voiced_flag=None, relative=True):
+    """Contour de F0 continu en demi-tons, prêt pour l'alignement
+    
+    Les trames non voisées sont interpolées entre les trames voisées voisines et
+    les silences de début et de fin sont retirés. Avec `relative`, le contour
+    est exprimé par rapport à sa médiane (compare la forme de l'intonation,
+    indépendamment du registre du locuteur). Renvoie `(contour, première_trame)`.
+    """
+    f0 = np.asarray(f0, dtype=np.float64)
+    voiced = np.isfinite(f0) & (f0 > 0)
+    if voiced_flag is not None:
+        voiced &= np.asarray(voiced_flag, dtype=bool)
+    indices = np.flatnonzero(voiced)
+    if len(indices) < 2:
+        raise ValueError("aucune trame voisée")
+    
+    semitones = 12 * np.log2(f0[indices] / 100.0)
+    if relative:
+        semitones -= np.median(semitones)
+    frames = np.arange(indices[0], indices[-1] + 1)
+    return np.interp(frames, indices, semitones), int(indices[0])
+
+def resample_contour(contour, length):
+    """Ramener un contour à `length` points (temps normalisé)"""
+    contour = np.asarray(contour, dtype=np.float64)
+    return np.interp(np.linspace(0, len(contour) - 1, length), np.arange(len(contour)), contour)
+
+def band_width(n, m, band):
+    """Demi-largeur de la bande de Sakoe-Chiba (en trames) pour une fraction `band`"""
+    return max(1, int(np.ceil(band * max(n, m))))
+
+def _diagonal_cells(k, n, m, w):
+    """Indices i des cellules (i, k - i) de l'anti-diagonale k dans la bande |i·m/n - j| <= w"""
+    # |i·m/n - (k - i)| <= w  <=>  (k - w)·n/(n + m) <= i <= (k + w)·n/(n + m)
+    low = max(1, k - m, int(np.ceil((k - w) * n / (n + m))))
+    high = min(n, k - 1, int(np.floor((k + w) * n / (n + m))))
+    return np.arange(low, high + 1)
+
+@functools.lru_cache(maxsize=32)
+def _band_cells(n, m, w):
+    """Cellules de la bande rangées par anti-diagonale (structure réutilisée entre appels)
+    
+    Renvoie `(i, j, diagonales)` : indices (base 1) de toutes les cellules, et
+    pour chaque anti-diagonale k = 2 .. n + m ses indices i et sa tranche dans
+    `i` et `j`. Les coûts locaux de toute la bande sont ainsi calculés en une
+    seule opération avant la récurrence.
+    """
+    diagonals = []
+    rows = []
+    start = 0
+    for k in range(2, n + m + 1):
+        i = _diagonal_cells(k, n, m, w)
+        i.setflags(write=False)
+        diagonals.append((i, slice(start, start + len(i))))
+        rows.append(i)
+        start += len(i)
+    i_all = np.concatenate(rows)
+    j_all = np.concatenate([k - i for k, i in zip(range(2, n + m + 1), rows)])
+    i_all.setflags(write=False)
+    j_all.setflags(write=False)
+    return i_all, j_all, diagonals
+
+def dtw_batch(X, Y, band=0.1):
+    """Distances DTW de plusieurs paires (X[p], Y[p]) de mêmes longueurs n et m
+    
+    Seules les deux anti-diagonales précédentes sont gardées (mémoire O(n)).
+    Les distances sont normalisées par n + m ; renvoie un tableau (P,).
+    """
+    X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+    Y = np.atleast_2d(np.asarray(Y, dtype=np.float64))
+    n_pairs, n = X.shape
+    m = Y.shape[1]
+    w = band_width(n, m, band)
+    
+    i_all, j_all, diagonals = _band_cells(n, m, w)
+    costs = np.abs(X[:, i_all - 1] - Y[:, j_all - 1])
+    
+    # Anti-diagonales indexées par i ; (0, 0) = 0, bords et hors bande infinis
+    previous2 = np.full((n_pairs, n + 1), np.inf)
+    previous1 = np.full((n_pairs, n + 1), np.inf)
+    current = np.empty((n_pairs, n + 1))
+    previous2[:, 0] = 0.0
+    for i, cells in diagonals:
+        current.fill(np.inf)
+        best = np.minimum(np.minimum(previous2[:, i - 1], previous1[:, i - 1]), previous1[:, i])
+        current[:, i] = costs[:, cells] + best
+        previous2, previous1, current = previous1, current, previous2
+    return previous1[:, n] / (n + m)
+
+def _frame_distance(a, b):
+    """Distance locale : écart absolu (contours) ou euclidienne sur le dernier axe (vecteurs)"""
+    diff = a - b
+    if diff.ndim == 1:
+        return np.abs(diff)
+    return np.sqrt(np.einsum("...k,...k->...", diff, diff))
+
+def dtw_matrix(x, y, band=0.1):
+    """Matrice de coût cumulé (n + 1, m + 1) d'une paire, infinie hors bande (pour le chemin)
+    
+    `x` et `y` sont des contours (n,) et (m,) ou des suites de vecteurs (n, d) et (m, d).
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n, m = len(x), len(y)
+    w = band_width(n, m, band)
+    
+    i_all, j_all, diagonals = _band_cells(n, m, w)
+    costs = _frame_distance(x[i_all - 1], y[j_all - 1])
+    
+    D = np.full((n + 1, m + 1), np.inf)
+    D[0, 0] = 0.0
+    for i, cells in diagonals:
+        j = j_all[cells]
+        best = np.minimum(np.minimum(D[i - 1, j - 1], D[i - 1, j]), D[i, j - 1])
+        D[i, j] = costs[cells] + best
+    return D
+
+def warping_path(D):
+    """Chemin d'alignement optimal [(i, j), ...] d'une matrice de coût cumulé (n + 1, m + 1)"""
+    i, j = D.shape[0] - 1, D.shape[1] - 1
+    path = []
+    while i > 0 and j > 0:
+        path.append((i - 1, j - 1))
+        step = np.argmin((D[i - 1, j - 1], D[i - 1, j], D[i, j - 1]))
+        if step == 0:
+            i, j = i - 1, j - 1
+        elif step == 1:
+            i -= 1
+        else:
+            j -= 1
+    return path[::-1]
+
+def warp_to_reference(reference, other, band=0.1):
+    """Contour `other` ramené sur l'axe du temps de `reference` par DTW
+    
+    Chaque point de la référence reçoit la moyenne des points de `other` qui
+    lui sont associés. Renvoie `(contour_aligné, distance)`.
+    """
+    D = dtw_matrix(reference, other, band)
+    sums = np.zeros(len(reference))
+    counts = np.zeros(len(reference))
+    for i, j in warping_path(D):
+        sums[i] += other[j]
+        counts[i] += 1
+    return sums / np.maximum(counts, 1), float(D[-1, -1] / (D.shape[0] + D.shape[1] - 2))
+
+def pairwise_distances(contours, band=0.1, length=200):
+    """Matrice symétrique des distances DTW entre contours (ramenés à `length` points)
+    
+    Toutes les paires sont alignées en un seul passage vectorisé.
+    """
+    resampled = np.array([resample_contour(c, length) for c in contours])
+    n = len(resampled)
+    first, second = np.triu_indices(n, k=1)
+    matrix = np.zeros((n, n))
+    if len(first):
+        distances = dtw_batch(resampled[first], resampled[second], band)
+        matrix[first, second] = distances
+        matrix[second, first] = distances
+    return matrix
+
+def keogh_envelope(templates, band=0.1):
+    """Enveloppes haute et basse (T, L, d) de gabarits (T, L, d) sur ±w trames"""
+    templates = np.asarray(templates, dtype=np.float64)
+    w = band_width(templates.shape[1], templates.shape[1], band)
+    padded = np.pad(templates, ((0, 0), (w, w), (0, 0)), mode="edge")
+    windows = np.lib.stride_tricks.sliding_window_view(padded, 2 * w + 1, axis=1)
+    return windows.max(axis=-1), windows.min(axis=-1)
+
+def lb_keogh(query, upper, lower):
+    """Borne inférieure LB_Keogh de la DTW (somme des coûts) entre `query` (L, d) et chaque gabarit
+    
+    Chaque trame de `query` est associée par la DTW à des trames du gabarit
+    situées dans la bande, donc dans la boîte [lower, upper] de l'enveloppe :
+    la distance de la trame à cette boîte minore son coût local.
+    """
+    # upper >= lower : au plus un des deux écarts est positif
+    excess = np.maximum(query - upper, lower - query)
+    np.maximum(excess, 0.0, out=excess)
+    return np.sqrt(np.einsum("tld,tld->tl", excess, excess)).sum(axis=1)
+
+def dtw_templates(query, templates, band=0.1, thresholds=None):
+    """DTW (somme des coûts) entre `query` (L, d) et des gabarits (T, L, d), avec abandon précoce
+    
+    Un gabarit est abandonné (distance infinie) dès que toutes les cellules de
+    deux anti-diagonales consécutives dépassent son seuil : tout chemin passe
+    par l'une des deux et le coût cumulé ne peut que croître.
+    """
+    query = np.asarray(query, dtype=np.float64)
+    templates = np.asarray(templates, dtype=np.float64)
+    n_templates, length = templates.shape[:2]
+    w = band_width(length, length, band)
+    if thresholds is None:
+        thresholds = np.full(n_templates, np.inf)
+    
+    i_all, j_all, diagonals = _band_cells(length, length, w)
+    costs = _frame_distance(query[i_all - 1], templates[:, j_all - 1])
+    
+    distances = np.full(n_templates, np.inf)
+    active = np.arange(n_templates)
+    previous2 = np.full((n_templates, length + 1), np.inf)
+    previous1 = np.full((n_templates, length + 1), np.inf)
+    current = np.empty((n_templates, length + 1))
+    previous2[:, 0] = 0.0
+    previous_min = np.full(n_templates, np.inf)
+    for i, cells in diagonals:
+        current.fill(np.inf)
+        best = np.minimum(np.minimum(previous2[:, i - 1], previous1[:, i - 1]), previous1[:, i])
+        current[:, i] = costs[:, cells] + best
+        
+        # Abandon des gabarits dont le coût partiel dépasse déjà le seuil
+        current_min = current[:, i].min(axis=1)
+        keep = np.minimum(current_min, previous_min) < thresholds[active]
+        if not keep.all():
+            active = active[keep]
+            if len(active) == 0:
+                return distances
+            previous1, current, costs = previous1[keep], current[keep], costs[keep]
+            previous2, current_min = previous2[keep], current_min[keep]
+        previous_min = current_min
+        previous2, previous1, current = previous1, current, previous2
+    distances[active] = previous1[:, length]
+    return distances
@@ -0,0 +1,93 @@
+"""Module de la vue de comparaison multiple (contours alignés et matrice des distances)"""
+
+import numpy as np
+from matplotlib.figure import Figure
+
+from modules.comparison_view import AXES_COLOR, BG_COLOR, TEXT_COLOR
+from modules.instrumentation import traced
+
+class AlignmentView:
+    """Figure de la comparaison multiple, construite une fois et mise à jour sur place
+    
+    À gauche, les contours de F0 ramenés par DTW sur l'axe du temps de la
+    référence ; à droite, la matrice des distances DTW. Sans `master`, la vue
+    utilise un canevas Agg hors écran (benchmarks).
+    """
+    
+    def __init__(self, master=None):
+        self.figure = Figure(figsize=(12, 5), dpi=100, facecolor=BG_COLOR)
+        self.ax_contours = self.figure.add_subplot(1, 2, 1)
+        self.ax_matrix = self.figure.add_subplot(1, 2, 2)
+        self._style(self.ax_contours, "Contours de F0 alignés (DTW)")
+        self._style(self.ax_matrix, "Distances DTW (demi-tons)")
+        self.ax_contours.set_xlabel("Temps de la référence (s)", color=TEXT_COLOR)
+        self.ax_contours.set_ylabel("F0 (demi-tons / médiane)", color=TEXT_COLOR)
+        self.image = self.ax_matrix.imshow(np.zeros((2, 2)), cmap="viridis")
+        self.figure.colorbar(self.image, ax=self.ax_matrix)
+        self.lines = []
+        self.labels = []
+        
+        if master is None:
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            self.canvas = FigureCanvasAgg(self.figure)
+            self.stats_label = None
+        else:
+            import tkinter as tk
+            from tkinter import ttk
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+            self.canvas = FigureCanvasTkAgg(self.figure, master=master)
+            self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+            self.stats_label = ttk.Label(master, text="", font=("Courier New", 9), justify=tk.LEFT)
+            self.stats_label.pack(anchor=tk.W, padx=10, pady=10)
+        self.canvas.draw = traced("canvas.draw", category="interface")(self.canvas.draw)
+    
+    def _style(self, ax, title):
+        ax.set_title(title, color=TEXT_COLOR)
+        ax.set_facecolor(AXES_COLOR)
+        ax.tick_params(colors=TEXT_COLOR)
+    
+    @traced(category="interface")
+    def update(self, names, result, stats_text=""):
+        """Afficher une nouvelle comparaison multiple"""
+        # Le nombre de courbes varie d'une comparaison à l'autre
+        for artist in self.lines + self.labels:
+            artist.remove()
+        self.lines = []
+        self.labels = []
+        
+        times = result["reference_times"]
+        for name, contour in zip(names, result["aligned"]):
+            line, = self.ax_contours.plot(times, contour, linewidth=1.5, label=name)
+            self.lines.append(line)
+        self.ax_contours.relim()
+        self.ax_contours.autoscale_view()
+        self.ax_contours.legend(loc="upper right", facecolor=AXES_COLOR, edgecolor=TEXT_COLOR,
+                                labelcolor=TEXT_COLOR, fontsize=8)
+        
+        distances = result["distances"]
+        n = len(names)
+        self.image.set_data(distances)
+        self.image.set_extent((-0.5, n - 0.5, n - 0.5, -0.5))
+        self.image.set_clim(0.0, max(float(distances.max()), 1e-6))
+        self.ax_matrix.set_xticks(range(n))
+        self.ax_matrix.set_yticks(range(n))
+        self.ax_matrix.set_xticklabels(names, rotation=45, ha="right", fontsize=8)
+        self.ax_matrix.set_yticklabels(names, fontsize=8)
+        # Valeurs dans les cases tant qu'elles restent lisibles
+        if n <= 12:
+            for i in range(n):
+                for j in range(n):
+                    self.labels.append(self.ax_matrix.text(j, i, f"{distances[i, j]:.2f}", ha="center",
+                                                           va="center", color="white", fontsize=7))
+        self.figure.tight_layout()
+        
+        if self.stats_label is not None:
+            self.stats_label.config(text=stats_text)
+    
+    def draw(self):
+        """Redessiner immédiatement (mesures) ; l'interface utilise draw_idle()"""
+        self.canvas.draw()
+    
+    def draw_idle(self):
+        """Demander un redessin au prochain passage de la boucle Tk"""
+        self.canvas.draw_idle()
@@ -0,0 +1,126 @@
+"""Module d'exécution des analyses en arrière-plan"""
+
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+class AnalysisCancelled(Exception):
+    """Analyse annulée avant la fin"""
+
+class AnalysisJob:
+    """Analyse soumise à l'exécuteur, annulable entre deux étapes"""
+    
+    def __init__(self, job_id, channel, events):
+        self.job_id = job_id
+        self.channel = channel
+        self._events = events
+        self._cancel_event = threading.Event()
+    
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+    
+    def cancel(self):
+        """Demander l'annulation de l'analyse"""
+        self._cancel_event.set()
+    
+    def check(self):
+        """Lever AnalysisCancelled si l'annulation a été demandée"""
+        if self._cancel_event.is_set():
+            raise AnalysisCancelled(self.channel)
+    
+    def progress(self, stage, fraction):
+        """Publier l'avancement d'une étape (point d'annulation)"""
+        self.check()
+        self._events.put((self, "progress", (stage, fraction)))
+
+class AnalysisExecutor:
+    """Exécute les analyses dans un pool de threads et relaie les résultats à l'UI
+    
+    Les événements (progression, résultat, erreur) sont mis en file par les workers
+    et distribués par `poll()`, à appeler depuis le thread Tk via `root.after`.
+    Chaque canal ne garde qu'une analyse active : en soumettre une nouvelle annule
+    la précédente, dont les événements restants sont ignorés. Les canaux
+    `interactive` (analyses demandées par l'utilisateur) ont leurs propres
+    workers et n'attendent jamais derrière les tâches de fond.
+    """
+    
+    def __init__(self, max_workers=2, interactive=(), interactive_workers=1):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analyse")
+        self._interactive = frozenset(interactive)
+        self._interactive_pool = None
+        if self._interactive:
+            self._interactive_pool = ThreadPoolExecutor(max_workers=interactive_workers,
+                                                        thread_name_prefix="analyse-interactive")
+        self._events = queue.Queue()
+        self._active = {}
+        self._callbacks = {}
+        self._ids = itertools.count(1)
+    
+    def submit(self, channel, fn, *args, on_progress=None, on_done=None, on_error=None):
+        """Lancer `fn(job, *args)` en arrière-plan sur un canal donné"""
+        self.cancel(channel)
+        job = AnalysisJob(next(self._ids), channel, self._events)
+        self._active[channel] = job
+        self._callbacks[job.job_id] = (on_progress, on_done, on_error)
+        pool = self._interactive_pool if channel in self._interactive else self._pool
+        pool.submit(self._run, job, fn, args)
+        return job
+    
+    def _run(self, job, fn, args):
+        try:
+            job.check()
+            result = fn(job, *args)
+        except AnalysisCancelled:
+            self._events.put((job, "cancelled", None))
+        except Exception as exc:
+            self._events.put((job, "error", exc))
+        else:
+            self._events.put((job, "done", result))
+    
+    def cancel(self, channel):
+        """Annuler l'analyse en cours sur un canal"""
+        job = self._active.pop(channel, None)
+        if job is not None:
+            job.cancel()
+    
+    def is_running(self, channel):
+        return channel in self._active
+    
+    def poll(self, budget=0.02):
+        """Distribuer les événements en attente (thread Tk), dans la limite de `budget` secondes"""
+        deadline = time.perf_counter() + budget
+        while time.perf_counter() < deadline:
+            try:
+                job, kind, payload = self._events.get_nowait()
+            except queue.Empty:
+                break
+            
+            # Résultats périmés : le job a été annulé ou remplacé
+            if self._active.get(job.channel) is not job:
+                if kind != "progress":
+                    self._callbacks.pop(job.job_id, None)
+                continue
+            
+            on_progress, on_done, on_error = self._callbacks.get(job.job_id, (None, None, None))
+            if kind == "progress":
+                if on_progress:
+                    on_progress(*payload)
+                continue
+            
+            del self._active[job.channel]
+            self._callbacks.pop(job.job_id, None)
+            if kind == "done" and on_done:
+                on_done(payload)
+            elif kind == "error" and on_error:
+                on_error(payload)
+    
+    def shutdown(self):
+        """Annuler les analyses en cours et arrêter le pool"""
+        for channel in list(self._active):
+            self.cancel(channel)
+        self._pool.shutdown(wait=False)
+        if self._interactive_pool is not None:
+            self._interactive_pool.shutdown(wait=False)
@@ -1,32 +1,494 @@
-"""Module de traitement audio"""
+"""Module de traitement audio
+
+librosa et scipy.signal sont importés à la première utilisation : importer ce
+module (au démarrage de l'application) reste rapide.
+"""
+
+import math
+import os
 
 import numpy as np
-from scipy import signal
-import librosa
+import soundfile as sf
+
+from modules.feature_cache import AudioCache, FeatureCache, LRUCache, hash_file
+from modules.feature_file import FeatureFile, write_feature_file
+from modules.envelope import frame_average, hilbert_envelope
+from modules.instrumentation import span, traced
+from modules.parallel_f0 import chunk_tracks, parallel_tracks, plan_chunks, stitch
+
+def speech_stats(audio_data, sr, spans):
+    """Durée et RMS du signal brut et de ses seuls segments de parole `[[début, fin], ...]`"""
+    audio_data = np.asarray(audio_data, dtype=np.float32)
+    speech = np.concatenate([audio_data[a:b] for a, b in spans]) if len(spans) else audio_data[:0]
+    
+    def rms(samples):
+        return float(np.sqrt(np.mean(samples.astype(np.float64)**2))) if len(samples) else 0.0
+    
+    return {
+        "duration": len(audio_data) / sr,
+        "rms": rms(audio_data),
+        "speech_duration": len(speech) / sr,
+        "speech_rms": rms(speech),
+    }
+
+def speech_frame_stats(frames):
+    """Énergie (dB) et taux de passages par zéro de trames contiguës (n_trames, pas)"""
+    hop_length = frames.shape[1]
+    energy_db = 10 * np.log10(np.einsum("ij,ij->i", frames, frames) / hop_length + 1e-12)
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (hop_length - 1)
+    return energy_db, zcr
+
+class FeatureGraph:
+    """Caractéristiques spectrales d'un signal, dérivées paresseusement d'une STFT partagée
+    
+    La STFT est calculée une seule fois par couple (n_fft, hop_length) ; le
+    spectre de puissance, le mel-spectrogramme, les MFCC, le RMS par trame, le
+    centroïde spectral et le spectrogramme en dB en sont dérivés à la demande et
+    mémorisés. `get(nom)` renvoie une caractéristique par son nom.
+    """
+    
+    FEATURES = ("stft", "magnitude", "power", "db", "mel", "mfcc", "rms", "energy", "centroid")
+    
+    def __init__(self, audio_data, sr, n_fft=2048, hop_length=512, n_mels=128, n_mfcc=13):
+        self.audio_data = audio_data
+        self.sr = sr
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.n_mels = n_mels
+        self.n_mfcc = n_mfcc
+        self._memo = {}
+    
+    def get(self, name, n_fft=None, hop_length=None):
+        """Récupérer une caractéristique par son nom (calculée au premier appel)"""
+        n_fft = n_fft or self.n_fft
+        hop_length = hop_length or self.hop_length
+        if name not in self.FEATURES:
+            raise ValueError(f"Caractéristique inconnue: {name} (disponibles: {', '.join(self.FEATURES)})")
+        key = (name, n_fft, hop_length)
+        if key not in self._memo:
+            with span(f"FeatureGraph.{name}"):
+                self._memo[key] = getattr(self, f"_compute_{name}")(n_fft, hop_length)
+        return self._memo[key]
+    
+    def _compute_stft(self, n_fft, hop_length):
+        import librosa
+        return librosa.stft(self.audio_data, n_fft=n_fft, hop_length=hop_length)
+    
+    def _compute_magnitude(self, n_fft, hop_length):
+        return np.abs(self.get("stft", n_fft, hop_length))
+    
+    def _compute_power(self, n_fft, hop_length):
+        return self.get("magnitude", n_fft, hop_length)**2
+    
+    def _compute_db(self, n_fft, hop_length):
+        import librosa
+        return librosa.power_to_db(self.get("power", n_fft, hop_length), ref=np.max)
+    
+    def _compute_mel(self, n_fft, hop_length):
+        import librosa
+        return librosa.feature.melspectrogram(S=self.get("power", n_fft, hop_length),
+                                              sr=self.sr, n_fft=n_fft, n_mels=self.n_mels)
+    
+    def _compute_mfcc(self, n_fft, hop_length):
+        import librosa
+        return librosa.feature.mfcc(S=librosa.power_to_db(self.get("mel", n_fft, hop_length)),
+                                    n_mfcc=self.n_mfcc)
+    
+    def _compute_rms(self, n_fft, hop_length):
+        import librosa
+        return librosa.feature.rms(S=self.get("magnitude", n_fft, hop_length), frame_length=n_fft)[0]
+    
+    def _compute_energy(self, n_fft, hop_length):
+        return self.get("power", n_fft, hop_length).sum(axis=0)
+    
+    def _compute_centroid(self, n_fft, hop_length):
+        import librosa
+        return librosa.feature.spectral_centroid(S=self.get("magnitude", n_fft, hop_length),
+                                                 sr=self.sr, n_fft=n_fft)[0]
 
 class AudioProcessor:
-    def __init__(self):
+    def __init__(self, cache_dir=None, analysis_rate=16000, audio_cache_bytes=256 * 1024**2,
+                 tile_cache_bytes=64 * 1024**2):
         self.sample_rate = 44100
+        self.analysis_rate = analysis_rate
+        self.f_min = 80
+        self.f_max = 400
+        self.hop_length = 512
+        self.n_mfcc = 13
+        self.f0_engine = "pyin"
+        # Détection de parole (énergie + passages par zéro) : les extracteurs coûteux
+        # ne traitent que les segments de parole
+        self.vad = True
+        self.vad_threshold_db = 12.0
+        self.vad_range_db = 50.0
+        self.vad_zcr = 0.3
+        self.vad_min_silence = 0.3
+        self.vad_min_speech = 0.05
+        self.vad_padding = 0.1
+        # Morceaux d'analyse de la F0 (s) et analyse parallèle des longs enregistrements
+        self.f0_chunk_duration = 30.0
+        self.f0_chunk_overlap = 1.0
+        self.f0_workers = 1
+        self.parallel_min_duration = 60.0
+        self.cache = FeatureCache(cache_dir) if cache_dir else None
+        # Signaux décodés (lecture, comparaison, analyses), partagés en lecture seule
+        self.audio_cache = AudioCache(audio_cache_bytes)
+        # Tuiles de spectrogramme : pyramides sur disque (cache_dir/tiles), tuiles lues en LRU
+        self.tile_cache = LRUCache(tile_cache_bytes)
+        self.tile_disk_bytes = 2 * 1024**3
+    
+    def frame_settings(self, sr):
+        """Longueur de trame et pas (en échantillons) à la fréquence `sr`
+        
+        `self.hop_length` est donné pour `self.sample_rate` ; aux autres fréquences
+        le pas est ramené à la puissance de deux de durée la plus proche (256 à
+        16 kHz) et la trame vaut quatre pas.
+        """
+        hop_length = 2 ** round(math.log2(self.hop_length * sr / self.sample_rate))
+        return 4 * hop_length, hop_length
+    
+    @traced()
+    def resample(self, audio_data, orig_sr, target_sr=None):
+        """Rééchantillonner par filtrage polyphase (par défaut vers la fréquence d'analyse)"""
+        target_sr = target_sr or self.analysis_rate
+        audio_data = np.asarray(audio_data, dtype=np.float32)
+        if orig_sr == target_sr:
+            return audio_data
+        from scipy import signal
+        g = math.gcd(int(orig_sr), int(target_sr))
+        return signal.resample_poly(audio_data, target_sr // g, orig_sr // g).astype(np.float32)
+    
+    @traced()
+    def load_audio(self, path, sr=None):
+        """Charger un enregistrement en mono à la fréquence d'analyse
+        
+        Le rééchantillonnage n'est fait qu'une fois par fichier : le signal
+        rééchantillonné est conservé dans le cache disque, à côté des
+        caractéristiques, et en mémoire dans `audio_cache`. Renvoie
+        `(audio_data, sr)` ; le tableau est partagé et en lecture seule.
+        """
+        sr = sr or self.analysis_rate
+        
+        def compute():
+            audio_data, file_sr = self.read_audio(path)
+            return {"audio": self.resample(audio_data, file_sr, sr)}
+        
+        def decode():
+            if self.cache is None:
+                return compute()["audio"], sr
+            return self.cache.get_or_compute(path, {"resampled": sr}, compute, memory=False)["audio"], sr
+        
+        return self.audio_cache.get_or_decode(path, sr, decode)
+    
+    def read_audio(self, path):
+        """Signal mono d'un enregistrement à sa fréquence d'origine (lecture), via `audio_cache`
+        
+        Renvoie `(audio_data, sr)` ; le tableau est partagé et en lecture seule.
+        """
+        def decode():
+            audio_data, file_sr = sf.read(path, dtype="float32", always_2d=True)
+            return audio_data.mean(axis=1), file_sr
+        
+        return self.audio_cache.get_or_decode(path, None, decode)
+    
+    @traced()
+    def detect_speech(self, audio_data, sr):
+        """Segments de parole `[[début, fin], ...]` (échantillons, alignés sur le pas d'analyse)
+        
+        Une seule passe vectorisée sur des trames contiguës d'un pas : énergie
+        (dB) et taux de passages par zéro. Une trame est de la parole si son
+        énergie dépasse le plancher de bruit de `vad_threshold_db` (et reste à
+        moins de `vad_range_db` du maximum), ou si elle dépasse le plancher de
+        6 dB avec beaucoup de passages par zéro (fricatives sourdes). Les pauses
+        de moins de `vad_min_silence` s sont comblées, les segments de moins de
+        `vad_min_speech` s écartés, puis chaque segment est élargi de
+        `vad_padding` s.
+        """
+        audio_data = np.asarray(audio_data, dtype=np.float32)
+        hop_length = self.frame_settings(sr)[1]
+        n_frames = len(audio_data) // hop_length
+        frames = audio_data[:n_frames * hop_length].reshape(n_frames, hop_length)
+        energy_db, zcr = speech_frame_stats(frames)
+        return self.speech_from_stats(energy_db, zcr, len(audio_data), sr)
+    
+    def speech_from_stats(self, energy_db, zcr, n_samples, sr):
+        """Segments de parole à partir des statistiques par pas (voir detect_speech)
+        
+        Séparé du calcul des statistiques pour le traitement en flux, qui les
+        accumule bloc par bloc avant de décider des segments.
+        """
+        hop_length = self.frame_settings(sr)[1]
+        n_frames = len(energy_db)
+        if n_frames == 0:
+            return np.zeros((0, 2), dtype=np.int64)
+        
+        floor = np.percentile(energy_db, 10)
+        threshold = max(floor + self.vad_threshold_db, np.percentile(energy_db, 99) - self.vad_range_db)
+        speech = (energy_db > threshold) | ((energy_db > floor + 6) & (zcr > self.vad_zcr))
+        
+        # Segments [début, fin) en trames
+        edges = np.diff(np.concatenate([[0], speech.astype(np.int8), [0]]))
+        starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+        frame_duration = hop_length / sr
+        if len(starts):
+            # Combler les pauses courtes, écarter les segments trop brefs
+            gaps = (starts[1:] - ends[:-1]) * frame_duration
+            keep = np.concatenate([[True], gaps >= self.vad_min_silence])
+            starts, ends = starts[keep], np.concatenate([ends[:-1][keep[1:]], ends[-1:]])
+            long_enough = (ends - starts) * frame_duration >= self.vad_min_speech
+            starts, ends = starts[long_enough], ends[long_enough]
+        
+        padding = int(round(self.vad_padding / frame_duration))
+        starts = np.maximum(starts - padding, 0)
+        ends = np.minimum(ends + padding, n_frames)
+        # Segments élargis qui se chevauchent : fusion
+        if len(starts) > 1:
+            separate = np.concatenate([[True], starts[1:] > ends[:-1]])
+            ends = np.maximum.reduceat(ends, np.flatnonzero(separate))
+            starts = starts[separate]
+        spans = np.stack([starts, ends], axis=1).astype(np.int64) * hop_length
+        # Le dernier segment va jusqu'au bout du signal s'il touche la dernière trame
+        spans[spans[:, 1] == n_frames * hop_length, 1] = n_samples
+        return spans
+    
+    def speech_spans(self, audio_data, sr):
+        """Segments à analyser : la parole détectée, ou tout le signal (VAD désactivée, rien détecté)"""
+        spans = self.detect_speech(audio_data, sr) if self.vad else np.zeros((0, 2), dtype=np.int64)
+        if len(spans) == 0:
+            spans = np.array([[0, len(audio_data)]], dtype=np.int64)
+        return spans
+    
+    def _f0_on_spans(self, audio_data, sr, engine, spans):
+        """F0, voisement et probabilité calculés segment par segment, sur la ligne de temps complète
+        
+        Les segments sont alignés sur le pas : la trame t d'un segment commençant
+        à l'échantillon `start` est la trame globale start / hop + t. Hors
+        segments, F0 vaut NaN et les trames sont non voisées. Les segments plus
+        longs que `f0_chunk_duration` sont coupés en fenêtres qui se chevauchent ;
+        avec `f0_workers` > 1 et assez de parole, les morceaux sont analysés en
+        parallèle (voir modules.parallel_f0).
+        """
+        frame_length, hop_length = self.frame_settings(sr)
+        chunks = plan_chunks(spans, hop_length, int(self.f0_chunk_duration * sr),
+                             int(self.f0_chunk_overlap * sr))
+        kwargs = dict(engine=engine or self.f0_engine, fmin=self.f_min, fmax=self.f_max,
+                      frame_length=frame_length, hop_length=hop_length)
+        
+        speech = sum(end - start for start, end in spans) / sr
+        if self.f0_workers > 1 and len(chunks) > 1 and speech >= self.parallel_min_duration:
+            with span("parallel_f0", workers=self.f0_workers, chunks=len(chunks)):
+                results = parallel_tracks(audio_data, sr, chunks, self.f0_workers, **kwargs)
+        else:
+            results = chunk_tracks(audio_data, sr, chunks, **kwargs)
+        return stitch(chunks, results, 1 + len(audio_data) // hop_length)
     
-    def extract_f0(self, audio_data, sr):
-        """Extraire la fréquence fondamentale"""
-        f0, voiced_flag, voiced_probs = librosa.pyin(audio_data, f_min=80, f_max=400, sr=sr)
+    @traced()
+    def extract_f0(self, audio_data, sr, engine=None, spans=None):
+        """Extraire la fréquence fondamentale (méthode par défaut : self.f0_engine)
+        
+        Seuls les segments de parole sont analysés (`spans`, détectés s'ils ne
+        sont pas donnés) ; le résultat couvre tout le signal.
+        """
+        audio_data = np.asarray(audio_data, dtype=np.float32)
+        if spans is None:
+            spans = self.speech_spans(audio_data, sr)
+        f0, voiced_flag, _ = self._f0_on_spans(audio_data, sr, engine, spans)
         return f0, voiced_flag
     
-    def extract_amplitude(self, audio_data):
-        """Extraire l'enveloppe d'amplitude"""
-        amplitude = np.abs(signal.hilbert(audio_data))
+    @traced()
+    def extract_amplitude(self, audio_data, hop_length=None):
+        """Extraire l'enveloppe d'amplitude (float32, moyennée par trame si hop_length est donné)"""
+        amplitude = hilbert_envelope(audio_data, hop_length=hop_length)
         return amplitude
     
-    def extract_mfcc(self, audio_data, sr):
+    @traced()
+    def extract_mfcc(self, audio_data, sr, graph=None):
         """Extraire les coefficients MFCC"""
-        mfcc = librosa.feature.mfcc(y=audio_data, sr=sr, n_mfcc=13)
+        graph = graph or self.feature_graph(audio_data, sr)
+        mfcc = graph.get("mfcc")
         return mfcc
     
+    def feature_graph(self, audio_data, sr):
+        """Graphe de caractéristiques spectrales partageant une seule STFT"""
+        n_fft, hop_length = self.frame_settings(sr)
+        return FeatureGraph(audio_data, sr, n_fft=n_fft, hop_length=hop_length, n_mfcc=self.n_mfcc)
+    
+    def stream_features(self, path, sr=None, engine=None, block_duration=30.0):
+        """Caractéristiques d'un long enregistrement en flux, à mémoire bornée (voir modules.streaming)"""
+        from modules.streaming import FeatureStream
+        return FeatureStream(self, path, sr=sr, engine=engine, block_duration=block_duration)
+    
+    def spectrogram_tiles(self, path, audio_data=None, sr=None):
+        """Pyramide de tuiles du spectrogramme (dB) d'un enregistrement (voir modules.spectrogram_tiles)
+        
+        Avec un cache disque, la pyramide y est écrite une fois par contenu et
+        par réglage, puis seulement relue ; sinon elle est construite en mémoire.
+        """
+        from modules.spectrogram_tiles import FORMAT_VERSION, SpectrogramPyramid, build_pyramid, evict_pyramids
+        
+        sr = sr or self.analysis_rate
+        n_fft, hop_length = self.frame_settings(sr)
+        if audio_data is None:
+            audio_data, sr = self.load_audio(path, sr)
+        if self.cache is None:
+            return build_pyramid(audio_data, sr, n_fft, hop_length)
+        
+        root = os.path.join(self.cache.cache_dir, "tiles")
+        key = self.cache.make_key(self.cache.content_hash(path),
+                                  {"spectrogram": [sr, n_fft, hop_length], "tiles": FORMAT_VERSION})
+        directory = os.path.join(root, key)
+        pyramid = SpectrogramPyramid.open(directory, tile_cache=self.tile_cache)
+        if pyramid is not None:
+            # Rafraîchir la date pour que l'éviction suive l'ordre LRU
+            try:
+                os.utime(os.path.join(directory, "header.json"))
+            except OSError:
+                pass
+            return pyramid
+        os.makedirs(root, exist_ok=True)
+        pyramid = build_pyramid(audio_data, sr, n_fft, hop_length, directory=directory, tile_cache=self.tile_cache)
+        evict_pyramids(root, self.tile_disk_bytes)
+        return pyramid
+    
+    @traced()
     def normalize_audio(self, audio_data):
-        """Normaliser l'audio"""
-        return audio_data / np.max(np.abs(audio_data))
+        """Normaliser l'audio (une seule copie : le maximum est cherché sans tableau |x|)"""
+        peak = max(np.max(audio_data), -np.min(audio_data))
+        return audio_data / peak
     
+    @traced()
     def apply_preemphasis(self, audio_data, coef=0.97):
-        """Appliquer un filtre de préaccentuation"""
-        return np.append(audio_data[0], audio_data[1:] - coef * audio_data[:-1])
+        """Appliquer un filtre de préaccentuation (écrit directement dans le tableau de sortie)"""
+        audio_data = np.asarray(audio_data, dtype=np.result_type(audio_data, np.float32))
+        emphasized = np.empty_like(audio_data)
+        if len(audio_data):
+            emphasized[0] = audio_data[0]
+            np.multiply(audio_data[:-1], -coef, out=emphasized[1:])
+            emphasized[1:] += audio_data[1:]
+        return emphasized
+    
+    def feature_params(self, sr, engine=None):
+        """Paramètres d'extraction qui déterminent la clé du cache"""
+        frame_length, hop_length = self.frame_settings(sr)
+        return {
+            "sr": sr,
+            "engine": engine or self.f0_engine,
+            "f_min": self.f_min,
+            "f_max": self.f_max,
+            "frame_length": frame_length,
+            "hop_length": hop_length,
+            "n_mfcc": self.n_mfcc,
+            "vad": [self.vad_threshold_db, self.vad_range_db, self.vad_zcr, self.vad_min_silence,
+                    self.vad_min_speech, self.vad_padding] if self.vad else None,
+            "f0_chunk": [self.f0_chunk_duration, self.f0_chunk_overlap],
+            "features": 4,
+        }
+    
+    @traced()
+    def compute_features(self, audio_data, sr, engine=None, graph=None):
+        """Calculer F0, voisement, enveloppe d'amplitude et MFCC d'un signal
+        
+        F0 et enveloppe ne sont calculées que sur les segments de parole
+        (`speech`, en échantillons), puis replacées sur la ligne de temps du
+        signal complet : F0 NaN, non voisé et amplitude nulle ailleurs. Les MFCC
+        viennent de la STFT partagée, calculée sur tout le signal pour le
+        spectrogramme.
+        """
+        hop_length = self.frame_settings(sr)[1]
+        audio_data = np.asarray(audio_data, dtype=np.float32)
+        spans = self.speech_spans(audio_data, sr)
+        
+        f0, voiced_flag, voiced_probs = self._f0_on_spans(audio_data, sr, engine, spans)
+        amplitude = np.zeros(len(audio_data), dtype=np.float32)
+        for start, end in spans:
+            amplitude[start:end] = self.extract_amplitude(audio_data[start:end])
+        
+        return {
+            "f0": f0,
+            "voiced_flag": voiced_flag,
+            "voiced_probs": voiced_probs,
+            "amplitude": amplitude,
+            "envelope": frame_average(amplitude, hop_length),
+            "mfcc": self.extract_mfcc(audio_data, sr, graph=graph),
+            "speech": spans,
+        }
+    
+    @traced()
+    def extract_features(self, path, sr=None, engine=None, audio_data=None, graph=None):
+        """Extraire les caractéristiques d'un fichier, en passant par le cache si disponible
+        
+        L'extraction se fait à la fréquence d'analyse (`self.analysis_rate` par
+        défaut). `audio_data` et `graph` évitent de recharger le fichier et de
+        recalculer la STFT quand l'appelant les a déjà.
+        """
+        sr = sr or self.analysis_rate
+        
+        def compute():
+            samples = audio_data
+            if samples is None:
+                samples, _ = self.load_audio(path, sr)
+            return self.compute_features(samples, sr, engine=engine, graph=graph)
+        
+        if self.cache is None:
+            return compute()
+        return self.cache.get_or_compute(path, self.feature_params(sr, engine=engine), compute)
+    
+    def feature_file_path(self, path):
+        """Chemin du fichier .feat associé à un enregistrement"""
+        return os.path.splitext(path)[0] + ".feat"
+    
+    @traced()
+    def write_feature_file(self, path, sr=None, engine=None):
+        """Extraire les pistes d'un enregistrement et les écrire à côté du WAV
+        
+        F0 et enveloppe en float32 ; probabilité de voisement, indicateur de
+        voisement et mel-spectrogramme (dB) en float16 ; MFCC en float32.
+        """
+        import librosa
+        
+        sr = sr or self.analysis_rate
+        audio_data, sr = self.load_audio(path, sr)
+        graph = self.feature_graph(audio_data, sr)
+        features = self.extract_features(path, sr=sr, engine=engine, audio_data=audio_data, graph=graph)
+        st = os.stat(path)
+        header = {
+            "params": self.feature_params(sr, engine=engine),
+            "sr": sr,
+            "hop_length": self.frame_settings(sr)[1],
+            "content_hash": self.cache.content_hash(path) if self.cache else hash_file(path),
+            "wav_stamp": [st.st_mtime_ns, st.st_size],
+            "speech": features["speech"].tolist(),
+        }
+        tracks = {
+            "f0": features["f0"].astype(np.float32),
+            "voiced_probs": features["voiced_probs"].astype(np.float16),
+            "voiced_flag": features["voiced_flag"].astype(np.float16),
+            "envelope": features["envelope"].astype(np.float32),
+            "mel": librosa.power_to_db(graph.get("mel")).astype(np.float16),
+            "mfcc": features["mfcc"].astype(np.float32),
+        }
+        feat_path = self.feature_file_path(path)
+        write_feature_file(feat_path, tracks, header)
+        return feat_path
+    
+    def open_feature_file(self, path, sr=None, engine=None):
+        """Ouvrir le fichier .feat d'un enregistrement, ou None s'il manque ou est périmé
+        
+        Le fichier est périmé si le WAV a changé depuis l'extraction ou si les
+        paramètres d'extraction diffèrent de ceux demandés.
+        """
+        try:
+            features = FeatureFile(self.feature_file_path(path))
+        except (OSError, ValueError):
+            return None
+        
+        sr = sr or self.analysis_rate
+        if features.params != self.feature_params(sr, engine=engine):
+            return None
+        st = os.stat(path)
+        if features.header.get("wav_stamp") != [st.st_mtime_ns, st.st_size]:
+            content_hash = self.cache.content_hash(path) if self.cache else hash_file(path)
+            if features.header.get("content_hash") != content_hash:
+                return None
+        return features
@@ -0,0 +1,229 @@
+"""Analyse en lot d'un corpus d'enregistrements, sans interface graphique
+
+Usage (depuis la racine du dépôt) :
+    python -m modules.batch enregistrements/ -o resultats.csv --workers 8
+
+Chaque fichier WAV est analysé dans un processus séparé ; les résumés sont
+ajoutés au fichier de sortie (CSV ou JSON-lines selon l'extension) au fur et à
+mesure. Relancer la même commande reprend là où l'analyse s'était arrêtée ;
+avec une autre méthode F0 ou fréquence d'analyse, les fichiers déjà traités
+sont réanalysés.
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from modules.recordings import find_recordings, parse_recording_name
+
+FIELDS = ["path", "mode", "name", "speaker", "duration", "rms", "speech_duration", "speech_rms",
+          "f0_mean", "f0_min", "f0_max", "voiced_ratio", "engine", "sr", "error"]
+
+# Au-delà (s), un fichier est analysé en flux, sans être chargé en mémoire
+STREAMING_DURATION = 600.0
+
+# Les workers se partagent les cœurs : pas de parallélisme interne BLAS/numba
+SINGLE_THREAD_ENV = {
+    "OMP_NUM_THREADS": "1",
+    "OPENBLAS_NUM_THREADS": "1",
+    "MKL_NUM_THREADS": "1",
+    "NUMBA_NUM_THREADS": "1",
+}
+
+def single_thread_worker():
+    """Exécuté au démarrage de chaque processus du pool (l'environnement de l'appelant n'est pas modifié)"""
+    os.environ.update(SINGLE_THREAD_ENV)
+
+class _TrackRecorder:
+    """Flux de caractéristiques dont les pistes F0, voisement et enveloppe sont gardées au passage"""
+    
+    def __init__(self, stream):
+        self.stream = stream
+        self.blocks = []
+    
+    def __iter__(self):
+        for block in self.stream:
+            self.blocks.append((block["f0"], block["voiced_flag"], block["envelope"]))
+            yield block
+    
+    def stats(self):
+        return self.stream.stats()
+
+def analyze_recording(processor, path, engine):
+    """Résumé prosodique et pistes par trame d'un enregistrement (analyse partagée avec modules.server)
+    
+    Les pistes viennent du fichier .feat s'il est à jour ; sinon les longs
+    enregistrements sont lus en flux, les autres passent par extract_features
+    (et donc par le cache disque du processeur s'il en a un).
+    """
+    import numpy as np
+    import soundfile as sf
+    from modules.prosody_analyzer import ProsodyAnalyzer
+    
+    sr = processor.analysis_rate
+    hop_length = processor.frame_settings(sr)[1]
+    # Pistes déjà extraites (fichier .feat à jour) : pas de nouveau calcul de F0
+    features = processor.open_feature_file(path, engine=engine)
+    if features is None and sf.info(path).duration > STREAMING_DURATION:
+        # Long enregistrement : lu en flux, jamais chargé en entier
+        stream = processor.stream_features(path, engine=engine)
+        recorder = _TrackRecorder(stream)
+        summary = ProsodyAnalyzer().analyze_prosody_stream(recorder)
+        f0, voiced_flag, envelope = (np.concatenate(track) for track in zip(*recorder.blocks))
+        spans = stream.spans
+    else:
+        audio_data, sr = processor.load_audio(path)
+        if features is not None:
+            f0, voiced_flag = np.array(features["f0"]), np.array(features["voiced_flag"]) > 0.5
+            envelope = np.array(features["envelope"])
+            spans = np.array(features.header["speech"], dtype=np.int64).reshape(-1, 2)
+        else:
+            # F0 et enveloppe calculées sur les seuls segments de parole
+            extracted = processor.extract_features(path, sr=sr, engine=engine, audio_data=audio_data)
+            f0, voiced_flag, envelope = extracted["f0"], extracted["voiced_flag"], extracted["envelope"]
+            spans = extracted["speech"]
+        voiced_flag = np.asarray(voiced_flag, dtype=bool)
+        if not np.any(voiced_flag):
+            raise ValueError("aucune trame voisée")
+        summary = ProsodyAnalyzer().analyze_prosody(audio_data, sr, f0=f0, spans=spans)
+        summary["voiced_ratio"] = np.mean(voiced_flag)
+    if summary["voiced_ratio"] == 0:
+        raise ValueError("aucune trame voisée")
+    return {
+        "summary": {key: float(value) for key, value in summary.items()},
+        "sr": sr,
+        "hop_length": hop_length,
+        "f0": np.asarray(f0, dtype=np.float32),
+        "voiced_flag": np.asarray(voiced_flag, dtype=bool),
+        "envelope": np.asarray(envelope, dtype=np.float32),
+        "speech": np.asarray(spans, dtype=np.int64).reshape(-1, 2),
+    }
+
+def analyze_file(path, root, sr, engine):
+    """Résumé prosodique d'un fichier (exécuté dans un processus du pool)"""
+    from modules.audio_processor import AudioProcessor
+    
+    mode, name, speaker = parse_recording_name(path, root)
+    row = {"path": path, "mode": mode, "name": name, "speaker": speaker, "engine": engine, "sr": sr,
+           "error": ""}
+    try:
+        row.update(analyze_recording(AudioProcessor(analysis_rate=sr), path, engine)["summary"])
+    except Exception as exc:
+        row["error"] = f"{type(exc).__name__}: {exc}"
+    return row
+
+class ResultWriter:
+    """Écriture incrémentale des résultats en CSV ou JSON-lines"""
+    
+    def __init__(self, output, engine, sr):
+        self.output = output
+        self.jsonl = output.endswith((".jsonl", ".json"))
+        self.done = self._read_done({"engine": engine, "sr": sr})
+        new_file = not os.path.exists(output) or os.path.getsize(output) == 0
+        fieldnames = FIELDS
+        if not self.jsonl and not new_file:
+            # Reprise d'un fichier existant : garder ses colonnes
+            with open(output, newline="", encoding="utf-8") as f:
+                fieldnames = next(csv.reader(f))
+        self._file = open(output, "a", newline="", encoding="utf-8")
+        if not self.jsonl:
+            self._csv = csv.DictWriter(self._file, fieldnames=fieldnames, extrasaction="ignore")
+            if new_file:
+                self._csv.writeheader()
+    
+    def _read_done(self, settings):
+        """Chemins déjà traités avec succès, avec les mêmes réglages, lors d'une exécution précédente
+        
+        Les fichiers en erreur ou analysés avec d'autres réglages (`settings` :
+        méthode F0 et fréquence d'analyse) sont réanalysés : leurs anciennes
+        lignes sont retirées du fichier de sortie, pour ne pas apparaître en
+        double. Un CSV d'une version précédente reçoit les colonnes manquantes.
+        """
+        if not os.path.exists(self.output):
+            return set()
+        with open(self.output, newline="", encoding="utf-8") as f:
+            if self.jsonl:
+                rows = [json.loads(line) for line in f if line.strip()]
+            else:
+                reader = csv.DictReader(f)
+                rows = list(reader)
+        kept = [row for row in rows if not row.get("error")
+                and all(str(row.get(key)) == str(value) for key, value in settings.items())]
+        fieldnames = None
+        if not self.jsonl and reader.fieldnames:
+            fieldnames = reader.fieldnames + [field for field in FIELDS if field not in reader.fieldnames]
+        if len(kept) < len(rows) or (fieldnames and fieldnames != reader.fieldnames):
+            tmp_path = self.output + ".tmp"
+            with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+                if self.jsonl:
+                    f.writelines(json.dumps(row, ensure_ascii=False) + "\n" for row in kept)
+                else:
+                    writer = csv.DictWriter(f, fieldnames=fieldnames)
+                    writer.writeheader()
+                    writer.writerows(kept)
+            os.replace(tmp_path, self.output)
+        return {row["path"] for row in kept}
+    
+    def write(self, row):
+        if self.jsonl:
+            self._file.write(json.dumps(row, ensure_ascii=False) + "\n")
+        else:
+            self._csv.writerow(row)
+        self._file.flush()
+    
+    def close(self):
+        self._file.close()
+
+def run_batch(root, output, workers=None, sr=16000, engine="pyin", recursive=True):
+    """Analyser tous les enregistrements de `root` qui ne figurent pas encore dans `output`"""
+    writer = ResultWriter(output, engine, sr)
+    paths = [p for p in find_recordings(root, recursive) if p not in writer.done]
+    total = len(paths)
+    print(f"{len(writer.done)} déjà traités, {total} à analyser", file=sys.stderr)
+    if not paths:
+        writer.close()
+        return 0
+    
+    workers = workers or os.cpu_count()
+    start = time.perf_counter()
+    failures = 0
+    context = multiprocessing.get_context("spawn")
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=single_thread_worker) as pool:
+            futures = [pool.submit(analyze_file, path, root, sr, engine) for path in paths]
+            for done, future in enumerate(as_completed(futures), 1):
+                row = future.result()
+                writer.write(row)
+                if row["error"]:
+                    failures += 1
+                    print(f"Erreur {row['path']}: {row['error']}", file=sys.stderr)
+                elapsed = time.perf_counter() - start
+                print(f"\r[{done}/{total}] {done / elapsed:.2f} fichiers/s", end="", file=sys.stderr)
+    finally:
+        writer.close()
+        print(file=sys.stderr)
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("directory", help="dossier contenant les enregistrements WAV")
+    parser.add_argument("-o", "--output", default="resultats.csv",
+                        help="fichier de sortie (.csv ou .jsonl)")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="nombre de processus (défaut : nombre de cœurs)")
+    parser.add_argument("--sr", type=int, default=16000, help="fréquence d'échantillonnage d'analyse")
+    parser.add_argument("--engine", default="pyin", help="méthode F0 (pyin, yin, autocorr)")
+    parser.add_argument("--no-recursive", action="store_true", help="ne pas parcourir les sous-dossiers")
+    args = parser.parse_args()
+    
+    failures = run_batch(args.directory, args.output, workers=args.workers, sr=args.sr,
+                         engine=args.engine, recursive=not args.no_recursive)
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""Module du catalogue des enregistrements (SQLite)
+
+Le catalogue garde pour chaque fichier WAV du dossier d'enregistrements son
+chemin, sa modalité, son locuteur, sa durée, sa fréquence d'échantillonnage,
+l'empreinte de son contenu et des statistiques résumées (durée, RMS, F0). Il
+est relu instantanément au démarrage ; le parcours du dossier est incrémental :
+un fichier dont la taille et la date n'ont pas changé n'est ni relu ni haché.
+"""
+
+import os
+import sqlite3
+import threading
+
+import numpy as np
+import soundfile as sf
+
+from modules.feature_cache import hash_file
+from modules.recordings import find_recordings, parse_recording_name
+
+SUMMARY_FIELDS = ("rms", "speech_duration", "speech_rms", "f0_mean", "f0_min", "f0_max", "voiced_ratio")
+
+SORT_KEYS = {
+    "name": "name COLLATE NOCASE",
+    "mode": "mode, name COLLATE NOCASE",
+    "speaker": "speaker, name COLLATE NOCASE",
+    "duration": "duration",
+    "f0_mean": "f0_mean",
+    "mtime": "mtime_ns",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS recordings (
+    path TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    speaker TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    duration REAL,
+    sample_rate INTEGER,
+    content_hash TEXT,
+    rms REAL,
+    speech_duration REAL,
+    speech_rms REAL,
+    f0_mean REAL,
+    f0_min REAL,
+    f0_max REAL,
+    voiced_ratio REAL,
+    summary_engine TEXT
+);
+CREATE INDEX IF NOT EXISTS recordings_name ON recordings (name);
+CREATE INDEX IF NOT EXISTS recordings_mode ON recordings (mode);
+CREATE INDEX IF NOT EXISTS recordings_speaker ON recordings (speaker);
+"""
+
+def compute_summary(audio_processor, path, engine="yin"):
+    """Statistiques résumées d'un enregistrement, à la fréquence d'analyse
+    
+    RMS du signal entier et durée/RMS de la seule parole (sans les silences).
+    """
+    from modules.audio_processor import speech_stats
+    
+    features = audio_processor.extract_features(path, engine=engine)
+    audio_data, sr = audio_processor.load_audio(path)
+    stats = speech_stats(audio_data, sr, features["speech"])
+    f0 = features["f0"]
+    voiced = f0[np.isfinite(f0) & (f0 > 0)]
+    return {
+        "rms": stats["rms"],
+        "speech_duration": stats["speech_duration"],
+        "speech_rms": stats["speech_rms"],
+        "f0_mean": float(voiced.mean()) if len(voiced) else None,
+        "f0_min": float(voiced.min()) if len(voiced) else None,
+        "f0_max": float(voiced.max()) if len(voiced) else None,
+        "voiced_ratio": float(np.mean(features["voiced_flag"])) if len(f0) else 0.0,
+    }
+
+class RecordingCatalogue:
+    """Catalogue persistant des enregistrements d'un dossier"""
+    
+    def __init__(self, root, db_path=None):
+        self.root = root
+        self.db_path = db_path or os.path.join(root, ".catalogue.sqlite3")
+        os.makedirs(root, exist_ok=True)
+        # Connexion partagée entre le thread Tk et les analyses en arrière-plan
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+            self._add_missing_columns()
+    
+    def _add_missing_columns(self):
+        """Ajouter à une base existante les statistiques apparues depuis sa création
+        
+        Les résumés existants sont alors marqués à recalculer.
+        """
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(recordings)")}
+        missing = [field for field in SUMMARY_FIELDS if field not in columns]
+        for field in missing:
+            self._conn.execute(f"ALTER TABLE recordings ADD COLUMN {field} REAL")
+        if missing:
+            self._conn.execute("UPDATE recordings SET summary_engine = NULL")
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
+    
+    def _describe(self, path, st, previous=None):
+        """Colonnes d'un fichier nouveau ou modifié (en-tête WAV et empreinte)"""
+        mode, name, speaker = parse_recording_name(path, self.root)
+        row = {
+            "path": path,
+            "name": os.path.splitext(os.path.relpath(path, self.root))[0],
+            "mode": mode,
+            "speaker": speaker,
+            "mtime_ns": st.st_mtime_ns,
+            "size": st.st_size,
+            "duration": None,
+            "sample_rate": None,
+            "content_hash": hash_file(path),
+            "summary_engine": None,
+        }
+        row.update(dict.fromkeys(SUMMARY_FIELDS))
+        try:
+            info = sf.info(path)
+            row["duration"] = info.frames / info.samplerate
+            row["sample_rate"] = info.samplerate
+        except RuntimeError:
+            pass
+        
+        # Fichier seulement touché : le contenu est le même, les résumés restent valides
+        if previous is not None and previous["content_hash"] == row["content_hash"]:
+            for field in SUMMARY_FIELDS + ("summary_engine",):
+                row[field] = previous[field]
+        return row
+    
+    def _upsert(self, row):
+        columns = ", ".join(row)
+        placeholders = ", ".join(f":{key}" for key in row)
+        self._conn.execute(f"INSERT OR REPLACE INTO recordings ({columns}) VALUES ({placeholders})", row)
+    
+    def scan(self, recursive=True):
+        """Mettre le catalogue à jour avec le contenu du dossier
+        
+        Renvoie `(ajoutés, modifiés, supprimés)`. Seuls les fichiers dont la
+        taille ou la date ont changé sont relus.
+        """
+        with self._lock:
+            known = {row["path"]: row for row in self._conn.execute("SELECT * FROM recordings")}
+        
+        changed = []
+        seen = set()
+        for path in find_recordings(self.root, recursive):
+            path = os.path.normpath(path)
+            seen.add(path)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            previous = known.get(path)
+            if previous is not None and (previous["mtime_ns"], previous["size"]) == (st.st_mtime_ns, st.st_size):
+                continue
+            changed.append(self._describe(path, st, previous))
+        
+        removed = [path for path in known if path not in seen]
+        with self._lock, self._conn:
+            for row in changed:
+                self._upsert(row)
+            self._conn.executemany("DELETE FROM recordings WHERE path = ?", [(path,) for path in removed])
+        
+        added = sum(1 for row in changed if row["path"] not in known)
+        return added, len(changed) - added, len(removed)
+    
+    def add(self, path):
+        """Ajouter ou rafraîchir un seul fichier (fin d'un enregistrement)"""
+        path = os.path.normpath(path)
+        with self._lock:
+            previous = self._conn.execute("SELECT * FROM recordings WHERE path = ?", (path,)).fetchone()
+        row = self._describe(path, os.stat(path), previous)
+        with self._lock, self._conn:
+            self._upsert(row)
+        return row["name"]
+    
+    def set_summary(self, path, summary, engine):
+        """Enregistrer les statistiques résumées d'un fichier"""
+        values = {field: summary.get(field) for field in SUMMARY_FIELDS}
+        assignments = ", ".join(f"{field} = :{field}" for field in values)
+        with self._lock, self._conn:
+            self._conn.execute(f"UPDATE recordings SET {assignments}, summary_engine = :engine "
+                               f"WHERE path = :path", dict(values, engine=engine, path=os.path.normpath(path)))
+    
+    def pending_summaries(self):
+        """Chemins des fichiers sans statistiques résumées"""
+        with self._lock:
+            rows = self._conn.execute("SELECT path FROM recordings WHERE summary_engine IS NULL "
+                                      "ORDER BY mtime_ns DESC").fetchall()
+        return [row["path"] for row in rows]
+    
+    def query(self, text="", mode=None, speaker=None, order_by="name", descending=False, limit=None):
+        """Enregistrements filtrés et triés (liste de sqlite3.Row)
+        
+        `text` filtre sur le nom (sous-chaîne, sans casse) ; `order_by` est une
+        clé de SORT_KEYS.
+        """
+        if order_by not in SORT_KEYS:
+            raise ValueError(f"Tri inconnu: {order_by} (disponibles: {', '.join(SORT_KEYS)})")
+        clauses = []
+        params = []
+        if text:
+            clauses.append("name LIKE ? ESCAPE '\\'")
+            escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            params.append(f"%{escaped}%")
+        if mode:
+            clauses.append("mode = ?")
+            params.append(mode)
+        if speaker:
+            clauses.append("speaker = ?")
+            params.append(speaker)
+        
+        sql = "SELECT * FROM recordings"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        direction = " DESC" if descending else ""
+        sql += " ORDER BY " + ", ".join(f"{key}{direction}" for key in SORT_KEYS[order_by].split(", "))
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+    
+    def get(self, name):
+        """Enregistrement d'après son nom, ou None"""
+        with self._lock:
+            return self._conn.execute("SELECT * FROM recordings WHERE name = ?", (name,)).fetchone()
+    
+    def modes(self):
+        """Modalités présentes dans le catalogue"""
+        with self._lock:
+            # Les fichiers sans modalité ont un mode vide : ce n'est pas une modalité
+            return [row[0] for row in self._conn.execute(
+                "SELECT DISTINCT mode FROM recordings WHERE mode != '' ORDER BY mode")]
+    
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM recordings").fetchone()[0]
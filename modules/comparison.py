@@ -0,0 +1,137 @@
+"""Module de calcul des comparaisons (indépendant de l'interface)"""
+
+import os
+
+import numpy as np
+
+from modules.alignment import f0_contour, pairwise_distances, resample_contour, warp_to_reference
+from modules.instrumentation import span, traced
+from modules.lod import MinMaxPyramid
+
+def _display_audio(audio_processor, path, display_sr):
+    """Signal tracé (forme d'onde, spectrogramme) : à `display_sr`, ou à la fréquence du fichier"""
+    if display_sr is None:
+        return audio_processor.read_audio(path)
+    return audio_processor.load_audio(path, display_sr)
+
+@traced()
+def compute_comparison(audio_processor, path1, path2, sr=None, engine=None, progress=None, display_sr=None):
+    """Calculer les données affichées par l'onglet Comparaison
+    
+    Toute l'analyse se fait à la fréquence `sr` (par défaut la fréquence
+    d'analyse du processeur), renvoyée dans le résultat. La forme d'onde et le
+    spectrogramme sont tracés à `display_sr`, par défaut la fréquence d'origine
+    de chaque fichier (toute la bande, fricatives comprises). `engine` choisit
+    la méthode F0 (voir modules.f0_engines). `progress(stage, fraction)` est
+    appelé entre les étapes ; il peut lever une exception pour interrompre le
+    calcul (annulation).
+    """
+    def report(stage, fraction):
+        if progress is not None:
+            progress(stage, fraction)
+    
+    report("Chargement", 0.0)
+    audio1, sr = audio_processor.load_audio(path1, sr)
+    audio2, sr = audio_processor.load_audio(path2, sr)
+    display1, display_sr1 = _display_audio(audio_processor, path1, display_sr)
+    display2, display_sr2 = _display_audio(audio_processor, path2, display_sr)
+    
+    # Spectrogrammes en tuiles multi-résolution, construits par blocs (relus du cache disque ensuite)
+    report("Spectrogrammes", 0.15)
+    with span("spectrogram_tiles"):
+        tiles1 = audio_processor.spectrogram_tiles(path1, display1, display_sr1)
+        tiles2 = audio_processor.spectrogram_tiles(path2, display2, display_sr2)
+    
+    # Graphe à la fréquence d'analyse : sa STFT ne sert ici qu'aux MFCC (le spectrogramme affiché
+    # vient des tuiles) et n'est calculée que si les caractéristiques ne sont pas en cache
+    graph1 = audio_processor.feature_graph(audio1, sr)
+    graph2 = audio_processor.feature_graph(audio2, sr)
+    
+    report("F0 et enveloppe (1/2)", 0.3)
+    features1 = audio_processor.extract_features(path1, sr=sr, engine=engine, audio_data=audio1, graph=graph1)
+    report("F0 et enveloppe (2/2)", 0.65)
+    features2 = audio_processor.extract_features(path2, sr=sr, engine=engine, audio_data=audio2, graph=graph2)
+    
+    # Pyramides min/max pour le tracé à niveau de détail des longues courbes
+    report("Niveaux de détail", 0.9)
+    with span("MinMaxPyramid"):
+        pyramids = {
+            "audio1": MinMaxPyramid(display1),
+            "audio2": MinMaxPyramid(display2),
+            "amplitude1": MinMaxPyramid(features1["amplitude"], dx=1 / sr),
+            "amplitude2": MinMaxPyramid(features2["amplitude"], dx=1 / sr),
+        }
+    
+    report("Terminé", 1.0)
+    return {
+        "sr": sr,
+        "audio1": audio1,
+        "audio2": audio2,
+        "tiles1": tiles1,
+        "tiles2": tiles2,
+        "features1": features1,
+        "features2": features2,
+        "pyramids": pyramids,
+    }
+
+def load_f0_track(audio_processor, path, sr, engine=None):
+    """F0 et voisement d'un enregistrement : fichier .feat à jour, sinon extraction (cache)"""
+    features = audio_processor.open_feature_file(path, sr, engine=engine)
+    if features is not None:
+        return np.array(features["f0"]), np.array(features["voiced_flag"]) > 0.5
+    features = audio_processor.extract_features(path, sr=sr, engine=engine)
+    return features["f0"], np.asarray(features["voiced_flag"], dtype=bool)
+
+@traced()
+def compute_multi_comparison(audio_processor, paths, sr=None, engine=None, band=0.1,
+                             length=200, progress=None):
+    """Comparer N enregistrements par alignement DTW de leurs contours de F0
+    
+    Les contours (demi-tons relatifs à la médiane de chaque enregistrement)
+    sont rééchantillonnés à `length` points puis alignés deux à deux avec une
+    bande de Sakoe-Chiba de largeur `band` (fraction de la longueur). Ils sont
+    aussi ramenés sur l'axe du temps du premier enregistrement (référence) pour
+    la superposition. `progress` comme pour compute_comparison.
+    """
+    def report(stage, fraction):
+        if progress is not None:
+            progress(stage, fraction)
+    
+    sr = sr or audio_processor.analysis_rate
+    hop_length = audio_processor.frame_settings(sr)[1]
+    names = [os.path.splitext(os.path.basename(path))[0] for path in paths]
+    
+    contours = []
+    durations = []
+    for i, path in enumerate(paths):
+        report(f"F0 ({i + 1}/{len(paths)})", 0.8 * i / len(paths))
+        f0, voiced_flag = load_f0_track(audio_processor, path, sr, engine=engine)
+        try:
+            contour, _ = f0_contour(f0, voiced_flag)
+        except ValueError:
+            raise ValueError(f"{names[i]}: aucune trame voisée") from None
+        contours.append(contour)
+        durations.append(len(contour) * hop_length / sr)
+    
+    report("Alignement DTW", 0.8)
+    with span("pairwise_distances", pairs=len(paths) * (len(paths) - 1) // 2):
+        distances = pairwise_distances(contours, band=band, length=length)
+    
+    # Superposition sur l'axe du temps de la référence
+    reference = resample_contour(contours[0], length)
+    aligned = [reference]
+    for contour in contours[1:]:
+        warped, _ = warp_to_reference(reference, resample_contour(contour, length), band)
+        aligned.append(warped)
+    
+    report("Terminé", 1.0)
+    return {
+        "sr": sr,
+        "names": names,
+        "contours": contours,
+        "durations": durations,
+        "reference_times": np.linspace(0, durations[0], length),
+        "aligned": np.array(aligned),
+        "distances": distances,
+        "band": band,
+    }
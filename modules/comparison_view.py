@@ -0,0 +1,155 @@
+"""Module de la vue de comparaison (figure matplotlib persistante)"""
+
+import numpy as np
+from matplotlib.figure import Figure
+
+from modules.instrumentation import span, traced
+from modules.lod import LODLine, MinMaxPyramid, autoscale_lines
+from modules.spectrogram_tiles import TiledSpectrogram
+
+BG_COLOR = "#0a0e27"
+AXES_COLOR = "#1a1f3a"
+TEXT_COLOR = "#e0e0e0"
+COLOR1 = "#00d4ff"
+COLOR2 = "#00ff88"
+
+class ComparisonView:
+    """Figure de comparaison construite une seule fois, mise à jour sur place
+    
+    Les axes, courbes, images et barres de couleur sont créés au premier
+    affichage ; chaque nouvelle comparaison ne remplace que les données et les
+    titres, sans recréer de figure ni de canevas. Sans `master`, la vue utilise
+    un canevas Agg hors écran (benchmarks, tests).
+    """
+    
+    def __init__(self, master=None):
+        self.figure = Figure(figsize=(12, 8), dpi=100, facecolor=BG_COLOR)
+        self._build_axes()
+        
+        if master is None:
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            self.canvas = FigureCanvasAgg(self.figure)
+            self.stats_label = None
+        else:
+            import tkinter as tk
+            from tkinter import ttk
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+            self.canvas = FigureCanvasTkAgg(self.figure, master=master)
+            # Zoom et défilement : spectrogrammes et courbes LOD se recomposent sur la zone visible
+            self.toolbar = NavigationToolbar2Tk(self.canvas, master, pack_toolbar=False)
+            self.toolbar.pack(fill=tk.X)
+            self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+            self.stats_label = ttk.Label(master, text="", font=("Courier New", 9),
+                                         justify=tk.LEFT, wraplength=300)
+            self.stats_label.pack(anchor=tk.W, padx=10, pady=10)
+        
+        # draw_idle() appelle canvas.draw() depuis la boucle Tk : le dessin différé est mesuré aussi
+        self.canvas.draw = traced("canvas.draw", category="interface")(self.canvas.draw)
+        
+        for line in self.lod_lines + self.spectrograms:
+            line.connect_resize(self.canvas)
+    
+    def _style(self, ax, title):
+        title_artist = ax.set_title(title, color=TEXT_COLOR)
+        ax.set_facecolor(AXES_COLOR)
+        ax.tick_params(colors=TEXT_COLOR)
+        return title_artist
+    
+    def _build_axes(self):
+        fig = self.figure
+        empty = MinMaxPyramid(np.zeros(1, dtype=np.float32))
+        
+        # Formes d'onde
+        self.ax_wave1 = fig.add_subplot(3, 2, 1)
+        self.ax_wave2 = fig.add_subplot(3, 2, 2)
+        self.wave1 = LODLine(self.ax_wave1, empty, color=COLOR1, linewidth=0.5)
+        self.wave2 = LODLine(self.ax_wave2, empty, color=COLOR2, linewidth=0.5)
+        self.title_wave1 = self._style(self.ax_wave1, "Forme d'onde")
+        self.title_wave2 = self._style(self.ax_wave2, "Forme d'onde")
+        
+        # Spectrogrammes (tuiles visibles seulement, au niveau de détail de l'axe)
+        self.ax_spec1 = fig.add_subplot(3, 2, 3)
+        self.ax_spec2 = fig.add_subplot(3, 2, 4)
+        self.spec1 = TiledSpectrogram(self.ax_spec1, cmap='Blues')
+        self.spec2 = TiledSpectrogram(self.ax_spec2, cmap='Greens')
+        self.title_spec1 = self._style(self.ax_spec1, "Spectrogramme")
+        self.title_spec2 = self._style(self.ax_spec2, "Spectrogramme")
+        self.ax_spec1.set_ylabel("Fréquence (Hz)", color=TEXT_COLOR)
+        fig.colorbar(self.spec1.image, ax=self.ax_spec1)
+        fig.colorbar(self.spec2.image, ax=self.ax_spec2)
+        
+        # F0
+        self.ax_f0 = fig.add_subplot(3, 2, 5)
+        self.f0_line1, = self.ax_f0.plot([], [], color=COLOR1, linewidth=2)
+        self.f0_line2, = self.ax_f0.plot([], [], color=COLOR2, linewidth=2)
+        self.ax_f0.set_ylabel("F0 (Hz)", color=TEXT_COLOR)
+        self._style(self.ax_f0, "Fréquence Fondamentale (F0)")
+        
+        # Enveloppe d'amplitude
+        self.ax_env = fig.add_subplot(3, 2, 6)
+        self.env1 = LODLine(self.ax_env, empty, color=COLOR1, linewidth=2)
+        self.env2 = LODLine(self.ax_env, empty, color=COLOR2, linewidth=2)
+        self.ax_env.set_ylabel("Amplitude", color=TEXT_COLOR)
+        self.ax_env.set_xlabel("Temps (s)", color=TEXT_COLOR)
+        self._style(self.ax_env, "Enveloppe d'Amplitude")
+        
+        self.lod_lines = (self.wave1, self.wave2, self.env1, self.env2)
+        self.spectrograms = (self.spec1, self.spec2)
+        with span("tight_layout", category="interface"):
+            fig.tight_layout()
+    
+    def _set_legend(self, ax, rec1, rec2):
+        legend = ax.get_legend()
+        if legend is None:
+            ax.legend(loc='upper right', facecolor=AXES_COLOR, edgecolor=TEXT_COLOR)
+        else:
+            legend.get_texts()[0].set_text(rec1)
+            legend.get_texts()[1].set_text(rec2)
+    
+    @traced(category="interface")
+    def update(self, rec1, rec2, result, sr, stats_text=""):
+        """Afficher une nouvelle comparaison en ne remplaçant que les données"""
+        pyramids = result["pyramids"]
+        
+        self.title_wave1.set_text(f"Forme d'onde - {rec1}")
+        self.title_wave2.set_text(f"Forme d'onde - {rec2}")
+        self.wave1.set_data(pyramids["audio1"])
+        self.wave2.set_data(pyramids["audio2"])
+        autoscale_lines(self.ax_wave1, [self.wave1])
+        autoscale_lines(self.ax_wave2, [self.wave2])
+        
+        self.title_spec1.set_text(f"Spectrogramme - {rec1}")
+        self.title_spec2.set_text(f"Spectrogramme - {rec2}")
+        self.spec1.set_data(result["tiles1"])
+        self.spec2.set_data(result["tiles2"])
+        
+        f0_1 = result["features1"]["f0"]
+        f0_2 = result["features2"]["f0"]
+        self.f0_line1.set_data(np.linspace(0, len(result["audio1"]) / sr, len(f0_1)), f0_1)
+        self.f0_line2.set_data(np.linspace(0, len(result["audio2"]) / sr, len(f0_2)), f0_2)
+        self.f0_line1.set_label(rec1)
+        self.f0_line2.set_label(rec2)
+        self.ax_f0.relim()
+        self.ax_f0.autoscale_view()
+        self._set_legend(self.ax_f0, rec1, rec2)
+        
+        self.env1.set_data(pyramids["amplitude1"])
+        self.env2.set_data(pyramids["amplitude2"])
+        self.env1.line.set_label(rec1)
+        self.env2.line.set_label(rec2)
+        autoscale_lines(self.ax_env, [self.env1, self.env2])
+        self._set_legend(self.ax_env, rec1, rec2)
+        
+        for line in self.lod_lines:
+            line.update()
+        
+        if self.stats_label is not None:
+            self.stats_label.config(text=stats_text)
+    
+    def draw(self):
+        """Redessiner immédiatement (mesures) ; l'interface utilise draw_idle()"""
+        self.canvas.draw()
+    
+    def draw_idle(self):
+        """Demander un redessin au prochain passage de la boucle Tk"""
+        self.canvas.draw_idle()
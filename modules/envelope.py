@@ -0,0 +1,102 @@
+"""Module de calcul de l'enveloppe d'amplitude (transformée de Hilbert par blocs)
+
+`scipy.signal.hilbert` calcule une seule FFT de la longueur exacte du signal :
+coûteuse pour les longueurs peu factorisables et en complex128 sur toute la
+durée. Ici le signal est découpé en blocs de taille fixe, étendus de marges de
+part et d'autre (overlap-save) et traités par des FFT de taille rapide ; seule
+la partie centrale de chaque bloc est conservée. Le noyau de Hilbert décroissant
+en 1/n, des marges de 8192 échantillons suffisent pour retrouver le résultat
+calculé sur le signal entier à ~0,2 % du maximum près (hors bords, où
+`scipy.signal.hilbert` replie circulairement la fin du signal sur le début).
+"""
+
+import numpy as np
+
+def _analytic_magnitude(segment, n_fft):
+    """Module du signal analytique d'un segment, par FFT de taille n_fft"""
+    from scipy import fft
+    spectrum = fft.rfft(segment, n=n_fft)
+    half = np.zeros(n_fft, dtype=spectrum.dtype)
+    half[0] = spectrum[0]
+    if n_fft % 2 == 0:
+        half[1:n_fft // 2] = 2 * spectrum[1:n_fft // 2]
+        half[n_fft // 2] = spectrum[n_fft // 2]
+    else:
+        half[1:(n_fft + 1) // 2] = 2 * spectrum[1:(n_fft + 1) // 2]
+    return np.abs(fft.ifft(half))
+
+def iter_envelope_blocks(audio_data, block_size=65536, margin=8192):
+    """Générer `(début, enveloppe)` bloc par bloc (float32)"""
+    from scipy import fft
+    audio_data = np.asarray(audio_data, dtype=np.float32)
+    n = len(audio_data)
+    n_fft = fft.next_fast_len(block_size + 2 * margin, real=True)
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        left = max(start - margin, 0)
+        right = min(stop + margin, n)
+        magnitude = _analytic_magnitude(audio_data[left:right], n_fft)
+        yield start, magnitude[start - left:stop - left].astype(np.float32)
+
+def envelope_range(read, n, start, stop, block_size=65536, margin=8192):
+    """`hilbert_envelope(x)[start:stop]` d'un signal de longueur `n` lu par `read(a, b)`
+    
+    Seuls les blocs qui recouvrent [start, stop) sont calculés, avec les mêmes
+    blocs et marges que sur le signal entier (traitement en flux).
+    """
+    from scipy import fft
+    if n <= block_size:
+        block_size = max(n, 1)
+        margin = 0
+    n_fft = fft.next_fast_len(block_size + 2 * margin, real=True)
+    envelope = np.empty(stop - start, dtype=np.float32)
+    for block_start in range(start // block_size * block_size, stop, block_size):
+        block_stop = min(block_start + block_size, n)
+        left = max(block_start - margin, 0)
+        right = min(block_stop + margin, n)
+        segment = np.asarray(read(left, right), dtype=np.float32)
+        magnitude = _analytic_magnitude(segment, n_fft)[block_start - left:block_stop - left]
+        a, b = max(start, block_start), min(stop, block_stop)
+        envelope[a - start:b - start] = magnitude[a - block_start:b - block_start]
+    return envelope
+
+def frame_indices(start, length, hop_length):
+    """Indice de trame (centrée, comme librosa) de chaque échantillon d'un bloc"""
+    return (np.arange(start, start + length) + hop_length // 2) // hop_length
+
+def frame_average(envelope, hop_length):
+    """Moyenne d'une enveloppe à pleine résolution sur les trames centrées de librosa"""
+    n_frames = 1 + len(envelope) // hop_length
+    frames = np.minimum(frame_indices(0, len(envelope), hop_length), n_frames - 1)
+    sums = np.bincount(frames, weights=envelope, minlength=n_frames)
+    counts = np.bincount(frames, minlength=n_frames)
+    return (sums / np.maximum(counts, 1)).astype(np.float32)
+
+def hilbert_envelope(audio_data, hop_length=None, block_size=65536, margin=8192):
+    """Enveloppe d'amplitude float32, à pleine résolution ou moyennée par trame
+    
+    Avec `hop_length`, renvoie une valeur par trame d'analyse (1 + n // hop_length
+    valeurs, alignées sur les trames centrées de librosa) sans jamais stocker
+    l'enveloppe à pleine résolution.
+    """
+    n = len(audio_data)
+    # Signal court : un seul bloc, FFT de taille rapide
+    if n <= block_size:
+        block_size = max(n, 1)
+        margin = 0
+    
+    if hop_length is None:
+        envelope = np.empty(n, dtype=np.float32)
+        for start, block in iter_envelope_blocks(audio_data, block_size, margin):
+            envelope[start:start + len(block)] = block
+        return envelope
+    
+    n_frames = 1 + n // hop_length
+    sums = np.zeros(n_frames)
+    counts = np.zeros(n_frames)
+    for start, block in iter_envelope_blocks(audio_data, block_size, margin):
+        frames = np.minimum(frame_indices(start, len(block), hop_length), n_frames - 1)
+        first = frames[0]
+        sums[first:first + frames[-1] - first + 1] += np.bincount(frames - first, weights=block)
+        counts[first:first + frames[-1] - first + 1] += np.bincount(frames - first)
+    return (sums / np.maximum(counts, 1)).astype(np.float32)
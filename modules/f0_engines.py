@@ -0,0 +1,158 @@
+"""Module des méthodes d'estimation de la fréquence fondamentale
+
+Toutes les méthodes partagent la même signature et le même découpage en trames
+que `librosa.pyin` (trames centrées, `frame_length` et `hop_length` identiques),
+ce qui permet de les interchanger et de comparer leurs sorties trame à trame.
+Chaque méthode renvoie `(f0, voiced_flag, voiced_probs)`, avec `f0 = NaN` sur les
+trames non voisées.
+"""
+
+import numpy as np
+
+from modules.instrumentation import span
+
+# Nombre de trames traitées par lot par les méthodes vectorisées
+FRAME_BATCH = 256
+
+def frame_signal(audio_data, frame_length, hop_length):
+    """Découper le signal en trames centrées (vue sans copie)"""
+    audio_data = np.asarray(audio_data, dtype=np.float32)
+    padded = np.pad(audio_data, frame_length // 2, mode="constant")
+    n_frames = 1 + len(audio_data) // hop_length
+    frames = np.lib.stride_tricks.sliding_window_view(padded, frame_length)[::hop_length]
+    return frames[:n_frames]
+
+def _parabolic_offset(left, center, right):
+    """Décalage sub-échantillon du minimum/maximum d'une parabole passant par 3 points"""
+    denom = left - 2 * center + right
+    with np.errstate(divide="ignore", invalid="ignore"):
+        offset = np.where(np.abs(denom) > 1e-12, 0.5 * (left - right) / denom, 0.0)
+    return np.clip(offset, -1.0, 1.0)
+
+def pyin_f0(audio_data, sr, fmin=80, fmax=400, frame_length=2048, hop_length=512):
+    """pYIN (librosa) : précis mais coûteux (décodage HMM)"""
+    import librosa
+    return librosa.pyin(audio_data, fmin=fmin, fmax=fmax, sr=sr,
+                        frame_length=frame_length, hop_length=hop_length)
+
+def yin_f0(audio_data, sr, fmin=80, fmax=400, frame_length=2048, hop_length=512,
+           threshold=0.1, voicing_threshold=0.25):
+    """YIN vectorisé : différence normalisée cumulée (CMNDF) calculée par FFT, par lots de trames"""
+    frames = frame_signal(audio_data, frame_length, hop_length)
+    return yin_frames(frames, sr, fmin=fmin, fmax=fmax, threshold=threshold,
+                      voicing_threshold=voicing_threshold)
+
+def yin_frames(frames, sr, fmin=80, fmax=400, threshold=0.1, voicing_threshold=0.25):
+    """YIN sur des trames déjà découpées, de forme (n_trames, frame_length)"""
+    n_frames, frame_length = frames.shape
+    min_lag = max(1, int(np.floor(sr / fmax)))
+    max_lag = min(int(np.ceil(sr / fmin)), frame_length // 2)
+    win = frame_length - max_lag
+    n_fft = 1 << int(np.ceil(np.log2(frame_length + win)))
+    lags = np.arange(max_lag + 1)
+    
+    f0 = np.full(n_frames, np.nan)
+    voiced_probs = np.zeros(n_frames)
+    voiced_flag = np.zeros(n_frames, dtype=bool)
+    
+    for start in range(0, n_frames, FRAME_BATCH):
+        batch = frames[start:start + FRAME_BATCH].astype(np.float64)
+        
+        # Autocorrélation entre la fenêtre d'analyse et le signal décalé
+        spec = np.fft.rfft(batch, n=n_fft)
+        template = np.fft.rfft(batch[:, :win], n=n_fft)
+        acf = np.fft.irfft(spec * np.conj(template), n=n_fft)[:, :max_lag + 1]
+        
+        # Énergie de la fenêtre décalée de tau, par sommes cumulées
+        cumsum = np.concatenate([np.zeros((batch.shape[0], 1)), np.cumsum(batch**2, axis=1)], axis=1)
+        energy_shifted = cumsum[:, lags + win] - cumsum[:, lags]
+        diff = np.maximum(energy_shifted[:, :1] + energy_shifted - 2 * acf, 0.0)
+        
+        # Normalisation par la moyenne cumulée
+        cmndf = np.ones_like(diff)
+        running = np.cumsum(diff[:, 1:], axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cmndf[:, 1:] = np.where(running > 0, diff[:, 1:] * lags[1:] / running, 1.0)
+        
+        search = cmndf[:, min_lag:max_lag]
+        local_min = np.zeros_like(search, dtype=bool)
+        local_min[:, 1:-1] = (search[:, 1:-1] <= search[:, :-2]) & (search[:, 1:-1] <= search[:, 2:])
+        candidates = local_min & (search < threshold)
+        has_candidate = candidates.any(axis=1)
+        best = np.where(has_candidate, np.argmax(candidates, axis=1), np.argmin(search, axis=1))
+        best = np.clip(best, 1, search.shape[1] - 2)
+        
+        rows = np.arange(search.shape[0])
+        value = search[rows, best]
+        offset = _parabolic_offset(search[rows, best - 1], value, search[rows, best + 1])
+        period = min_lag + best + offset
+        
+        voiced = value < voicing_threshold
+        sl = slice(start, start + batch.shape[0])
+        f0[sl] = np.where(voiced, sr / period, np.nan)
+        voiced_flag[sl] = voiced
+        voiced_probs[sl] = np.clip(1.0 - value, 0.0, 1.0)
+    
+    return f0, voiced_flag, voiced_probs
+
+def autocorr_f0(audio_data, sr, fmin=80, fmax=400, frame_length=2048, hop_length=512,
+                clarity_threshold=0.45):
+    """Autocorrélation par FFT : la plus rapide, moins robuste aux erreurs d'octave"""
+    frames = frame_signal(audio_data, frame_length, hop_length)
+    return autocorr_frames(frames, sr, fmin=fmin, fmax=fmax, clarity_threshold=clarity_threshold)
+
+def autocorr_frames(frames, sr, fmin=80, fmax=400, clarity_threshold=0.45):
+    """Autocorrélation sur des trames déjà découpées, de forme (n_trames, frame_length)"""
+    n_frames, frame_length = frames.shape
+    min_lag = max(1, int(np.floor(sr / fmax)))
+    max_lag = min(int(np.ceil(sr / fmin)), frame_length - 2)
+    n_fft = 1 << int(np.ceil(np.log2(2 * frame_length)))
+    
+    window = np.hanning(frame_length)
+    # Autocorrélation de la fenêtre, pour compenser le biais vers les petits délais
+    window_acf = np.fft.irfft(np.abs(np.fft.rfft(window, n=n_fft))**2, n=n_fft)[:max_lag + 2]
+    window_acf /= window_acf[0]
+    
+    f0 = np.full(n_frames, np.nan)
+    voiced_probs = np.zeros(n_frames)
+    voiced_flag = np.zeros(n_frames, dtype=bool)
+    
+    for start in range(0, n_frames, FRAME_BATCH):
+        batch = frames[start:start + FRAME_BATCH] * window
+        acf = np.fft.irfft(np.abs(np.fft.rfft(batch, n=n_fft))**2, n=n_fft)[:, :max_lag + 2]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            acf = np.where(acf[:, :1] > 1e-10, acf / acf[:, :1], 0.0) / window_acf
+        
+        search = acf[:, min_lag:max_lag + 1]
+        best = np.clip(np.argmax(search, axis=1), 1, search.shape[1] - 2)
+        rows = np.arange(search.shape[0])
+        value = search[rows, best]
+        offset = _parabolic_offset(search[rows, best - 1], value, search[rows, best + 1])
+        period = min_lag + best + offset
+        
+        voiced = value > clarity_threshold
+        sl = slice(start, start + batch.shape[0])
+        f0[sl] = np.where(voiced, sr / period, np.nan)
+        voiced_flag[sl] = voiced
+        voiced_probs[sl] = np.clip(value, 0.0, 1.0)
+    
+    return f0, voiced_flag, voiced_probs
+
+F0_ENGINES = {
+    "pyin": pyin_f0,
+    "yin": yin_f0,
+    "autocorr": autocorr_f0,
+}
+
+# Méthodes utilisables trame par trame (analyse en continu)
+FRAME_ENGINES = {
+    "yin": yin_frames,
+    "autocorr": autocorr_frames,
+}
+
+def estimate_f0(audio_data, sr, engine="pyin", **kwargs):
+    """Estimer la F0 avec la méthode choisie"""
+    if engine not in F0_ENGINES:
+        raise ValueError(f"Méthode F0 inconnue: {engine} (disponibles: {', '.join(F0_ENGINES)})")
+    with span(f"f0.{engine}"):
+        return F0_ENGINES[engine](audio_data, sr, **kwargs)
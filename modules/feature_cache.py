@@ -0,0 +1,242 @@
+"""Module de cache des caractéristiques audio"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+def hash_file(path, chunk_size=1 << 20):
+    """Calculer l'empreinte SHA-1 du contenu d'un fichier"""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def features_nbytes(value):
+    """Estimer la taille mémoire d'un tableau ou d'un dictionnaire de tableaux"""
+    if isinstance(value, dict):
+        return sum(features_nbytes(v) for v in value.values())
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    return 64
+
+class LRUCache:
+    """Cache LRU en mémoire, borné par une taille totale en octets"""
+    
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        """Récupérer une entrée et la marquer comme récemment utilisée"""
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+    
+    def put(self, key, value, nbytes=None):
+        """Ajouter une entrée puis évincer les plus anciennes si nécessaire"""
+        if nbytes is None:
+            nbytes = features_nbytes(value)
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, nbytes)
+            self.current_bytes += nbytes
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted
+    
+    def pop(self, key):
+        """Retirer une entrée"""
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+    
+    def keys(self):
+        """Lister les clés, de la plus ancienne à la plus récente"""
+        with self._lock:
+            return list(self._entries.keys())
+    
+    def clear(self):
+        """Vider le cache"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+    
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+    
+    def __len__(self):
+        return len(self._entries)
+
+class AudioCache:
+    """Cache LRU en mémoire des signaux décodés (mono, float32)
+    
+    La clé combine le chemin, la date et la taille du fichier et la fréquence
+    demandée : un fichier réécrit n'est jamais relu depuis une ancienne entrée.
+    """
+    
+    def __init__(self, max_bytes=256 * 1024**2):
+        self.memory = LRUCache(max_bytes)
+        self.hits = 0
+        self.misses = 0
+    
+    def make_key(self, path, sr):
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        return (path, st.st_mtime_ns, st.st_size, sr)
+    
+    def get_or_decode(self, path, sr, decode):
+        """Signal `(audio_data, sr)` du cache, ou décodé avec `decode()` puis gardé"""
+        key = self.make_key(path, sr)
+        entry = self.memory.get(key)
+        if entry is not None:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        audio_data, rate = decode()
+        audio_data = np.asarray(audio_data, dtype=np.float32)
+        # Les appelants partagent le tableau : il ne doit pas être modifié sur place
+        audio_data.setflags(write=False)
+        entry = (audio_data, rate)
+        self.memory.put(key, entry, nbytes=audio_data.nbytes)
+        return entry
+    
+    def clear(self):
+        self.memory.clear()
+
+class FeatureCache:
+    """Cache à deux niveaux (mémoire LRU + disque) des caractéristiques par enregistrement
+    
+    La clé combine l'empreinte du contenu WAV et les paramètres d'extraction :
+    modifier le fichier ou les paramètres produit une nouvelle clé, les anciennes
+    entrées finissant évincées par la politique de taille.
+    """
+    
+    VERSION = 1
+    
+    def __init__(self, cache_dir, max_memory_bytes=256 * 1024**2, max_disk_bytes=2 * 1024**3):
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.memory = LRUCache(max_memory_bytes)
+        self._hashes = {}
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+    
+    def content_hash(self, path):
+        """Empreinte du fichier, recalculée seulement si sa taille ou sa date changent"""
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        stamp = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            cached = self._hashes.get(path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        digest = hash_file(path)
+        with self._lock:
+            self._hashes[path] = (stamp, digest)
+        return digest
+    
+    def make_key(self, content_hash, params):
+        """Construire la clé d'une entrée à partir du contenu et des paramètres"""
+        encoded = json.dumps(dict(params, version=self.VERSION), sort_keys=True)
+        params_hash = hashlib.sha1(encoded.encode("utf-8")).hexdigest()[:16]
+        return f"{content_hash}_{params_hash}"
+    
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.npz")
+    
+    def get(self, path, params, memory=True):
+        """Relire les caractéristiques d'un enregistrement, ou None si absentes
+        
+        Avec `memory=False`, seul le disque est utilisé (données gardées en
+        mémoire ailleurs, par exemple dans un AudioCache).
+        """
+        key = self.make_key(self.content_hash(path), params)
+        features = self.memory.get(key) if memory else None
+        if features is not None:
+            return features
+        
+        disk_path = self._disk_path(key)
+        try:
+            with np.load(disk_path) as data:
+                features = {name: data[name] for name in data.files}
+        except (OSError, ValueError):
+            return None
+        
+        # Rafraîchir la date pour que l'éviction sur disque suive l'ordre LRU
+        try:
+            os.utime(disk_path)
+        except OSError:
+            pass
+        if memory:
+            self.memory.put(key, features)
+        return features
+    
+    def put(self, path, params, features, memory=True):
+        """Enregistrer les caractéristiques en mémoire et sur disque"""
+        key = self.make_key(self.content_hash(path), params)
+        if memory:
+            self.memory.put(key, features)
+        
+        disk_path = self._disk_path(key)
+        tmp_path = f"{disk_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **features)
+        os.replace(tmp_path, disk_path)
+        self.evict()
+    
+    def get_or_compute(self, path, params, compute, memory=True):
+        """Relire les caractéristiques du cache ou les calculer avec `compute()`"""
+        features = self.get(path, params, memory)
+        if features is None:
+            features = compute()
+            self.put(path, params, features, memory)
+        return features
+    
+    def invalidate(self, path):
+        """Supprimer toutes les entrées associées au contenu actuel d'un fichier"""
+        content_hash = self.content_hash(path)
+        for key in self.memory.keys():
+            if key.startswith(content_hash):
+                self.memory.pop(key)
+        for name in os.listdir(self.cache_dir):
+            if name.startswith(content_hash) and name.endswith(".npz"):
+                os.remove(os.path.join(self.cache_dir, name))
+        with self._lock:
+            self._hashes.pop(os.path.abspath(path), None)
+    
+    def evict(self):
+        """Supprimer les entrées disque les moins récentes au-delà de la taille maximale"""
+        entries = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".npz"):
+                continue
+            try:
+                st = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, name))
+            total += st.st_size
+        
+        entries.sort()
+        for _, size, name in entries:
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            total -= size
@@ -0,0 +1,124 @@
+"""Module du format de fichier des caractéristiques (.feat, lu par np.memmap)
+
+Un fichier `.feat` accompagne un enregistrement (`nom.wav` -> `nom.feat`) et
+contient ses pistes de caractéristiques par trame. Disposition :
+
+    octets 0-7    signature b"PHONFEAT"
+    octets 8-11   version du format (uint32, petit-boutiste)
+    octets 12-15  longueur N de l'en-tête JSON (uint32)
+    16 .. 16+N    en-tête JSON : paramètres d'extraction, empreinte du WAV,
+                  fréquence, pas, et pour chaque piste type, forme et position
+    puis          données brutes des pistes, alignées sur 64 octets
+
+Les pistes sont rangées trame par trame (axe du temps en premier) : une plage
+de temps est un bloc contigu du fichier, lu sans copie à travers la projection
+mémoire. Elles sont rendues dans la disposition de librosa (trames en dernier).
+"""
+
+import json
+import os
+import struct
+
+import numpy as np
+
+MAGIC = b"PHONFEAT"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+_PREFIX = struct.Struct("<8sII")
+
+def _align(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+def write_feature_file(path, tracks, header):
+    """Écrire des pistes (`nom -> tableau`, trames en dernier) et un en-tête JSON
+    
+    Le type de chaque tableau est conservé (float32 ou float16 en pratique).
+    L'écriture passe par un fichier temporaire : un lecteur ne voit jamais de
+    fichier partiel.
+    """
+    layout = {}
+    arrays = []
+    offset = 0
+    for name, array in tracks.items():
+        # Trames en premier sur disque : une plage de temps est contiguë
+        stored = np.ascontiguousarray(np.moveaxis(np.asarray(array), -1, 0))
+        layout[name] = {"dtype": stored.dtype.str, "shape": list(stored.shape), "offset": offset}
+        arrays.append(stored)
+        offset = _align(offset + stored.nbytes)
+    
+    encoded = json.dumps(dict(header, tracks=layout), sort_keys=True).encode("utf-8")
+    data_start = _align(_PREFIX.size + len(encoded))
+    
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, len(encoded)))
+        f.write(encoded)
+        for (name, info), stored in zip(layout.items(), arrays):
+            f.seek(data_start + info["offset"])
+            f.write(stored.tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp_path, path)
+
+class FeatureFile:
+    """Fichier .feat ouvert en projection mémoire (lecture seule)
+    
+    `ff["f0"]` renvoie une piste entière, `ff.slice("mel", 1.0, 2.5)` la
+    plage de trames couvrant [1,0 s ; 2,5 s] ; dans les deux cas une vue sur le
+    fichier, sans copie.
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            prefix = f.read(_PREFIX.size)
+            if len(prefix) < _PREFIX.size:
+                raise ValueError(f"Fichier de caractéristiques tronqué: {path}")
+            magic, version, header_length = _PREFIX.unpack(prefix)
+            if magic != MAGIC:
+                raise ValueError(f"Pas un fichier de caractéristiques: {path}")
+            if version != FORMAT_VERSION:
+                raise ValueError(f"Version de format non prise en charge: {version}")
+            self.header = json.loads(f.read(header_length).decode("utf-8"))
+        
+        data_start = _align(_PREFIX.size + header_length)
+        raw = np.memmap(path, dtype=np.uint8, mode="r")
+        self._tracks = {}
+        for name, info in self.header["tracks"].items():
+            self._tracks[name] = np.ndarray(tuple(info["shape"]), dtype=np.dtype(info["dtype"]),
+                                            buffer=raw, offset=data_start + info["offset"])
+        self.sr = self.header["sr"]
+        self.hop_length = self.header["hop_length"]
+    
+    @property
+    def params(self):
+        """Paramètres d'extraction enregistrés dans l'en-tête"""
+        return self.header["params"]
+    
+    def names(self):
+        return list(self._tracks)
+    
+    def __contains__(self, name):
+        return name in self._tracks
+    
+    def __getitem__(self, name):
+        return np.moveaxis(self._tracks[name], 0, -1)
+    
+    def n_frames(self, name="f0"):
+        return self._tracks[name].shape[0]
+    
+    def frame_range(self, start, end, name="f0"):
+        """Indices de trames [i0, i1) couvrant l'intervalle [start, end] en secondes"""
+        n = self.n_frames(name)
+        i0 = int(np.clip(np.floor(start * self.sr / self.hop_length), 0, n))
+        i1 = int(np.clip(np.ceil(end * self.sr / self.hop_length) + 1, i0, n))
+        return i0, i1
+    
+    def slice(self, name, start, end):
+        """Vue sur une plage de temps d'une piste (trames en dernier, sans copie)"""
+        i0, i1 = self.frame_range(start, end, name)
+        return np.moveaxis(self._tracks[name][i0:i1], 0, -1)
+    
+    def times(self, name="f0"):
+        """Temps (s) de chaque trame d'une piste"""
+        return np.arange(self.n_frames(name)) * self.hop_length / self.sr
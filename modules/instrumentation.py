@@ -0,0 +1,162 @@
+"""Module d'instrumentation : durée et mémoire de chaque étape d'analyse
+
+Les étapes sont délimitées par `span("nom")` (gestionnaire de contexte) ou par
+le décorateur `@traced()`. Tant que l'instrumentation est désactivée (par
+défaut), un span se réduit à un test de booléen et à un objet vide partagé.
+
+Une fois activée, chaque span enregistre son début, sa durée, son thread et la
+variation de la mémoire résidente. Les spans sans parent forment des
+« opérations » (une comparaison, un enregistrement…) dont les dernières sont
+gardées pour l'onglet Performance ; tous les spans récents peuvent être
+exportés au format Chrome trace-event (chrome://tracing, Perfetto).
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+_enabled = False
+_lock = threading.Lock()
+_local = threading.local()
+_spans = deque(maxlen=20000)
+_operations = deque(maxlen=50)
+
+def enable():
+    """Activer l'enregistrement des spans"""
+    global _enabled
+    _enabled = True
+
+def disable():
+    """Désactiver l'enregistrement (les spans en cours se terminent normalement)"""
+    global _enabled
+    _enabled = False
+
+def is_enabled():
+    return _enabled
+
+def clear():
+    """Oublier les spans et opérations enregistrés"""
+    with _lock:
+        _spans.clear()
+        _operations.clear()
+
+def _rss_bytes():
+    """Mémoire résidente du processus (octets), ou None si indisponible"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+class _NullSpan:
+    """Span inactif : ne fait rien"""
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class Span:
+    """Étape mesurée ; `children` contient les spans imbriqués terminés"""
+    
+    def __init__(self, name, category, args):
+        self.name = name
+        self.category = category
+        self.args = args
+        self.children = []
+        self.start_ns = 0
+        self.duration_ns = 0
+        self.memory_delta = None
+        self.thread_id = threading.get_ident()
+    
+    @property
+    def duration_ms(self):
+        return self.duration_ns / 1e6
+    
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        self._parent = stack[-1] if stack else None
+        stack.append(self)
+        self._rss_start = _rss_bytes()
+        self.start_ns = time.perf_counter_ns()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.duration_ns = time.perf_counter_ns() - self.start_ns
+        rss_end = _rss_bytes()
+        if rss_end is not None and self._rss_start is not None:
+            self.memory_delta = rss_end - self._rss_start
+        if exc_type is not None:
+            self.args = dict(self.args, error=exc_type.__name__)
+        _local.stack.pop()
+        
+        with _lock:
+            _spans.append(self)
+            if self._parent is not None:
+                self._parent.children.append(self)
+            else:
+                _operations.append(self)
+        return False
+
+def span(name, category="analyse", **args):
+    """Délimiter une étape : `with span("stft"):`"""
+    if not _enabled:
+        return _NULL_SPAN
+    return Span(name, category, args)
+
+def traced(name=None, category="analyse"):
+    """Décorateur : mesurer chaque appel de la fonction (nom qualifié par défaut)"""
+    def decorate(fn):
+        span_name = name or fn.__qualname__
+        
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with Span(span_name, category, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def recent_operations():
+    """Dernières opérations terminées, de la plus récente à la plus ancienne"""
+    with _lock:
+        return list(reversed(_operations))
+
+def chrome_trace():
+    """Spans enregistrés au format Chrome trace-event (dictionnaire JSON)"""
+    with _lock:
+        spans = list(_spans)
+    pid = os.getpid()
+    events = []
+    for s in spans:
+        args = dict(s.args)
+        if s.memory_delta is not None:
+            args["memory_delta_mb"] = round(s.memory_delta / 1024**2, 3)
+        events.append({
+            "name": s.name,
+            "cat": s.category,
+            "ph": "X",
+            "ts": s.start_ns / 1000,
+            "dur": s.duration_ns / 1000,
+            "pid": pid,
+            "tid": s.thread_id,
+            "args": args,
+        })
+    events.sort(key=lambda event: event["ts"])
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+def export_chrome_trace(path):
+    """Écrire la trace au format Chrome trace-event ; renvoie le nombre de spans"""
+    trace = chrome_trace()
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(trace, f)
+    return len(trace["traceEvents"])
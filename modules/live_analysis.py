@@ -0,0 +1,156 @@
+"""Module d'analyse en direct pendant l'enregistrement"""
+
+import threading
+import time
+
+import numpy as np
+
+from modules.f0_engines import FRAME_ENGINES
+
+class RingBuffer:
+    """Tampon circulaire préalloué, un seul producteur et un seul consommateur
+    
+    Le producteur (callback audio) ne modifie que `_written` et le consommateur
+    (thread d'analyse) que `_read` ; chaque compteur n'est publié qu'après la
+    copie des données, ce qui évite tout verrou dans le callback.
+    """
+    
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=np.float32)
+        self._written = 0
+        self._read = 0
+    
+    def available(self):
+        """Nombre d'échantillons prêts à être lus"""
+        return self._written - self._read
+    
+    def write(self, block):
+        """Écrire un bloc ; renvoie False (bloc ignoré) si la place manque"""
+        n = len(block)
+        if n > self.capacity - (self._written - self._read):
+            return False
+        start = self._written % self.capacity
+        first = min(n, self.capacity - start)
+        self._data[start:start + first] = block[:first]
+        self._data[:n - first] = block[first:]
+        self._written += n
+        return True
+    
+    def read(self, n):
+        """Lire `n` échantillons (copie), ou None s'ils ne sont pas encore disponibles"""
+        if self._written - self._read < n:
+            return None
+        start = self._read % self.capacity
+        first = min(n, self.capacity - start)
+        out = np.concatenate([self._data[start:start + first], self._data[:n - first]])
+        self._read += n
+        return out
+    
+    def skip(self, n):
+        """Abandonner `n` échantillons sans les lire"""
+        self._read += min(n, self._written - self._read)
+
+class LiveAnalyzer:
+    """Calcul incrémental de la F0 et du RMS par trame, sur un thread dédié
+    
+    `push()` est appelé depuis le callback audio et se limite à une copie dans le
+    tampon circulaire. Le thread d'analyse traite au plus `max_hops_per_step`
+    trames à la fois ; s'il prend plus de `max_backlog` secondes de retard, il
+    saute les données en attente pour rester en temps réel.
+    """
+    
+    def __init__(self, sr, frame_length=2048, hop_length=512, engine="autocorr",
+                 fmin=80, fmax=400, buffer_seconds=4.0, history_seconds=10.0,
+                 max_hops_per_step=16, max_backlog=1.0):
+        self.sr = sr
+        self.frame_length = frame_length
+        self.hop_length = hop_length
+        self.engine = FRAME_ENGINES[engine]
+        self.fmin = fmin
+        self.fmax = fmax
+        self.max_hops_per_step = max_hops_per_step
+        self.max_backlog = int(max_backlog * sr)
+        
+        self.ring = RingBuffer(int(buffer_seconds * sr))
+        self._frame = np.zeros(frame_length, dtype=np.float32)
+        
+        # Historique circulaire des dernières trames analysées
+        self.history_size = int(history_seconds * sr / hop_length)
+        self._times = np.full(self.history_size, np.nan)
+        self._f0 = np.full(self.history_size, np.nan)
+        self._rms = np.full(self.history_size, np.nan)
+        self._n_frames = 0
+        self._lock = threading.Lock()
+        
+        self.dropped_blocks = 0
+        self.late_blocks = 0
+        self.skipped_samples = 0
+        
+        self._running = threading.Event()
+        self._thread = None
+    
+    def push(self, block):
+        """Recevoir un bloc du callback audio (travail borné, sans allocation)"""
+        if not self.ring.write(block):
+            self.dropped_blocks += 1
+    
+    def mark_late(self):
+        """Signaler un bloc arrivé en retard (débordement du flux d'entrée)"""
+        self.late_blocks += 1
+    
+    def start(self):
+        """Démarrer le thread d'analyse"""
+        self._running.set()
+        self._thread = threading.Thread(target=self._run, name="analyse-directe", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Arrêter le thread d'analyse"""
+        self._running.clear()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+    
+    def _run(self):
+        hop = self.hop_length
+        while self._running.is_set():
+            backlog = self.ring.available()
+            if backlog > self.max_backlog:
+                excess = (backlog - self.max_backlog) // hop * hop
+                self.ring.skip(excess)
+                self.skipped_samples += excess
+            
+            n_hops = min(self.ring.available() // hop, self.max_hops_per_step)
+            if n_hops == 0:
+                time.sleep(hop / self.sr / 2)
+                continue
+            self._analyze(self.ring.read(n_hops * hop), n_hops)
+    
+    def _analyze(self, samples, n_hops):
+        """Analyser `n_hops` nouvelles trames à partir des échantillons reçus"""
+        hop = self.hop_length
+        signal = np.concatenate([self._frame[hop:], samples])
+        frames = np.lib.stride_tricks.sliding_window_view(signal, self.frame_length)[::hop][:n_hops]
+        self._frame = signal[-self.frame_length:].copy()
+        
+        f0, _, _ = self.engine(frames, self.sr, fmin=self.fmin, fmax=self.fmax)
+        rms = np.sqrt(np.mean(frames.astype(np.float64)**2, axis=1))
+        
+        # Temps du centre de chaque trame, depuis le début de l'enregistrement
+        first = self._n_frames + self.skipped_samples // hop
+        times = (first + np.arange(n_hops)) * hop / self.sr - self.frame_length / (2 * self.sr) + hop / self.sr
+        
+        with self._lock:
+            idx = (self._n_frames + np.arange(n_hops)) % self.history_size
+            self._times[idx] = times
+            self._f0[idx] = f0
+            self._rms[idx] = rms
+            self._n_frames += n_hops
+    
+    def snapshot(self):
+        """Copie ordonnée de l'historique : (temps, f0, rms)"""
+        with self._lock:
+            n = min(self._n_frames, self.history_size)
+            order = (self._n_frames - n + np.arange(n)) % self.history_size
+            return self._times[order], self._f0[order], self._rms[order]
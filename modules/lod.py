@@ -0,0 +1,137 @@
+"""Module de tracé à niveau de détail (LOD) pour les longues courbes
+
+Au lieu de passer chaque échantillon à matplotlib, chaque courbe est réduite à
+une enveloppe (min, max) par pixel de l'axe. Les enveloppes sont lues dans une
+pyramide précalculée (blocs de 2^k échantillons) : le coût d'un redessin dépend
+de la largeur de l'axe, pas de la durée de l'enregistrement.
+"""
+
+import numpy as np
+
+class MinMaxPyramid:
+    """Pyramide multi-résolution des minima et maxima d'un signal"""
+    
+    def __init__(self, y, x0=0.0, dx=1.0, min_block=8):
+        self.y = np.asarray(y)
+        self.x0 = x0
+        self.dx = dx
+        self.levels = []
+        
+        # Niveau k : blocs de min_block * 2^k échantillons
+        block = min_block
+        n_blocks = len(self.y) // block
+        if n_blocks == 0:
+            return
+        shaped = self.y[:n_blocks * block].reshape(n_blocks, block)
+        mins = shaped.min(axis=1)
+        maxs = shaped.max(axis=1)
+        while True:
+            self.levels.append((block, mins, maxs))
+            if len(mins) < 4:
+                break
+            half = len(mins) // 2
+            mins = np.minimum(mins[:2 * half:2], mins[1:2 * half:2])
+            maxs = np.maximum(maxs[:2 * half:2], maxs[1:2 * half:2])
+            block *= 2
+    
+    def __len__(self):
+        return len(self.y)
+    
+    def x_range(self):
+        """Étendue de l'axe x couverte par le signal"""
+        return self.x0, self.x0 + max(len(self.y) - 1, 0) * self.dx
+    
+    def y_range(self):
+        """Minimum et maximum globaux (pour fixer les limites de l'axe y)"""
+        if len(self.y) == 0:
+            return 0.0, 1.0
+        if self.levels:
+            _, mins, maxs = self.levels[-1]
+            tail = self.y[len(mins) * self.levels[-1][0]:]
+            low = min(mins.min(), tail.min()) if len(tail) else mins.min()
+            high = max(maxs.max(), tail.max()) if len(tail) else maxs.max()
+            return float(low), float(high)
+        return float(self.y.min()), float(self.y.max())
+    
+    def query(self, x_start, x_end, n_pixels):
+        """Points à tracer pour la fenêtre [x_start, x_end] sur `n_pixels` de large"""
+        n = len(self.y)
+        i0 = int(np.clip(np.floor((x_start - self.x0) / self.dx), 0, n))
+        i1 = int(np.clip(np.ceil((x_end - self.x0) / self.dx) + 1, i0, n))
+        n_pixels = max(int(n_pixels), 1)
+        
+        # Peu d'échantillons visibles : tracé direct
+        if i1 - i0 <= 2 * n_pixels or not self.levels:
+            xs = self.x0 + np.arange(i0, i1) * self.dx
+            return xs, self.y[i0:i1]
+        
+        # Plus grand bloc qui garde au moins un bloc par pixel
+        samples_per_pixel = (i1 - i0) / n_pixels
+        block, mins, maxs = self.levels[0]
+        for level in self.levels:
+            if level[0] > samples_per_pixel:
+                break
+            block, mins, maxs = level
+        
+        b0 = min(i0 // block, len(mins))
+        b1 = min(-(-i1 // block), len(mins))
+        centers = self.x0 + (np.arange(b0, b1) * block + (block - 1) / 2) * self.dx
+        bin_mins = mins[b0:b1]
+        bin_maxs = maxs[b0:b1]
+        
+        # Fin du signal non couverte par un bloc complet de ce niveau
+        tail_start = max(b1 * block, i0)
+        if tail_start < i1:
+            tail = self.y[tail_start:i1]
+            centers = np.append(centers, self.x0 + (tail_start + i1 - 1) / 2 * self.dx)
+            bin_mins = np.append(bin_mins, tail.min())
+            bin_maxs = np.append(bin_maxs, tail.max())
+        
+        xs = np.repeat(centers, 2)
+        ys = np.empty(2 * len(centers), dtype=self.y.dtype)
+        ys[0::2] = bin_mins
+        ys[1::2] = bin_maxs
+        return xs, ys
+
+class LODLine:
+    """Courbe matplotlib redécimée à chaque zoom ou redimensionnement de l'axe
+    
+    `pyramid` est une MinMaxPyramid, qui peut être construite hors du thread Tk.
+    """
+    
+    def __init__(self, ax, pyramid, **plot_kwargs):
+        self.ax = ax
+        self.pyramid = pyramid
+        self.line, = ax.plot([], [], **plot_kwargs)
+        self._resize_cid = None
+        ax.callbacks.connect("xlim_changed", lambda ax: self.update())
+    
+    def set_data(self, pyramid):
+        """Remplacer le signal tracé"""
+        self.pyramid = pyramid
+        self.update()
+    
+    def update(self):
+        """Recalculer la décimation pour la zone visible et la largeur courante"""
+        x_start, x_end = self.ax.get_xlim()
+        width = max(self.ax.bbox.width, 1)
+        xs, ys = self.pyramid.query(x_start, x_end, width)
+        self.line.set_data(xs, ys)
+    
+    def connect_resize(self, canvas):
+        """Redécimer quand le canevas change de taille"""
+        if self._resize_cid is not None:
+            return
+        self._resize_cid = canvas.mpl_connect("resize_event", lambda event: self.update())
+
+def autoscale_lines(ax, lines, margin=0.05):
+    """Ajuster les limites de l'axe à l'ensemble des signaux des courbes LOD"""
+    x_ranges = [line.pyramid.x_range() for line in lines]
+    y_ranges = [line.pyramid.y_range() for line in lines]
+    x_start = min(r[0] for r in x_ranges)
+    x_end = max(r[1] for r in x_ranges)
+    low = min(r[0] for r in y_ranges)
+    high = max(r[1] for r in y_ranges)
+    pad = (high - low) * margin or 1.0
+    ax.set_ylim(low - pad, high + pad)
+    ax.set_xlim(x_start, x_end if x_end > x_start else x_start + 1)
@@ -0,0 +1,132 @@
+"""Module d'estimation de la F0 en parallèle sur plusieurs cœurs (longs enregistrements)
+
+Le signal est découpé en morceaux indépendants : les segments de parole (voir
+AudioProcessor.detect_speech), et les segments trop longs en fenêtres fixes qui
+se chevauchent. Chaque morceau est analysé par un processus du pool ; le signal
+est placé une seule fois en mémoire partagée et les processus n'en lisent que
+leur tranche (seules les pistes de F0, petites, sont renvoyées par pickle).
+
+Recollage : chaque fenêtre est calculée avec une marge de chaque côté, puis
+seules ses trames centrales sont gardées. Les trames gardées voient exactement
+les mêmes échantillons que dans un calcul d'un seul tenant ; seul le décodage
+HMM de pYIN, qui dépend du contexte, peut différer près des raccords.
+"""
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from modules.f0_engines import estimate_f0
+from modules.instrumentation import span
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+def plan_chunks(spans, hop_length, chunk_length, overlap):
+    """Morceaux à analyser `[(début, fin, première_trame, fin_trames), ...]`
+    
+    `début`/`fin` délimitent les échantillons analysés (marges comprises) ;
+    les trames globales gardées vont de `première_trame` à `fin_trames`
+    (exclue, None jusqu'à la fin du morceau). Les segments plus courts que
+    `chunk_length` échantillons sont gardés entiers ; les autres sont coupés en
+    fenêtres alignées sur le pas, élargies de `overlap` échantillons.
+    """
+    chunk_length = max(hop_length, chunk_length // hop_length * hop_length)
+    overlap = -(-overlap // hop_length) * hop_length
+    chunks = []
+    for start, end in spans:
+        start, end = int(start), int(end)
+        if end - start <= chunk_length:
+            chunks.append((start, end, start // hop_length, None))
+            continue
+        for core in range(start, end, chunk_length):
+            core_end = core + chunk_length
+            last = core_end >= end
+            chunks.append((max(start, core - overlap), end if last else min(end, core_end + overlap),
+                           core // hop_length, None if last else core_end // hop_length))
+    return chunks
+
+def stitch(chunks, results, n_frames):
+    """Replacer les pistes `(f0, voisement, probabilité)` des morceaux sur la ligne de temps complète"""
+    tracks = (np.full(n_frames, np.nan), np.zeros(n_frames, dtype=bool), np.zeros(n_frames))
+    for (_, _, first, stop), (local_first, local) in zip(chunks, results):
+        stop = n_frames if stop is None else min(stop, n_frames)
+        skip = first - local_first
+        count = min(len(local[0]) - skip, stop - first)
+        for full, part in zip(tracks, local):
+            full[first:first + count] = part[skip:skip + count]
+    return tracks
+
+def chunk_tracks(audio_data, sr, chunks, **kwargs):
+    """Analyser les morceaux un par un ; renvoie `[(première_trame_locale, pistes), ...]`
+    
+    `kwargs` est passé à estimate_f0() et doit contenir `hop_length`.
+    """
+    return [(start // kwargs["hop_length"], estimate_f0(audio_data[start:end], sr, **kwargs))
+            for start, end, _, _ in chunks]
+
+def _chunk_worker(name, n_samples, start, end, sr, kwargs):
+    """Exécuté dans un processus du pool : F0 d'une tranche du signal en mémoire partagée"""
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        audio_data = np.ndarray((n_samples,), dtype=np.float32, buffer=shm.buf)
+        segment = audio_data[start:end].copy()
+        del audio_data
+    finally:
+        shm.close()
+    return estimate_f0(segment, sr, **kwargs)
+
+def get_pool(workers):
+    """Pool de processus partagé, recréé si le nombre de processus change"""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False, cancel_futures=True)
+            # spawn : pas de fork d'un processus qui a des threads (Tk, analyses)
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _pool_workers = workers
+        return _pool
+
+def _prewarm_worker(sr, kwargs):
+    """Exécuté dans un processus du pool : imports et compilation JIT sur un signal court"""
+    estimate_f0(np.zeros(sr // 2, dtype=np.float32), sr, **kwargs)
+    return True
+
+def prewarm(workers, sr, **kwargs):
+    """Démarrer les `workers` processus et y préparer la méthode F0 (imports, JIT)"""
+    pool = get_pool(workers)
+    for future in [pool.submit(_prewarm_worker, sr, kwargs) for _ in range(workers)]:
+        future.result()
+
+def shutdown():
+    """Arrêter le pool de processus (il sera recréé au prochain appel)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+
+def parallel_tracks(audio_data, sr, chunks, workers, **kwargs):
+    """Comme chunk_tracks(), les morceaux étant répartis sur `workers` processus
+    
+    Les plus longs morceaux sont soumis en premier (meilleur équilibrage).
+    """
+    audio_data = np.ascontiguousarray(audio_data, dtype=np.float32)
+    pool = get_pool(workers)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, audio_data.nbytes))
+    try:
+        with span("shared_memory"):
+            np.ndarray(audio_data.shape, dtype=np.float32, buffer=shm.buf)[:] = audio_data
+        order = sorted(range(len(chunks)), key=lambda k: chunks[k][0] - chunks[k][1])
+        futures = {k: pool.submit(_chunk_worker, shm.name, len(audio_data), chunks[k][0], chunks[k][1],
+                                  sr, kwargs)
+                   for k in order}
+        return [(chunks[k][0] // kwargs["hop_length"], futures[k].result()) for k in range(len(chunks))]
+    finally:
+        shm.close()
+        shm.unlink()
@@ -1,7 +1,156 @@
-"""Module d'analyse phonématique"""
+"""Module d'analyse phonématique
+
+La reconnaissance des paires minimales compare un mot prononcé à une banque de
+gabarits MFCC construite à partir d'enregistrements de référence de chaque mot
+(`TemplateBank`). La recherche combine la borne inférieure LB_Keogh, qui écarte
+les gabarits trop éloignés sans les aligner, et une DTW par lots à abandon
+précoce (voir modules.alignment).
+"""
+
+import glob
+import os
+import threading
+
+import numpy as np
+
+from modules.alignment import (dtw_matrix, dtw_templates, keogh_envelope, lb_keogh,
+                               warping_path)
+from modules.instrumentation import span, traced
+
+DISTANCE_EPS = 1e-9
+
+class TemplateBank:
+    """Banque de gabarits MFCC de mots isolés, ramenés à `length` trames
+    
+    Les gabarits, leurs mots et leurs enveloppes de Keogh sont rangés dans des
+    tableaux (T, L, d) pour que la borne inférieure soit calculée d'un coup sur
+    toute la banque. Un gabarit peut être ajouté pendant une recherche : celle-ci
+    travaille sur l'état de la banque à son début.
+    """
+    
+    def __init__(self, length=40, band=0.1):
+        self.length = length
+        self.band = band
+        self.words = []
+        self.sources = []
+        self.templates = None
+        self.upper = None
+        self.lower = None
+        self._lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self.words)
+    
+    def entries(self):
+        """Gabarits de la banque `[(mot, trames, source), ...]`"""
+        with self._lock:
+            words, templates, sources = self.words, self.templates, self.sources
+        return [(word, templates[i], source) for i, (word, source) in enumerate(zip(words, sources))]
+    
+    def counts(self):
+        """Nombre de gabarits par mot"""
+        counts = {}
+        for word in self.words:
+            counts[word] = counts.get(word, 0) + 1
+        return counts
+    
+    def add(self, word, features, source=None):
+        """Ajouter un gabarit (trames (L, d), voir PhonemeAnalyzer.token_features)"""
+        features = np.asarray(features, dtype=np.float64)[None]
+        upper, lower = keogh_envelope(features, self.band)
+        with self._lock:
+            if self.templates is None:
+                self.templates, self.upper, self.lower = features, upper, lower
+            else:
+                self.templates = np.concatenate([self.templates, features])
+                self.upper = np.concatenate([self.upper, upper])
+                self.lower = np.concatenate([self.lower, lower])
+            self.words = self.words + [word]
+            self.sources = self.sources + [source]
+    
+    @staticmethod
+    def _cutoff(best, cutoff_ratio):
+        """Seuil global ; marge absolue pour qu'une correspondance exacte (distance 0) garde son mot"""
+        return min(best.values()) * (1 + cutoff_ratio) + DISTANCE_EPS
+    
+    @traced()
+    def search(self, query, candidates=None, cutoff_ratio=None, batch_size=256):
+        """Distance DTW du meilleur gabarit de chaque mot
+        
+        Le gabarit de plus petite borne inférieure de chaque mot est aligné en
+        premier, puis les autres par ordre de borne croissante, par lots. Un
+        gabarit n'est pas aligné si sa borne dépasse déjà le meilleur score de
+        son mot, et son alignement est abandonné dès que le coût partiel le
+        dépasse. Avec `cutoff_ratio`, un mot plus éloigné que (1 + cutoff_ratio)
+        fois le meilleur score global est écarté sans distance exacte.
+        Renvoie `(distances, meilleurs, statistiques)` : distance et indice du
+        meilleur gabarit par mot retenu.
+        """
+        with self._lock:
+            words, templates, upper, lower = self.words, self.templates, self.upper, self.lower
+        selected = np.arange(len(words))
+        with span("lb_keogh", templates=len(selected)):
+            if candidates is not None:
+                selected = np.array([i for i in selected if words[i] in candidates], dtype=int)
+                upper, lower = upper[selected], lower[selected]
+            bounds = lb_keogh(query, upper, lower)
+        order = np.argsort(bounds)
+        selected, bounds = selected[order], bounds[order]
+        
+        # Premier lot : le gabarit le plus prometteur de chaque mot, pour fixer les seuils
+        seen = set()
+        first = []
+        for position, index in enumerate(selected):
+            if words[index] not in seen:
+                seen.add(words[index])
+                first.append(position)
+        rest = np.setdiff1d(np.arange(len(selected)), first)
+        batches = [np.array(first, dtype=int)]
+        batches += [rest[start:start + batch_size] for start in range(0, len(rest), batch_size)]
+        
+        best = {}
+        best_index = {}
+        stats = {"templates": len(selected), "pruned": 0, "aligned": 0, "abandoned": 0}
+        for positions in batches:
+            cutoff = np.inf
+            if cutoff_ratio is not None and best:
+                cutoff = self._cutoff(best, cutoff_ratio)
+            batch = selected[positions]
+            thresholds = np.array([min(best.get(words[i], np.inf), cutoff) for i in batch])
+            # Élagage par la borne inférieure
+            keep = bounds[positions] < thresholds
+            stats["pruned"] += int(np.sum(~keep))
+            batch, thresholds = batch[keep], thresholds[keep]
+            if len(batch) == 0:
+                continue
+            distances = dtw_templates(query, templates[batch], self.band, thresholds)
+            stats["aligned"] += len(batch)
+            stats["abandoned"] += int(np.sum(np.isinf(distances)))
+            for index, distance in zip(batch, distances):
+                word = words[index]
+                if distance < best.get(word, np.inf):
+                    best[word] = float(distance)
+                    best_index[word] = int(index)
+        
+        # Un mot retenu avant que le seuil global ne se resserre peut le dépasser
+        if cutoff_ratio is not None and best:
+            cutoff = self._cutoff(best, cutoff_ratio)
+            best = {word: distance for word, distance in best.items() if distance <= cutoff}
+            best_index = {word: best_index[word] for word in best}
+        return best, best_index, stats
 
 class PhonemeAnalyzer:
-    def __init__(self):
+    def __init__(self, template_length=40, band=0.1, temperature=0.05):
+        # Gabarits : trames de 25 ms toutes les 10 ms, MFCC 1 à 12 centrés
+        self.frame_ms = 25
+        self.hop_ms = 10
+        self.n_mfcc = 13
+        self.trim_db = 30
+        # Confiance : softmax des distances relatives au meilleur mot
+        self.temperature = temperature
+        self.template_bank = TemplateBank(template_length, band)
+        # Un ajout de référence ne doit pas se perdre pendant un rechargement de la banque
+        self._references_lock = threading.Lock()
         self.paires_minimales = [
             {"mot1": "fil", "mot2": "fille", "description": "/il/ vs /ij/ - absence vs présence de [j]"},
             {"mot1": "con", "mot2": "ton", "description": "/kɔ̃/ vs /tɔ̃/ - [k] vs [t]"},
@@ -17,7 +166,182 @@ class PhonemeAnalyzer:
         """Retourner les paires minimales"""
         return self.paires_minimales
     
-    def analyze_phonemes(self, audio_data):
-        """Analyser les phonèmes d'un enregistrement"""
-        # Analyse simplifiée des phonèmes
-        return {"phonemes": [], "confidence": []}
+    def get_words(self):
+        """Mots des paires minimales, sans doublon, dans l'ordre des paires"""
+        words = []
+        for paire in self.paires_minimales:
+            for word in (paire["mot1"], paire["mot2"]):
+                if word not in words:
+                    words.append(word)
+        return words
+    
+    def get_partners(self, word):
+        """Mots formant une paire minimale avec `word`"""
+        partners = []
+        for paire in self.paires_minimales:
+            if paire["mot1"] == word:
+                partners.append(paire["mot2"])
+            elif paire["mot2"] == word:
+                partners.append(paire["mot1"])
+        return partners
+    
+    def trim(self, audio_data, sr):
+        """Mot isolé sans ses silences ; renvoie `(signal, début en secondes)`"""
+        import librosa
+        
+        hop_length = int(sr * self.hop_ms / 1000)
+        trimmed, (start, _) = librosa.effects.trim(audio_data, top_db=self.trim_db,
+                                                   frame_length=4 * hop_length, hop_length=hop_length)
+        return trimmed, start / sr
+    
+    def token_features(self, audio_data, sr):
+        """Trames MFCC 1 à 12 (moyenne retirée) d'un mot isolé, ramenées à la longueur des gabarits"""
+        import librosa
+        
+        hop_length = int(sr * self.hop_ms / 1000)
+        win_length = int(sr * self.frame_ms / 1000)
+        n_fft = 1 << (win_length - 1).bit_length()
+        mfcc = librosa.feature.mfcc(y=np.asarray(audio_data, dtype=np.float32), sr=sr,
+                                    n_mfcc=self.n_mfcc, n_fft=n_fft, win_length=win_length,
+                                    hop_length=hop_length)[1:].T
+        mfcc = mfcc - mfcc.mean(axis=0)
+        
+        # Rééchantillonnage temporel : même nombre de trames pour tous les gabarits
+        length = self.template_bank.length
+        positions = np.linspace(0, len(mfcc) - 1, length)
+        return np.stack([np.interp(positions, np.arange(len(mfcc)), column) for column in mfcc.T], axis=1)
+    
+    def add_reference(self, word, audio_data, sr, source=None):
+        """Ajouter un enregistrement de référence d'un mot à la banque de gabarits"""
+        features = self.reference_features(word, audio_data, sr)
+        with self._references_lock:
+            self.template_bank.add(word, features, source)
+    
+    def reference_features(self, word, audio_data, sr):
+        """Gabarit d'un enregistrement de référence (silences retirés)"""
+        trimmed, _ = self.trim(audio_data, sr)
+        if len(trimmed) < sr * 0.05:
+            raise ValueError(f"Référence trop courte pour « {word} »")
+        return self.token_features(trimmed, sr)
+    
+    def reference_directory(self, root):
+        """Dossier des références d'un corpus : un sous-dossier par mot"""
+        return os.path.join(root, ".mots")
+    
+    def reference_path(self, root, word, name):
+        """Chemin du WAV d'une nouvelle référence de `word`"""
+        directory = os.path.join(self.reference_directory(root), word)
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, f"{name}.wav")
+    
+    @traced()
+    def load_references(self, root, load_audio):
+        """Reconstruire la banque depuis `root/.mots/<mot>/*.wav`
+
+        `load_audio(path)` renvoie `(signal, sr)` (par exemple
+        AudioProcessor.load_audio, qui passe par le cache). Renvoie le nombre de
+        gabarits chargés. La nouvelle banque est construite à part puis remplace
+        l'ancienne d'un coup ; les références ajoutées pendant le chargement y
+        sont reportées (une seule fois, même si le parcours les a déjà lues).
+        """
+        bank = TemplateBank(self.template_bank.length, self.template_bank.band)
+        for word in self.get_words():
+            for path in sorted(glob.glob(os.path.join(self.reference_directory(root), word, "*.wav"))):
+                if path in bank.sources:
+                    continue
+                try:
+                    audio_data, sr = load_audio(path)
+                    bank.add(word, self.reference_features(word, audio_data, sr), path)
+                except Exception as exc:
+                    print(f"Référence ignorée {path}: {exc}")
+        
+        with self._references_lock:
+            loaded = set(bank.sources)
+            for word, features, source in self.template_bank.entries():
+                if source is None or source not in loaded:
+                    bank.add(word, features, source)
+            self.template_bank = bank
+        return len(bank)
+    
+    def contrast_segment(self, query, best, other, duration, offset=0.0):
+        """Segment du mot où les gabarits des deux mots diffèrent le plus
+        
+        La requête est alignée sur chacun des deux gabarits ; pour chaque trame,
+        l'écart entre le coût local face au second mot et face au premier montre
+        où le signal les départage. Renvoie `(début, fin)` en secondes dans
+        l'enregistrement analysé.
+        """
+        band = self.template_bank.band
+        costs = []
+        for template in (best, other):
+            local = np.zeros(len(query))
+            counts = np.zeros(len(query))
+            for i, j in warping_path(dtw_matrix(query, template, band)):
+                local[i] += np.linalg.norm(query[i] - template[j])
+                counts[i] += 1
+            costs.append(local / np.maximum(counts, 1))
+        contrast = np.convolve(costs[1] - costs[0], np.ones(3) / 3, mode="same")
+        
+        # Région contiguë autour du maximum, au-dessus de la moitié de celui-ci
+        peak = int(np.argmax(contrast))
+        threshold = 0.5 * contrast[peak]
+        start, end = peak, peak
+        while start > 0 and contrast[start - 1] >= threshold:
+            start -= 1
+        while end < len(contrast) - 1 and contrast[end + 1] >= threshold:
+            end += 1
+        frame = duration / len(query)
+        return float(offset + start * frame), float(offset + (end + 1) * frame)
+    
+    @traced()
+    def analyze_phonemes(self, audio_data, sr=16000, candidates=None):
+        """Reconnaître un mot isolé parmi ceux de la banque de gabarits
+        
+        `candidates` restreint la recherche (par exemple les deux mots d'une
+        paire). Renvoie les mots par confiance décroissante (`phonemes`,
+        `confidence`), la distance au meilleur gabarit de chaque mot, le segment
+        qui départage les deux premiers mots et les statistiques d'élagage.
+        """
+        # Une seule banque pour toute l'analyse : load_references() peut la remplacer entre-temps
+        bank = self.template_bank
+        if len(bank) == 0:
+            return {"phonemes": [], "confidence": []}
+        
+        trimmed, offset = self.trim(audio_data, sr)
+        query = self.token_features(trimmed, sr)
+        # Au-delà de ce seuil, la confiance d'un mot est négligeable (< e^-10)
+        distances, best_index, stats = bank.search(query, candidates, cutoff_ratio=10 * self.temperature)
+        if not distances:
+            return {"phonemes": [], "confidence": [], "stats": stats}
+        
+        words = sorted(distances, key=distances.get)
+        values = np.array([distances[word] for word in words])
+        # Distance nulle (requête identique à un gabarit) : pas de division par zéro
+        scores = np.exp(-(values / max(values[0], DISTANCE_EPS) - 1) / self.temperature)
+        confidence = scores / scores.sum()
+        # Mots écartés par le seuil : confiance nulle
+        rejected = [word for word in dict.fromkeys(bank.words)
+                    if word not in distances and (candidates is None or word in candidates)]
+        result = {
+            "phonemes": words + rejected,
+            "confidence": [float(c) for c in confidence] + [0.0] * len(rejected),
+            "distances": distances,
+            "stats": stats,
+            "contrast": None,
+        }
+        
+        # Segment qui départage le mot reconnu de son partenaire (ou du second mot)
+        partners = [word for word in self.get_partners(words[0]) if word in result["phonemes"]]
+        partners.sort(key=lambda word: distances.get(word, np.inf))
+        other = partners[0] if partners else (words[1] if len(words) > 1 else None)
+        if other is not None:
+            if other not in best_index:
+                # Partenaire écarté par le seuil : recherche exacte de son meilleur gabarit
+                _, other_index, _ = bank.search(query, candidates=(other,))
+                best_index[other] = other_index[other]
+            templates = bank.templates
+            start, end = self.contrast_segment(query, templates[best_index[words[0]]],
+                                               templates[best_index[other]],
+                                               len(trimmed) / sr, offset)
+            result["contrast"] = {"word": words[0], "versus": other, "start": start, "end": end}
+        return result
@@ -1,5 +1,7 @@
 """Module d'analyse prosodique"""
 
+from modules.instrumentation import traced
+
 class ProsodyAnalyzer:
     def __init__(self):
         self.characteristics = {
@@ -33,13 +35,20 @@ class ProsodyAnalyzer:
         """Récupérer les caractéristiques d'une modalité"""
         return self.characteristics.get(mode, {})
     
-    def analyze_prosody(self, audio_data, sr):
-        """Analyser les paramètres prosodiques"""
-        import librosa
+    @traced()
+    def analyze_prosody(self, audio_data, sr, f0=None, engine="pyin", spans=None):
+        """Analyser les paramètres prosodiques (F0 recalculée si non fournie)
+        
+        Avec `spans` (segments de parole, voir AudioProcessor.detect_speech), la
+        durée et le RMS sont aussi donnés sur la seule parole (`speech_duration`,
+        `speech_rms`), sans les silences de début et de fin.
+        """
         import numpy as np
+        from modules.f0_engines import estimate_f0
         
         # Extraction de F0
-        f0, voiced_flag, voiced_probs = librosa.pyin(audio_data, f_min=80, f_max=400, sr=sr)
+        if f0 is None:
+            f0, voiced_flag, voiced_probs = estimate_f0(audio_data, sr, engine=engine, fmin=80, fmax=400)
         
         # Durée
         duration = len(audio_data) / sr
@@ -47,10 +56,49 @@ class ProsodyAnalyzer:
         # RMS
         rms = np.sqrt(np.mean(audio_data**2))
         
-        return {
+        result = {
             "f0_mean": np.nanmean(f0[f0 > 0]),
             "f0_min": np.nanmin(f0[f0 > 0]),
             "f0_max": np.nanmax(f0[f0 > 0]),
             "duration": duration,
             "rms": rms
         }
+        if spans is not None:
+            from modules.audio_processor import speech_stats
+            stats = speech_stats(audio_data, sr, spans)
+            result["speech_duration"] = stats["speech_duration"]
+            result["speech_rms"] = stats["speech_rms"]
+        return result
+    
+    @traced()
+    def analyze_prosody_stream(self, stream):
+        """Paramètres prosodiques d'un long enregistrement lu en flux (voir modules.streaming)
+        
+        Mêmes clés qu'analyze_prosody avec des segments de parole, plus le taux
+        de voisement ; la F0 est accumulée bloc par bloc sans garder la piste.
+        """
+        import numpy as np
+        
+        total = 0.0
+        count = 0
+        f0_min, f0_max = np.inf, -np.inf
+        voiced_frames = 0
+        frames = 0
+        for block in stream:
+            f0 = block["f0"][block["f0"] > 0]
+            if len(f0):
+                total += float(f0.sum())
+                count += len(f0)
+                f0_min = min(f0_min, float(f0.min()))
+                f0_max = max(f0_max, float(f0.max()))
+            voiced_frames += int(np.count_nonzero(block["voiced_flag"]))
+            frames += len(block["f0"])
+        
+        result = {
+            "f0_mean": total / count if count else np.nan,
+            "f0_min": f0_min if count else np.nan,
+            "f0_max": f0_max if count else np.nan,
+            "voiced_ratio": voiced_frames / frames if frames else 0.0,
+        }
+        result.update(stream.stats())
+        return result
@@ -0,0 +1,87 @@
+"""Module d'enregistrement audio en continu sur disque"""
+
+import queue
+import threading
+
+import numpy as np
+import soundfile as sf
+
+class StreamingRecorder:
+    """Enregistreur à tampons préalloués, écrit dans le fichier WAV au fil de l'eau
+    
+    Le callback audio copie chaque bloc dans un segment d'un pool float32 fixé à
+    la création ; les segments pleins sont écrits par un thread dédié puis
+    recyclés. La mémoire reste bornée quelle que soit la durée de la session et
+    l'arrêt n'a plus qu'à vider les quelques segments en attente.
+    """
+    
+    def __init__(self, path, sr, chunk_size=16384, n_chunks=32, subtype=None):
+        self.path = path
+        self.sr = sr
+        self.chunk_size = chunk_size
+        self._pool = np.zeros((n_chunks, chunk_size), dtype=np.float32)
+        self._free = queue.Queue()
+        self._filled = queue.Queue()
+        for idx in range(1, n_chunks):
+            self._free.put(idx)
+        self._current = 0
+        self._pos = 0
+        
+        self.frames_written = 0
+        self.dropped_samples = 0
+        
+        self._file = sf.SoundFile(path, mode="w", samplerate=sr, channels=1, subtype=subtype)
+        self._writer = threading.Thread(target=self._write_loop, name="ecriture-wav", daemon=True)
+        self._writer.start()
+    
+    @property
+    def duration(self):
+        """Durée écrite sur disque, en secondes"""
+        return self.frames_written / self.sr
+    
+    def write(self, block):
+        """Copier un bloc mono dans le pool (appelé depuis le callback audio)"""
+        offset = 0
+        n = len(block)
+        while offset < n:
+            if self._current is None:
+                # Le thread d'écriture est en retard : recycler un segment libéré depuis
+                try:
+                    self._current = self._free.get_nowait()
+                    self._pos = 0
+                except queue.Empty:
+                    self.dropped_samples += n - offset
+                    return
+            
+            count = min(n - offset, self.chunk_size - self._pos)
+            self._pool[self._current, self._pos:self._pos + count] = block[offset:offset + count]
+            self._pos += count
+            offset += count
+            
+            if self._pos == self.chunk_size:
+                self._filled.put((self._current, self._pos))
+                try:
+                    self._current = self._free.get_nowait()
+                except queue.Empty:
+                    self._current = None
+                self._pos = 0
+    
+    def _write_loop(self):
+        while True:
+            item = self._filled.get()
+            if item is None:
+                break
+            idx, length = item
+            self._file.write(self._pool[idx, :length])
+            self.frames_written += length
+            self._free.put(idx)
+    
+    def stop(self):
+        """Vider le segment en cours, attendre l'écriture et fermer le fichier"""
+        if self._current is not None and self._pos > 0:
+            self._filled.put((self._current, self._pos))
+            self._current = None
+        self._filled.put(None)
+        self._writer.join()
+        self._file.close()
+        return self.path
@@ -0,0 +1,35 @@
+"""Module de nommage et de recherche des enregistrements (partagé par le catalogue et l'analyse en lot)
+
+Un enregistrement est un fichier WAV nommé `<modalité>_<nom>.wav`, rangé dans
+le sous-dossier de son locuteur.
+"""
+
+import os
+
+PROSODY_MODES = ["déclarative", "interrogative", "exclamative", "impérative"]
+
+def parse_recording_name(path, root):
+    """Extraire modalité, nom et locuteur du chemin (`<mode>_<nom>.wav`, locuteur = sous-dossier)"""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    mode = ""
+    name = stem
+    for candidate in PROSODY_MODES:
+        if stem.startswith(candidate + "_"):
+            mode = candidate
+            name = stem[len(candidate) + 1:]
+            break
+    
+    relative_dir = os.path.dirname(os.path.relpath(path, root))
+    speaker = relative_dir.split(os.sep)[0] if relative_dir else ""
+    return mode, name, speaker
+
+def find_recordings(root, recursive):
+    """Lister les fichiers WAV du corpus, triés"""
+    paths = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        # Ignorer les dossiers cachés (cache des caractéristiques, etc.)
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        paths.extend(os.path.join(dirpath, f) for f in filenames if f.lower().endswith(".wav"))
+        if not recursive:
+            break
+    return sorted(paths)
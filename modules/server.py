@@ -0,0 +1,531 @@
+"""Serveur HTTP local d'analyse (asyncio, bibliothèque standard) pour l'interface web
+
+Usage (depuis la racine du dépôt) :
+    python -m modules.server [--port 8765] [--storage enregistrements/serveur] [--workers 4]
+
+Points d'accès (réponses JSON) :
+    POST /recordings                      déposer un enregistrement (corps : fichier WAV) -> id
+    GET  /recordings                      lister les enregistrements déposés
+    GET  /recordings/<id>                 durée et fréquence d'un enregistrement
+    GET  /recordings/<id>/prosody         résumé prosodique (?engine=pyin|yin|autocorr)
+    GET  /recordings/<id>/tracks          pistes de F0, voisement et enveloppe par trame
+    GET  /compare?a=<id>&b=<id>           résumés des deux enregistrements et distance DTW des contours
+    GET  /health, GET /stats              état du serveur, compteurs (regroupements, lots, cache)
+
+Les enregistrements sont rangés par empreinte de contenu (SHA-1) : déposer
+deux fois le même fichier donne le même id. Les extractions (F0, enveloppe)
+tournent dans un pool de processus. Les requêtes simultanées sur le même
+contenu et la même méthode attendent une seule analyse ; les résultats sont
+gardés en mémoire (LRU) et les caractéristiques dans le cache disque. Les
+enregistrements courts sont regroupés en lots (quelques millisecondes
+d'attente au plus), répartis sur les processus du pool en un appel par
+processus au plus.
+
+Seules les pages des origines autorisées (`--allow-origin`, par défaut
+l'interface Next.js sur http://localhost:3000) peuvent appeler le service
+depuis un navigateur : une requête portant une autre origine est refusée (403).
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import signal
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from modules.batch import SINGLE_THREAD_ENV
+from modules.feature_cache import LRUCache
+
+REASONS = {200: "OK", 201: "Created", 204: "No Content", 400: "Bad Request", 403: "Forbidden", 404: "Not Found",
+           405: "Method Not Allowed", 411: "Length Required", 413: "Payload Too Large",
+           422: "Unprocessable Entity", 431: "Request Header Fields Too Large", 500: "Internal Server Error"}
+
+_processor = None
+
+class HTTPError(Exception):
+    """Erreur renvoyée au client avec un code HTTP"""
+    
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def _init_worker(cache_dir, sr):
+    """Exécuté au démarrage de chaque processus du pool : processeur partagé par ses analyses"""
+    global _processor
+    from modules.audio_processor import AudioProcessor
+    _processor = AudioProcessor(cache_dir=cache_dir, analysis_rate=sr)
+
+def _prewarm_worker(engine):
+    """Exécuté dans un processus du pool : imports et compilation JIT sur un signal court"""
+    from modules.f0_engines import estimate_f0
+    estimate_f0(np.zeros(_processor.analysis_rate // 2, dtype=np.float32), _processor.analysis_rate,
+                engine=engine)
+    return os.getpid()
+
+def analyze_recording(path, engine):
+    """Résumé prosodique et pistes d'un enregistrement (exécuté dans un processus du pool)"""
+    from modules.batch import analyze_recording
+    return analyze_recording(_processor, path, engine)
+
+def analyze_batch(jobs):
+    """Analyser un lot `[(chemin, méthode), ...]` ; renvoie `[(exception, résultat), ...]`"""
+    results = []
+    for path, engine in jobs:
+        try:
+            results.append((None, analyze_recording(path, engine)))
+        except Exception as exc:
+            results.append((exc, None))
+    return results
+
+def contour_distance(first, second, band):
+    """Distance DTW entre les contours de F0 (demi-tons relatifs) de deux analyses"""
+    from modules.alignment import f0_contour, pairwise_distances
+    contours = [f0_contour(result["f0"], result["voiced_flag"])[0] for result in (first, second)]
+    return float(pairwise_distances(contours, band=band)[0, 1])
+
+def _track(values):
+    """Piste en liste JSON (NaN -> null)"""
+    values = np.asarray(values)
+    if values.dtype == bool:
+        return values.tolist()
+    return [None if np.isnan(v) else v for v in values.astype(np.float64).tolist()]
+
+class MicroBatcher:
+    """Regroupe les tâches soumises à peu d'intervalle en quelques appels au pool
+    
+    Un lot part dès qu'il contient `max_size` tâches, ou `max_delay` secondes
+    après sa première tâche. Il est réparti en `workers` appels au plus (un par
+    processus du pool) : un processus exécute son lot tâche après tâche, les
+    autres ne doivent pas rester inoccupés. Plusieurs lots peuvent être en
+    cours à la fois.
+    """
+    
+    def __init__(self, run_batch, max_size=8, max_delay=0.005, workers=1):
+        self.run_batch = run_batch
+        self.max_size = max_size
+        self.max_delay = max_delay
+        self.workers = workers
+        self.batches = 0
+        self.jobs = 0
+        self.largest = 0
+        self._queue = None
+        self._collector = None
+        self._pending = set()
+    
+    def start(self):
+        self._queue = asyncio.Queue()
+        self._collector = asyncio.ensure_future(self._collect())
+    
+    async def stop(self):
+        if self._collector is not None:
+            self._collector.cancel()
+            await asyncio.gather(self._collector, *self._pending, return_exceptions=True)
+    
+    async def submit(self, job):
+        """Résultat de `job`, calculé dans le prochain lot"""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((job, future))
+        return await future
+    
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self._queue.get()]
+            deadline = loop.time() + self.max_delay
+            while len(items) < self.max_size:
+                if not self._queue.empty():
+                    items.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    items.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            size = -(-len(items) // self.workers)
+            for first in range(0, len(items), size):
+                task = asyncio.ensure_future(self._dispatch(items[first:first + size]))
+                self._pending.add(task)
+                task.add_done_callback(self._pending.discard)
+    
+    async def _dispatch(self, items):
+        self.batches += 1
+        self.jobs += len(items)
+        self.largest = max(self.largest, len(items))
+        try:
+            results = await self.run_batch([job for job, _ in items])
+        except Exception as exc:
+            results = [(exc, None)] * len(items)
+        for (_, future), (error, result) in zip(items, results):
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+class AnalysisServer:
+    """Serveur HTTP/1.1 minimal (connexions persistantes) au-dessus d'un pool de processus"""
+    
+    ROUTES = [
+        ("GET", r"/health", "health"),
+        ("GET", r"/stats", "stats"),
+        ("GET", r"/recordings", "list_recordings"),
+        ("POST", r"/recordings", "upload"),
+        ("GET", r"/recordings/(?P<recording_id>[0-9a-f]{40})", "recording"),
+        ("GET", r"/recordings/(?P<recording_id>[0-9a-f]{40})/prosody", "prosody"),
+        ("GET", r"/recordings/(?P<recording_id>[0-9a-f]{40})/tracks", "tracks"),
+        ("GET", r"/compare", "compare"),
+    ]
+    
+    def __init__(self, storage, workers=None, sr=16000, engine="pyin", batch_size=8, batch_delay=0.005,
+                 batch_max_duration=10.0, result_cache_bytes=64 * 1024**2, max_upload_bytes=200 * 1024**2,
+                 allow_origins=("http://localhost:3000",)):
+        self.storage = storage
+        self.cache_dir = os.path.join(storage, ".cache")
+        self.workers = workers or os.cpu_count()
+        self.sr = sr
+        self.engine = engine
+        self.batch_max_duration = batch_max_duration
+        self.max_upload_bytes = max_upload_bytes
+        # Pages web autorisées (interface Next.js) ; les clients sans en-tête Origin ne sont pas concernés
+        self.allow_origins = set(allow_origins)
+        self.results = LRUCache(result_cache_bytes)
+        self.batcher = MicroBatcher(self._run_batch, max_size=batch_size, max_delay=batch_delay,
+                                    workers=self.workers)
+        self.counters = {"requests": 0, "analyses": 0, "coalesced": 0, "cache_hits": 0, "errors": 0}
+        self.pool = None
+        self._server = None
+        self._recordings = {}
+        self._inflight = {}
+        self._routes = [(method, re.compile(pattern + "$"), name) for method, pattern, name in self.ROUTES]
+        os.makedirs(self.cache_dir, exist_ok=True)
+    
+    async def start(self, host="127.0.0.1", port=8765):
+        """Démarrer le pool (processus préparés) puis écouter ; renvoie le port effectif"""
+        from modules.f0_engines import F0_ENGINES
+        if self.engine not in F0_ENGINES:
+            raise ValueError(f"Méthode F0 inconnue: {self.engine} (disponibles: {', '.join(F0_ENGINES)})")
+        # Les processus se partagent les cœurs : pas de parallélisme interne BLAS/numba. Réglé avant
+        # leur lancement (processus dédié) : ils réimportent ce module, et numpy, avant tout initializer
+        os.environ.update(SINGLE_THREAD_ENV)
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                                        initializer=_init_worker, initargs=(self.cache_dir, self.sr))
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[loop.run_in_executor(self.pool, _prewarm_worker, self.engine)
+                               for _ in range(self.workers)])
+        self.batcher.start()
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server.sockets[0].getsockname()[1]
+    
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await self.batcher.stop()
+        if self.pool is not None:
+            self.pool.shutdown(wait=True, cancel_futures=True)
+    
+    async def serve_forever(self):
+        await self._server.serve_forever()
+    
+    # Connexions et routage
+    
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._respond(writer, 431, {"error": "en-têtes trop longs"}, keep_alive=False)
+                    break
+                
+                request_line, *header_lines = head.decode("latin-1").rstrip("\r\n").split("\r\n")
+                headers = {}
+                for line in header_lines:
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    method, target, version = request_line.split(" ", 2)
+                    length = int(headers.get("content-length", 0))
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "requête invalide"}, keep_alive=False)
+                    break
+                if "transfer-encoding" in headers:
+                    # Corps découpé (chunked) non pris en charge : la fin de la requête est inconnue
+                    await self._respond(writer, 411, {"error": "Content-Length requis"}, keep_alive=False)
+                    break
+                if length > self.max_upload_bytes:
+                    await self._respond(writer, 413, {"error": "fichier trop volumineux"}, keep_alive=False)
+                    break
+                try:
+                    body = await reader.readexactly(length) if length else b""
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                origin = headers.get("origin")
+                if origin is not None and origin not in self.allow_origins:
+                    # Page d'un autre site : ni lecture ni dépôt d'enregistrements
+                    self.counters["requests"] += 1
+                    self.counters["errors"] += 1
+                    status, payload = 403, {"error": f"origine non autorisée: {origin}"}
+                else:
+                    status, payload = await self.dispatch(method, target, body)
+                await self._respond(writer, status, payload, keep_alive, origin)
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+    
+    async def _respond(self, writer, status, payload, keep_alive, origin=None):
+        body = b"" if payload is None else json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        headers = [
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+            "Content-Type: application/json; charset=utf-8",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+            "Vary: Origin",
+        ]
+        if origin in self.allow_origins:
+            # Interface web servie par le serveur de développement Next.js (autre port)
+            headers += [
+                f"Access-Control-Allow-Origin: {origin}",
+                "Access-Control-Allow-Methods: GET, POST, OPTIONS",
+                "Access-Control-Allow-Headers: Content-Type",
+            ]
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + body)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+    
+    async def dispatch(self, method, target, body):
+        """Traiter une requête ; renvoie `(code, données JSON)`"""
+        self.counters["requests"] += 1
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        path = url.path.rstrip("/") or "/"
+        if method == "OPTIONS":
+            return 204, None
+        allowed = False
+        try:
+            for route_method, pattern, name in self._routes:
+                match = pattern.match(path)
+                if match is None:
+                    continue
+                allowed = True
+                if route_method == method:
+                    return await getattr(self, f"handle_{name}")(query, body, **match.groupdict())
+            raise HTTPError(405 if allowed else 404, f"{method} {path}: {'méthode non permise' if allowed else 'introuvable'}")
+        except HTTPError as exc:
+            self.counters["errors"] += 1
+            return exc.status, {"error": str(exc)}
+        except ValueError as exc:
+            self.counters["errors"] += 1
+            return 422, {"error": str(exc)}
+        except Exception as exc:
+            self.counters["errors"] += 1
+            return 500, {"error": f"{type(exc).__name__}: {exc}"}
+    
+    # Enregistrements et analyses
+    
+    def _recording_path(self, recording_id):
+        return os.path.join(self.storage, f"{recording_id}.wav")
+    
+    async def recording_info(self, recording_id):
+        """Durée et fréquence d'un enregistrement déposé (404 s'il est inconnu)"""
+        info = self._recordings.get(recording_id)
+        if info is None:
+            import soundfile as sf
+            try:
+                sound = await asyncio.to_thread(sf.info, self._recording_path(recording_id))
+            except (OSError, RuntimeError):
+                raise HTTPError(404, f"enregistrement inconnu: {recording_id}") from None
+            info = {"id": recording_id, "duration": sound.duration, "sr": sound.samplerate,
+                    "channels": sound.channels}
+            self._recordings[recording_id] = info
+        return info
+    
+    def _engine(self, query):
+        from modules.f0_engines import F0_ENGINES
+        engine = query.get("engine", self.engine)
+        if engine not in F0_ENGINES:
+            raise HTTPError(400, f"méthode F0 inconnue: {engine} (disponibles: {', '.join(F0_ENGINES)})")
+        return engine
+    
+    async def analysis(self, recording_id, engine):
+        """Analyse d'un enregistrement : cache, sinon analyse en cours partagée, sinon nouvelle analyse"""
+        key = (recording_id, engine)
+        result = self.results.get(key)
+        if result is not None:
+            self.counters["cache_hits"] += 1
+            return result
+        task = self._inflight.get(key)
+        if task is None:
+            info = await self.recording_info(recording_id)
+            task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._analyze(key, info))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.counters["coalesced"] += 1
+        # shield : un client qui se déconnecte n'annule pas l'analyse des autres
+        return await asyncio.shield(task)
+    
+    async def _analyze(self, key, info):
+        recording_id, engine = key
+        self.counters["analyses"] += 1
+        job = (self._recording_path(recording_id), engine)
+        if info["duration"] <= self.batch_max_duration:
+            result = await self.batcher.submit(job)
+        else:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self.pool, analyze_recording, *job)
+        self.results.put(key, result)
+        return result
+    
+    async def _run_batch(self, jobs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.pool, analyze_batch, jobs)
+    
+    # Points d'accès
+    
+    async def handle_health(self, query, body):
+        return 200, {"status": "ok", "workers": self.workers, "sr": self.sr, "engine": self.engine}
+    
+    async def handle_stats(self, query, body):
+        return 200, dict(self.counters, batches=self.batcher.batches, batched_jobs=self.batcher.jobs,
+                         largest_batch=self.batcher.largest, inflight=len(self._inflight),
+                         cached_results=len(self.results))
+    
+    async def handle_list_recordings(self, query, body):
+        names = sorted(name for name in os.listdir(self.storage) if name.endswith(".wav"))
+        return 200, {"recordings": [os.path.splitext(name)[0] for name in names]}
+    
+    async def handle_upload(self, query, body):
+        if not body:
+            raise HTTPError(400, "corps vide : envoyer le fichier WAV")
+        recording_id = hashlib.sha1(body).hexdigest()
+        path = self._recording_path(recording_id)
+        created = not os.path.exists(path)
+        if created:
+            import soundfile as sf
+            tmp_path = f"{path}.{os.getpid()}.{id(body)}.tmp"
+            
+            def store():
+                with open(tmp_path, "wb") as f:
+                    f.write(body)
+                try:
+                    sf.info(tmp_path)
+                except RuntimeError:
+                    os.remove(tmp_path)
+                    raise HTTPError(400, "fichier audio illisible") from None
+                os.replace(tmp_path, path)
+            
+            await asyncio.to_thread(store)
+        return (201 if created else 200), dict(await self.recording_info(recording_id), created=created)
+    
+    async def handle_recording(self, query, body, recording_id):
+        return 200, await self.recording_info(recording_id)
+    
+    async def handle_prosody(self, query, body, recording_id):
+        engine = self._engine(query)
+        result = await self.analysis(recording_id, engine)
+        return 200, dict(result["summary"], id=recording_id, engine=engine)
+    
+    async def handle_tracks(self, query, body, recording_id):
+        engine = self._engine(query)
+        result = await self.analysis(recording_id, engine)
+        return 200, {
+            "id": recording_id,
+            "engine": engine,
+            "sr": result["sr"],
+            "hop_length": result["hop_length"],
+            "f0": _track(result["f0"]),
+            "voiced_flag": _track(result["voiced_flag"]),
+            "envelope": _track(result["envelope"]),
+            "speech": result["speech"].tolist(),
+        }
+    
+    async def handle_compare(self, query, body):
+        if "a" not in query or "b" not in query:
+            raise HTTPError(400, "paramètres a et b (ids des enregistrements) requis")
+        engine = self._engine(query)
+        try:
+            band = float(query.get("band", 0.1))
+        except ValueError:
+            raise HTTPError(400, "band doit être un nombre") from None
+        if not 0 < band <= 1:
+            raise HTTPError(400, "band doit être compris entre 0 et 1")
+        first, second = await asyncio.gather(self.analysis(query["a"], engine), self.analysis(query["b"], engine))
+        distance = await asyncio.to_thread(contour_distance, first, second, band)
+        return 200, {
+            "a": dict(first["summary"], id=query["a"]),
+            "b": dict(second["summary"], id=query["b"]),
+            "engine": engine,
+            "band": band,
+            "dtw_distance": distance,
+            "f0_difference_semitones": 12 * float(np.log2(first["summary"]["f0_mean"] / second["summary"]["f0_mean"])),
+        }
+
+async def serve(args):
+    server = AnalysisServer(args.storage, workers=args.workers, sr=args.sr, engine=args.engine,
+                            batch_size=args.batch_size, batch_delay=args.batch_delay / 1000,
+                            batch_max_duration=args.batch_max_duration, allow_origins=args.allow_origin)
+    port = await server.start(args.host, args.port)
+    print(f"Serveur d'analyse sur http://{args.host}:{port} ({server.workers} processus)", file=sys.stderr, flush=True)
+    serving = asyncio.ensure_future(server.serve_forever())
+    try:
+        # Arrêt propre sur SIGTERM (processus du pool compris)
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, serving.cancel)
+    except (NotImplementedError, RuntimeError):
+        pass
+    try:
+        await serving
+    except asyncio.CancelledError:
+        pass
+    finally:
+        await server.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765, help="port d'écoute (0 : port libre)")
+    parser.add_argument("--storage", default=os.path.join("enregistrements", "serveur"),
+                        help="dossier des enregistrements déposés (cache dans <dossier>/.cache)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="nombre de processus (défaut : nombre de cœurs)")
+    parser.add_argument("--sr", type=int, default=16000, help="fréquence d'échantillonnage d'analyse")
+    parser.add_argument("--engine", default="pyin", help="méthode F0 par défaut (pyin, yin, autocorr)")
+    parser.add_argument("--batch-size", type=int, default=8, help="taille maximale d'un lot")
+    parser.add_argument("--batch-delay", type=float, default=5.0, help="attente maximale d'un lot (ms)")
+    parser.add_argument("--batch-max-duration", type=float, default=10.0,
+                        help="durée (s) en dessous de laquelle un enregistrement est analysé en lot")
+    parser.add_argument("--allow-origin", action="append", default=None,
+                        help="origine autorisée de l'interface web (répétable, défaut : http://localhost:3000)")
+    args = parser.parse_args()
+    args.allow_origin = args.allow_origin or ["http://localhost:3000"]
+    
+    os.makedirs(args.storage, exist_ok=True)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
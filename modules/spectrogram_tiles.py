@@ -0,0 +1,269 @@
+"""Module de spectrogramme en tuiles multi-résolution (zoom et défilement des longs enregistrements)
+
+Le spectrogramme (dB, float16) est rangé dans une pyramide : le niveau k
+regroupe 2^k trames par colonne et, jusqu'à FREQ_LEVELS, 2^k raies par ligne
+(maximum des valeurs regroupées, pour garder les harmoniques visibles).
+Chaque niveau est découpé en tuiles de TILE_FRAMES colonnes ; l'affichage ne
+lit que les tuiles visibles, au niveau qui donne au moins une colonne par
+pixel. Le coût d'un redessin dépend de la largeur de l'axe, pas de la durée
+de l'enregistrement.
+
+La pyramide est construite par blocs de trames (la STFT complète n'est jamais
+en mémoire) et peut être écrite sur disque : un fichier .npy par niveau, lu
+par projection mémoire, et un en-tête JSON écrit en dernier.
+"""
+
+import json
+import os
+import shutil
+
+import numpy as np
+
+from modules.instrumentation import span, traced
+
+TILE_FRAMES = 256
+BLOCK_FRAMES = 4096
+MAX_LEVELS = 12
+FREQ_LEVELS = 2
+TOP_DB = 80.0
+AMIN = 1e-10
+FORMAT_VERSION = 1
+
+def _pool(values, axis):
+    """Maximum des paires de valeurs le long de `axis` (la dernière est gardée seule si impaire)"""
+    n = values.shape[axis]
+    if n % 2:
+        last = np.take(values, [n - 1], axis=axis)
+        values = np.concatenate([values, last], axis=axis)
+    even = np.take(values, np.arange(0, values.shape[axis], 2), axis=axis)
+    odd = np.take(values, np.arange(1, values.shape[axis], 2), axis=axis)
+    return np.maximum(even, odd)
+
+def pyramid_shapes(n_frames, n_bins):
+    """Formes `(colonnes, lignes)` et facteurs `(trames, raies)` de chaque niveau"""
+    shapes = []
+    factors = []
+    frames, rows = n_frames, n_bins
+    for k in range(MAX_LEVELS):
+        shapes.append((frames, rows))
+        factors.append((2**k, 2**min(k, FREQ_LEVELS)))
+        if frames <= TILE_FRAMES:
+            break
+        frames = -(-frames // 2)
+        if k < FREQ_LEVELS:
+            rows = -(-rows // 2)
+    return shapes, factors
+
+def _frames_db(audio_data, first, stop, n_fft, hop_length):
+    """Spectrogramme (dB, trames en premier) des trames `first..stop` d'une STFT centrée"""
+    import librosa
+    # Même découpage que librosa.stft(center=True) : signal complété de n_fft/2 zéros
+    start = first * hop_length - n_fft // 2
+    end = (stop - 1) * hop_length + n_fft - n_fft // 2
+    segment = np.zeros(end - start, dtype=np.float32)
+    lo, hi = max(start, 0), min(end, len(audio_data))
+    if lo < hi:
+        segment[lo - start:hi - start] = audio_data[lo:hi]
+    stft = librosa.stft(segment, n_fft=n_fft, hop_length=hop_length, center=False)
+    power = stft.real**2 + stft.imag**2
+    return (10 * np.log10(np.maximum(power, AMIN))).T
+
+class SpectrogramPyramid:
+    """Pyramide de tuiles d'un spectrogramme (dB), en mémoire ou projetée depuis le disque
+    
+    `levels[k]` est un tableau (colonnes, lignes) en float16. Avec
+    `tile_cache` (un LRUCache), les tuiles lues sur disque y sont gardées.
+    """
+    
+    def __init__(self, levels, sr, n_fft, hop_length, n_frames, max_db, key=None, tile_cache=None):
+        self.levels = levels
+        self.sr = sr
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.n_frames = n_frames
+        self.n_bins = n_fft // 2 + 1
+        self.max_db = max_db
+        self.key = key
+        self.tile_cache = tile_cache
+        self.factors = pyramid_shapes(n_frames, self.n_bins)[1]
+    
+    @classmethod
+    def open(cls, directory, tile_cache=None):
+        """Ouvrir une pyramide écrite par build_pyramid(), ou None si absente ou incomplète"""
+        try:
+            with open(os.path.join(directory, "header.json"), encoding="utf-8") as f:
+                header = json.load(f)
+            if header.get("version") != FORMAT_VERSION:
+                return None
+            levels = [np.load(os.path.join(directory, f"level{k}.npy"), mmap_mode="r")
+                      for k in range(header["levels"])]
+        except (OSError, ValueError, KeyError):
+            return None
+        return cls(levels, header["sr"], header["n_fft"], header["hop_length"], header["n_frames"],
+                   header["max_db"], key=os.path.abspath(directory), tile_cache=tile_cache)
+    
+    def clim(self):
+        """Limites de couleur : TOP_DB sous le maximum (comme power_to_db(ref=np.max))"""
+        return self.max_db - TOP_DB, self.max_db
+    
+    def duration(self):
+        return self.n_frames * self.hop_length / self.sr
+    
+    def level_for(self, frames_per_pixel):
+        """Niveau le plus grossier qui garde au moins une colonne par pixel"""
+        level = 0
+        for k, (time_factor, _) in enumerate(self.factors):
+            if time_factor > frames_per_pixel:
+                break
+            level = k
+        return level
+    
+    def tile(self, level, index):
+        """Tuile `index` du niveau `level` (colonnes, lignes)"""
+        columns = self.levels[level]
+        if self.tile_cache is None or self.key is None:
+            return columns[index * TILE_FRAMES:(index + 1) * TILE_FRAMES]
+        cache_key = (self.key, level, index)
+        tile = self.tile_cache.get(cache_key)
+        if tile is None:
+            tile = np.array(columns[index * TILE_FRAMES:(index + 1) * TILE_FRAMES])
+            self.tile_cache.put(cache_key, tile)
+        return tile
+    
+    def query(self, t_start, t_end, n_pixels):
+        """Image (lignes, colonnes) et étendue `(t0, t1, f0, f1)` de la fenêtre [t_start, t_end]
+        
+        Seules les tuiles qui recouvrent la fenêtre sont lues.
+        """
+        frame_time = self.hop_length / self.sr
+        first = int(np.clip(np.floor(t_start / frame_time), 0, self.n_frames - 1))
+        stop = int(np.clip(np.ceil(t_end / frame_time) + 1, first + 1, self.n_frames))
+        level = self.level_for((stop - first) / max(int(n_pixels), 1))
+        time_factor, freq_factor = self.factors[level]
+        n_columns = len(self.levels[level])
+        c0 = first // time_factor
+        c1 = min(-(-stop // time_factor), n_columns)
+        tiles = [self.tile(level, index) for index in range(c0 // TILE_FRAMES, -(-c1 // TILE_FRAMES))]
+        offset = c0 // TILE_FRAMES * TILE_FRAMES
+        image = np.concatenate(tiles)[c0 - offset:c1 - offset].T
+        
+        # Trames centrées : la trame f couvre [f - 1/2, f + 1/2] pas
+        bin_hz = self.sr / self.n_fft
+        extent = ((c0 * time_factor - 0.5) * frame_time,
+                  (min(c1 * time_factor, self.n_frames) - 0.5) * frame_time,
+                  -0.5 * bin_hz,
+                  (min(image.shape[0] * freq_factor, self.n_bins) - 0.5) * bin_hz)
+        return image, extent
+
+@traced()
+def build_pyramid(audio_data, sr, n_fft, hop_length, directory=None, tile_cache=None):
+    """Construire la pyramide d'un signal par blocs de BLOCK_FRAMES trames
+    
+    Avec `directory`, les niveaux sont écrits sur disque (dossier temporaire
+    renommé à la fin : un lecteur ne voit jamais de pyramide partielle) puis
+    relus par projection mémoire ; sinon ils restent en mémoire.
+    """
+    n_frames = 1 + len(audio_data) // hop_length
+    shapes, factors = pyramid_shapes(n_frames, n_fft // 2 + 1)
+    tmp_dir = None
+    if directory is None:
+        levels = [np.empty(shape, dtype=np.float16) for shape in shapes]
+    else:
+        tmp_dir = f"{directory}.{os.getpid()}.tmp"
+        os.makedirs(tmp_dir, exist_ok=True)
+        levels = [np.lib.format.open_memmap(os.path.join(tmp_dir, f"level{k}.npy"), mode="w+",
+                                            dtype=np.float16, shape=shape)
+                  for k, shape in enumerate(shapes)]
+    
+    # BLOCK_FRAMES est un multiple de 2^k : les blocs se regroupent indépendamment
+    max_db = -np.inf
+    for first in range(0, n_frames, BLOCK_FRAMES):
+        stop = min(first + BLOCK_FRAMES, n_frames)
+        with span("spectrogram_block"):
+            block = _frames_db(audio_data, first, stop, n_fft, hop_length)
+        max_db = max(max_db, float(block.max()))
+        for k, (time_factor, _) in enumerate(factors):
+            if k:
+                block = _pool(block, 0)
+                if k <= FREQ_LEVELS:
+                    block = _pool(block, 1)
+            levels[k][first // time_factor:first // time_factor + len(block)] = block
+    
+    if directory is None:
+        return SpectrogramPyramid(levels, sr, n_fft, hop_length, n_frames, max_db)
+    
+    for level in levels:
+        level.flush()
+    del levels
+    header = {"version": FORMAT_VERSION, "sr": sr, "n_fft": n_fft, "hop_length": hop_length,
+              "n_frames": n_frames, "levels": len(shapes), "max_db": max_db}
+    with open(os.path.join(tmp_dir, "header.json"), "w", encoding="utf-8") as f:
+        json.dump(header, f)
+    try:
+        os.replace(tmp_dir, directory)
+    except OSError:
+        # Pyramide écrite entre-temps par une autre analyse : garder celle-là
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return SpectrogramPyramid.open(directory, tile_cache=tile_cache)
+
+def evict_pyramids(root, max_bytes):
+    """Supprimer les pyramides les moins récemment ouvertes au-delà de `max_bytes` sur disque"""
+    entries = []
+    total = 0
+    for name in os.listdir(root):
+        directory = os.path.join(root, name)
+        try:
+            stamp = os.stat(os.path.join(directory, "header.json")).st_mtime
+            size = sum(entry.stat().st_size for entry in os.scandir(directory))
+        except OSError:
+            continue
+        entries.append((stamp, size, directory))
+        total += size
+    
+    entries.sort()
+    for _, size, directory in entries:
+        if total <= max_bytes:
+            break
+        shutil.rmtree(directory, ignore_errors=True)
+        total -= size
+
+class TiledSpectrogram:
+    """Image matplotlib du spectrogramme, recomposée à chaque zoom, défilement ou redimensionnement
+    
+    Seules les tuiles visibles sont lues et passées à matplotlib. `pyramid`
+    est une SpectrogramPyramid, qui peut être construite hors du thread Tk.
+    """
+    
+    def __init__(self, ax, pyramid=None, **imshow_kwargs):
+        self.ax = ax
+        self.pyramid = pyramid
+        self.image = ax.imshow(np.zeros((2, 2)), aspect="auto", origin="lower",
+                               interpolation="nearest", **imshow_kwargs)
+        # Les limites suivent la vue, jamais l'étendue de l'image affichée
+        ax.set_autoscale_on(False)
+        self._resize_cid = None
+        ax.callbacks.connect("xlim_changed", lambda ax: self.update())
+    
+    def set_data(self, pyramid):
+        """Remplacer le spectrogramme et afficher l'enregistrement entier"""
+        self.pyramid = pyramid
+        self.image.set_clim(*pyramid.clim())
+        self.ax.set_ylim(0, pyramid.sr / 2)
+        self.ax.set_xlim(0, pyramid.duration())
+    
+    def update(self):
+        """Recomposer l'image pour la zone visible et la largeur courante"""
+        if self.pyramid is None:
+            return
+        t_start, t_end = self.ax.get_xlim()
+        width = max(self.ax.bbox.width, 1)
+        with span("TiledSpectrogram.update", category="interface"):
+            image, extent = self.pyramid.query(t_start, t_end, width)
+        self.image.set_data(image)
+        self.image.set_extent(extent)
+    
+    def connect_resize(self, canvas):
+        """Recomposer quand le canevas change de taille"""
+        if self._resize_cid is not None:
+            return
+        self._resize_cid = canvas.mpl_connect("resize_event", lambda event: self.update())
@@ -0,0 +1,367 @@
+"""Module de traitement en flux des longs enregistrements (mémoire bornée)
+
+Le fichier est lu par blocs (`soundfile.blocks`) et n'est jamais chargé en
+entier : normalisation en deux passages (recherche du maximum, puis mise à
+l'échelle), préaccentuation avec état d'un bloc à l'autre, rééchantillonnage
+polyphase en flux et caractéristiques par trames produites bloc par bloc
+(FeatureStream). Chaque étape donne le même résultat que le traitement du
+signal entier en mémoire : les blocs sont étendus des marges dont dépendent
+leurs échantillons (filtre, trames centrées, blocs de Hilbert, morceaux de F0).
+
+La mémoire utilisée dépend de la taille des blocs et des morceaux, pas de la
+durée de l'enregistrement ; seules les statistiques de détection de parole
+(trois valeurs par pas d'analyse) croissent avec la durée.
+"""
+
+import math
+
+import numpy as np
+import soundfile as sf
+
+from modules.audio_processor import speech_frame_stats
+from modules.envelope import envelope_range
+from modules.instrumentation import span
+from modules.parallel_f0 import chunk_tracks, parallel_tracks, plan_chunks
+
+BLOCK_SIZE = 65536
+
+def read_blocks(path, block_size=BLOCK_SIZE):
+    """Générer les blocs mono float32 d'un fichier"""
+    for block in sf.blocks(path, blocksize=block_size, dtype="float32", always_2d=True):
+        yield block.mean(axis=1)
+
+def file_peak(path, block_size=BLOCK_SIZE):
+    """Maximum de |x| sur tout le fichier (premier passage de la normalisation)"""
+    peak = np.float32(0.0)
+    for block in read_blocks(path, block_size):
+        if len(block):
+            peak = max(peak, np.max(block), -np.min(block))
+    return peak
+
+def normalized_blocks(path, block_size=BLOCK_SIZE):
+    """Blocs normalisés en deux passages : recherche du maximum, puis mise à l'échelle"""
+    peak = file_peak(path, block_size)
+    for block in read_blocks(path, block_size):
+        yield block / peak
+
+class PreEmphasis:
+    """Préaccentuation y[n] = x[n] - coef·x[n-1] bloc par bloc (état : dernier échantillon)"""
+    
+    def __init__(self, coef=0.97):
+        self.coef = coef
+        self.previous = None
+    
+    def __call__(self, block):
+        block = np.asarray(block, dtype=np.float32)
+        emphasized = np.empty_like(block)
+        if len(block) == 0:
+            return emphasized
+        np.multiply(block[:-1], -self.coef, out=emphasized[1:])
+        emphasized[1:] += block[1:]
+        if self.previous is None:
+            emphasized[0] = block[0]
+        else:
+            emphasized[:1] = block[:1] - self.coef * self.previous
+        self.previous = block[-1:].copy()
+        return emphasized
+
+def preemphasis_blocks(blocks, coef=0.97):
+    """Appliquer la préaccentuation à une suite de blocs"""
+    filter_ = PreEmphasis(coef)
+    for block in blocks:
+        yield filter_(block)
+
+def resample_blocks(blocks, orig_sr, target_sr, step=BLOCK_SIZE):
+    """Rééchantillonnage polyphase en flux, identique à `resample_poly` sur le signal entier
+    
+    Le signal est traité par pas de `step` échantillons d'entrée (multiple de la
+    décimation), étendus de chaque côté d'une marge qui couvre la demi-longueur
+    du filtre : chaque échantillon de sortie voit les mêmes entrées que dans le
+    calcul d'un seul tenant (zéros avant le début et après la fin).
+    """
+    if orig_sr == target_sr:
+        yield from blocks
+        return
+    from scipy import signal
+    g = math.gcd(int(orig_sr), int(target_sr))
+    up, down = int(target_sr) // g, int(orig_sr) // g
+    # Filtre de resample_poly : 2·10·max(up, down) + 1 coefficients au rythme suréchantillonné
+    margin = -(-math.ceil((10 * max(up, down) + 1) / up) // down) * down
+    step = max(1, step // down) * down
+    skip = margin * up // down
+    
+    buffer = np.zeros(margin, dtype=np.float32)
+    buffer_start = -margin
+    position = 0
+    total = 0
+    for block in blocks:
+        buffer = np.concatenate([buffer, block])
+        total += len(block)
+        while total >= position + step + margin:
+            window = buffer[position - margin - buffer_start:position + step + margin - buffer_start]
+            yield signal.resample_poly(window, up, down)[skip:skip + step * up // down].astype(np.float32)
+            position += step
+            buffer = buffer[position - margin - buffer_start:]
+            buffer_start = position - margin
+    
+    rest = -(-total * up // down) - position * up // down
+    if rest > 0:
+        window = np.concatenate([buffer[position - margin - buffer_start:], np.zeros(margin, dtype=np.float32)])
+        yield signal.resample_poly(window, up, down)[skip:skip + rest].astype(np.float32)
+
+class SampleBuffer:
+    """Fenêtre glissante sur une suite de blocs, adressée en positions absolues
+    
+    La longueur du signal (`length`) n'est connue qu'une fois la suite épuisée.
+    """
+    
+    def __init__(self, blocks):
+        self._blocks = iter(blocks)
+        self.start = 0
+        self.data = np.zeros(0, dtype=np.float32)
+        self.length = None
+    
+    def _fill(self, stop):
+        pending = [self.data]
+        end = self.start + len(self.data)
+        while self.length is None and end < stop:
+            try:
+                block = next(self._blocks)
+            except StopIteration:
+                self.length = end
+                break
+            pending.append(block)
+            end += len(block)
+        if len(pending) > 1:
+            self.data = np.concatenate(pending)
+    
+    def get(self, start, stop):
+        """Échantillons [start, stop), complétés de zéros hors du signal"""
+        self._fill(stop)
+        if max(start, 0) < min(stop, self.start):
+            raise ValueError(f"échantillons déjà libérés ({start} < {self.start})")
+        samples = np.zeros(stop - start, dtype=np.float32)
+        lo, hi = max(start, self.start), min(stop, self.start + len(self.data))
+        if hi > lo:
+            samples[lo - start:hi - start] = self.data[lo - self.start:hi - self.start]
+        return samples
+    
+    def discard(self, before):
+        """Libérer les échantillons situés avant `before`"""
+        drop = min(before - self.start, len(self.data))
+        if drop > 0:
+            self.data = self.data[drop:].copy()
+            self.start += drop
+
+class FeatureStream:
+    """Caractéristiques d'un long enregistrement calculées en flux, à mémoire bornée
+    
+    Premier passage (`scan`) : durée, maximum, énergie totale, statistiques de
+    détection de parole par pas et maximum du mel-spectrogramme (référence du
+    seuil des MFCC). Second passage (itération) : des blocs de `block_duration`
+    secondes de trames `{"start", "f0", "voiced_flag", "voiced_probs",
+    "envelope", "mfcc"}`, égaux aux tranches correspondantes de
+    AudioProcessor.compute_features sur le signal entier (à l'arrondi près).
+    """
+    
+    def __init__(self, processor, path, sr=None, engine=None, block_duration=30.0):
+        self.processor = processor
+        self.path = path
+        self.sr = sr or processor.analysis_rate
+        self.engine = engine or processor.f0_engine
+        self.frame_length, self.hop_length = processor.frame_settings(self.sr)
+        self.block_frames = max(1, int(block_duration * self.sr) // self.hop_length)
+        self.n_samples = None
+        self.spans = None
+    
+    @property
+    def n_frames(self):
+        return 1 + self.n_samples // self.hop_length
+    
+    def blocks(self):
+        """Signal à la fréquence d'analyse, bloc par bloc"""
+        file_sr = sf.info(self.path).samplerate
+        return resample_blocks(read_blocks(self.path), file_sr, self.sr)
+    
+    def _frame_window(self, buffer, first, stop):
+        """Échantillons couvrant les trames centrées [first, stop)"""
+        half = self.frame_length // 2
+        return buffer.get(first * self.hop_length - half, (stop - 1) * self.hop_length - half + self.frame_length)
+    
+    def _mel(self, window):
+        import librosa
+        stft = librosa.stft(window, n_fft=self.frame_length, hop_length=self.hop_length, center=False)
+        return librosa.feature.melspectrogram(S=np.abs(stft)**2, sr=self.sr, n_fft=self.frame_length, n_mels=128)
+    
+    def scan(self):
+        """Premier passage (une seule fois) ; renvoie self"""
+        if self.spans is not None:
+            return self
+        hop = self.hop_length
+        buffer = SampleBuffer(self.blocks())
+        energy, zcr, hop_squares = [], [], []
+        self.peak = np.float32(0.0)
+        self.sum_squares = 0.0
+        self.tail_squares = 0.0
+        mel_max = 0.0
+        
+        with span("FeatureStream.scan"):
+            first = 0
+            while True:
+                window = self._frame_window(buffer, first, first + self.block_frames)
+                stop = first + self.block_frames
+                if buffer.length is not None:
+                    stop = min(stop, 1 + buffer.length // hop)
+                if stop <= first:
+                    break
+                window = window[:(stop - first - 1) * hop + self.frame_length]
+                mel_max = max(mel_max, float(self._mel(window).max()))
+                
+                # Pas complets [k·hop, (k+1)·hop) de ce bloc, puis échantillons du bloc
+                half = self.frame_length // 2
+                full_stop = stop if buffer.length is None else min(stop, buffer.length // hop)
+                if full_stop > first:
+                    frames = window[half:half + (full_stop - first) * hop].reshape(-1, hop)
+                    block_energy, block_zcr = speech_frame_stats(frames)
+                    energy.append(block_energy)
+                    zcr.append(block_zcr)
+                    frames64 = frames.astype(np.float64)
+                    hop_squares.append(np.einsum("ij,ij->i", frames64, frames64))
+                end = stop * hop if buffer.length is None else min(stop * hop, buffer.length)
+                samples = window[half:half + end - first * hop].astype(np.float64)
+                self.sum_squares += float(np.dot(samples, samples))
+                if len(samples):
+                    self.peak = max(self.peak, np.float32(samples.max()), np.float32(-samples.min()))
+                if buffer.length is not None and end == buffer.length:
+                    tail = samples[max(0, full_stop * hop - first * hop):]
+                    self.tail_squares = float(np.dot(tail, tail))
+                buffer.discard(stop * hop - half)
+                first = stop
+        
+        self.n_samples = buffer.length
+        self.hop_squares = np.concatenate(hop_squares) if hop_squares else np.zeros(0)
+        self.mel_max_db = 10 * np.log10(max(1e-10, mel_max))
+        spans = np.zeros((0, 2), dtype=np.int64)
+        if self.processor.vad:
+            energy = np.concatenate(energy) if energy else np.zeros(0, dtype=np.float32)
+            zcr = np.concatenate(zcr) if zcr else np.zeros(0)
+            spans = self.processor.speech_from_stats(energy, zcr, self.n_samples, self.sr)
+        if len(spans) == 0:
+            spans = np.array([[0, self.n_samples]], dtype=np.int64)
+        self.spans = spans
+        return self
+    
+    def stats(self):
+        """Durée et RMS du signal entier et de la seule parole, comme speech_stats()"""
+        self.scan()
+        hop = self.hop_length
+        full = len(self.hop_squares) * hop
+        speech_samples = int(sum(end - start for start, end in self.spans))
+        speech_squares = 0.0
+        for start, end in self.spans:
+            speech_squares += float(self.hop_squares[start // hop:min(end, full) // hop].sum())
+            if end > full:
+                speech_squares += self.tail_squares
+        return {
+            "duration": self.n_samples / self.sr,
+            "rms": math.sqrt(self.sum_squares / self.n_samples) if self.n_samples else 0.0,
+            "speech_duration": speech_samples / self.sr,
+            "speech_rms": math.sqrt(speech_squares / speech_samples) if speech_samples else 0.0,
+        }
+    
+    def _envelope_frames(self, buffer, first, stop):
+        """Enveloppe moyennée par trame sur [first, stop), nulle hors des segments de parole"""
+        hop = self.hop_length
+        lo = max(0, first * hop - hop // 2)
+        hi = self.n_samples if stop == self.n_frames else stop * hop - hop // 2
+        amplitude = np.zeros(hi - lo, dtype=np.float32)
+        for start, end in self.spans:
+            a, b = max(lo, start), min(hi, end)
+            if a < b:
+                amplitude[a - lo:b - lo] = envelope_range(lambda x, y: buffer.get(start + x, start + y),
+                                                          end - start, a - start, b - start)
+        frames = np.minimum((np.arange(lo, hi) + hop // 2) // hop, self.n_frames - 1) - first
+        sums = np.bincount(frames, weights=amplitude, minlength=stop - first)
+        counts = np.bincount(frames, minlength=stop - first)
+        return (sums / np.maximum(counts, 1)).astype(np.float32)
+    
+    def _envelope_low(self, position):
+        """Premier échantillon encore nécessaire à l'enveloppe à partir de `position`"""
+        for start, end in self.spans:
+            if start < position < end:
+                if end - start <= BLOCK_SIZE:
+                    return start
+                return max(start, start + (position - start) // BLOCK_SIZE * BLOCK_SIZE - 8192)
+        return position
+    
+    def __iter__(self):
+        self.scan()
+        processor = self.processor
+        hop = self.hop_length
+        n_frames = self.n_frames
+        buffer = SampleBuffer(self.blocks())
+        chunks = plan_chunks(self.spans, hop, int(processor.f0_chunk_duration * self.sr),
+                             int(processor.f0_chunk_overlap * self.sr))
+        # Trames gardées de chaque morceau (comme parallel_f0.stitch)
+        kept = [(first, min(n_frames, stop if stop is not None else 1 + end // hop))
+                for start, end, first, stop in chunks]
+        kwargs = dict(engine=self.engine, fmin=processor.f_min, fmax=processor.f_max,
+                      frame_length=self.frame_length, hop_length=hop)
+        computed = {}
+        next_chunk = 0
+        
+        import librosa
+        for first in range(0, n_frames, self.block_frames):
+            stop = min(first + self.block_frames, n_frames)
+            
+            # Morceaux de F0 qui commencent avant la fin du bloc, calculés une seule fois
+            pending = []
+            while next_chunk < len(chunks) and kept[next_chunk][0] < stop:
+                pending.append(next_chunk)
+                next_chunk += 1
+            if pending:
+                lo = chunks[pending[0]][0] // hop * hop
+                hi = max(chunks[k][1] for k in pending)
+                window = buffer.get(lo, hi)
+                local = [(chunks[k][0] - lo, chunks[k][1] - lo, 0, None) for k in pending]
+                with span("FeatureStream.f0", chunks=len(pending)):
+                    if processor.f0_workers > 1 and len(pending) > 1:
+                        results = parallel_tracks(window, self.sr, local, processor.f0_workers, **kwargs)
+                    else:
+                        results = chunk_tracks(window, self.sr, local, **kwargs)
+                for k, (_, tracks) in zip(pending, results):
+                    computed[k] = tracks
+            
+            f0 = np.full(stop - first, np.nan)
+            voiced_flag = np.zeros(stop - first, dtype=bool)
+            voiced_probs = np.zeros(stop - first)
+            for k, tracks in computed.items():
+                a, b = max(first, kept[k][0]), min(stop, kept[k][1])
+                if a < b:
+                    offset = chunks[k][0] // hop
+                    for block, part in zip((f0, voiced_flag, voiced_probs), tracks):
+                        block[a - first:b - first] = part[a - offset:b - offset]
+            for k in [k for k in computed if kept[k][1] <= stop]:
+                del computed[k]
+            
+            with span("FeatureStream.mfcc"):
+                db = librosa.power_to_db(self._mel(self._frame_window(buffer, first, stop)), top_db=None)
+                np.maximum(db, self.mel_max_db - 80.0, out=db)
+                mfcc = librosa.feature.mfcc(S=db, n_mfcc=processor.n_mfcc)
+            with span("FeatureStream.envelope"):
+                envelope = self._envelope_frames(buffer, first, stop)
+            
+            yield {
+                "start": first,
+                "f0": f0,
+                "voiced_flag": voiced_flag,
+                "voiced_probs": voiced_probs,
+                "envelope": envelope,
+                "mfcc": mfcc,
+            }
+            
+            position = stop * hop
+            low = min(position - self.frame_length, self._envelope_low(position - hop // 2))
+            if next_chunk < len(chunks):
+                low = min(low, chunks[next_chunk][0])
+            buffer.discard(low)